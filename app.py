@@ -5,13 +5,31 @@ from inventory.interfaces.services import supply_api, supply_request_api
 from operations_and_monitoring.interfaces.services import monitoring_api as monitoring_routes
 from operations_and_monitoring.interfaces.services import operations_api as operations_routes
 from commerce.interfaces.services import commerce as commerce_routes
+from shared.interfaces.services import internal_api as internal_routes
 
 from shared.infrastructure.database import db
+from shared.infrastructure.json_provider import JSONProvider
+from shared.infrastructure.pool_monitor import pool_monitor
+from shared.infrastructure.token_manager import token_manager
+from operations_and_monitoring.infrastructure.repositories import MonitoringRepository
+from operations_and_monitoring.application.workers import device_sync_worker, smoke_alert_dispatcher, smoke_reading_buffer, thermostat_reading_buffer, telemetry_partition_maintainer
+from operations_and_monitoring.infrastructure.cache import hotel_metadata_cache
+from operations_and_monitoring.application.services import smoke_alarm_promoter
+from shared.infrastructure.hotelconfig import HOTEL_ID
+import atexit, os
 
 # creating the tables in the database
 db.create_all()
 
+# optionally open the pool connections before serving the first request
+if db.pool_settings["warm_up"]:
+    db.warm_pool()
+
 app = Flask(__name__)
+app.json = JSONProvider(app)
+
+# one database session per request, closed when the request ends
+db.init_app(app)
 
 # Register the routes as blueprints, which allows for modular organization of the application
 app.register_blueprint(iam_routes, url_prefix='/api/v1', name='iam')
@@ -20,6 +38,52 @@ app.register_blueprint(supply_request_api, name='SupplyRequestAPI')
 app.register_blueprint(monitoring_routes, url_prefix='/api/v1', name='monitoring')
 app.register_blueprint(operations_routes, url_prefix='/api/v1', name='operations')
 app.register_blueprint(commerce_routes, url_prefix='/api/v1', name='commerce')
+app.register_blueprint(internal_routes, name='internal')
+
+
+def start_background_work():
+    """
+    Warms the caches and starts the background workers of this process.
+    """
+    # keep the backend token warm so requests never wait for a sign-in
+    token_manager.refresher.start()
+
+    # card swipes are validated against memory, so load the registered cards up front
+    MonitoringRepository().warm_rfid_access_cache()
+    db.remove()
+
+    # the device read endpoints serve the local tables; this worker keeps them in sync with the backend
+    device_sync_worker.start()
+
+    # smoke alerts are addressed to the hotel owner; load it now instead of on the first alert
+    hotel_metadata_cache.warm(HOTEL_ID)
+    db.remove()
+
+    # delivers the smoke alerts queued by /notifications, including the ones left over by a previous run
+    smoke_alert_dispatcher.start()
+
+    # writes the readings of /monitoring/telemetry/thermostats in bulk; whatever is buffered is written on exit
+    thermostat_reading_buffer.start()
+    atexit.register(thermostat_reading_buffer.stop, 10)
+
+    # raises the smoke alarms whose debounce window passed without another reading
+    smoke_alarm_promoter.start()
+
+    # coalesces the smoke readings into batched updates of the smoke sensor table; flushed on exit too
+    smoke_reading_buffer.start()
+    atexit.register(smoke_reading_buffer.stop, 10)
+
+    # creates the upcoming daily partitions of the readings history and drops the expired ones
+    telemetry_partition_maintainer.start()
+
+    # logs where connections held for too long were checked out, when DB_LEAK_DETECTION is on
+    if pool_monitor.leak_detection:
+        pool_monitor.leak_detector.start()
+
+
+# with the reloader, `python app.py` runs this module in a watcher process as well; only its child serves
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    start_background_work()
 
 swagger = Swagger(app, template={
     "swagger": "2.0",
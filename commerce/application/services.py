@@ -1,4 +1,64 @@
 from commerce.infrastructure.repositories import PaymentCustomerRepository, PaymentOwnerRepository, SubscriptionRepository, ContractOwnerRepository
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import datetime
+
+
+def _parse_id(value, field: str) -> int:
+    """
+    Reads an id sent by a client; ids are stored as integers.
+
+    :param value: The id, as a number or a numeric string.
+    :param field: The name of the field, for the error message.
+    :return: The id.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"'{field}' must be an integer.")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' must be an integer.")
+
+
+def _parse_amount(value, field: str) -> Decimal:
+    """
+    Reads an amount sent by a client; amounts are stored as DECIMAL(12, 2).
+
+    :param value: The amount, as a number or a numeric string.
+    :param field: The name of the field, for the error message.
+    :return: The amount, rounded to cents.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"'{field}' must be a number.")
+    try:
+        amount = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"'{field}' must be a number.")
+    if not amount.is_finite():
+        raise ValueError(f"'{field}' must be a number.")
+    amount = amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    if abs(amount) >= Decimal("1e10"):
+        raise ValueError(f"'{field}' must be below 10000000000.")
+    return amount
+
+
+def _parse_date(value, field: str) -> datetime.date:
+    """
+    Reads a date sent by a client as YYYY-MM-DD; a time part is ignored.
+
+    :param value: The date, as a date or an ISO 8601 string.
+    :param field: The name of the field, for the error message.
+    :return: The date.
+    """
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f"'{field}' must be a date formatted as YYYY-MM-DD.")
+
+
+def _is_id(value) -> bool:
+    return str(value).isdigit()
 
 class CommerceApplicationService:
     def __init__(self):
@@ -12,10 +72,19 @@ class CommerceApplicationService:
     def create_payment_customer(self, guest_id, final_amount):
         if not guest_id or not final_amount:
             raise ValueError("Invalid data for payment customer. 'guest_id' and 'final_amount' are required.")
-        return self.payment_customer_repository.add_payment_customer(guest_id, final_amount)
+        return self.payment_customer_repository.add_payment_customer(guest_id, _parse_amount(final_amount, 'final_amount'))
 
-    def get_all_payment_customers(self):
-        return self.payment_customer_repository.find_all()
+    def get_payment_customers_page(self, page):
+        return self.payment_customer_repository.find_page(page)
+
+    def stream_payment_customers(self, page):
+        return self.payment_customer_repository.stream(page)
+
+    def get_payment_customers_summary(self):
+        return self.payment_customer_repository.summarize()
+
+    def get_payment_customers_summary_by_guest(self, page):
+        return self.payment_customer_repository.summarize_by_guest(page)
 
     def get_payment_customer_by_id(self, payment_customer_id):
         payment_customer = self.payment_customer_repository.find_by_id(payment_customer_id)
@@ -24,14 +93,16 @@ class CommerceApplicationService:
         return payment_customer
 
     def update_payment_customer(self, data):
-        if not data or 'id' not in data or 'gues_id' not in data or 'final_amount' not in data:
-            raise ValueError("Invalid data for payment customer. 'id', 'guest_id' and 'final_amount' are required.")
+        if not data or 'id' not in data or 'final_amount' not in data:
+            raise ValueError("Invalid data for payment customer. 'id' and 'final_amount' are required.")
 
+        final_amount = _parse_amount(data['final_amount'], 'final_amount')
         payment_customer = self.payment_customer_repository.find_by_id(data['id'])
         if not payment_customer:
             raise ValueError("Payment customer not found")
-        payment_customer.guest_id = data['guest_id']
-        payment_customer.final_amount = data['final_amount']
+        if data.get('guest_id'):
+            payment_customer.guest_id = data['guest_id']
+        payment_customer.final_amount = final_amount
         return self.payment_customer_repository.update_payment_customer(payment_customer)
 
     def get_payment_customer_by_customer_id(self, customer_id):
@@ -46,10 +117,19 @@ class CommerceApplicationService:
         if not owner_id or not description or not final_amount:
             raise ValueError("Invalid data for payment owner. 'owner_id', 'description', and 'final_amount' are required.")
 
-        return self.payment_owner_repository.add_payment_owner(owner_id, description, final_amount)
+        return self.payment_owner_repository.add_payment_owner(_parse_id(owner_id, 'owner_id'), description, _parse_amount(final_amount, 'final_amount'))
+
+    def get_payment_owners_page(self, page):
+        return self.payment_owner_repository.find_page(page)
+
+    def stream_payment_owners(self, page):
+        return self.payment_owner_repository.stream(page)
 
-    def get_all_payment_owners(self):
-        return self.payment_owner_repository.find_all()
+    def get_payment_owners_summary(self):
+        return self.payment_owner_repository.summarize()
+
+    def get_payment_owners_summary_by_owner(self, page):
+        return self.payment_owner_repository.summarize_by_owner(page)
 
     def get_payment_owner_by_id(self, payment_owner_id):
         payment_owner = self.payment_owner_repository.find_by_id(payment_owner_id)
@@ -58,19 +138,21 @@ class CommerceApplicationService:
         return payment_owner
 
     def update_payment_owner(self, data):
-        if not data or 'id' not in data or 'owner_id' not in data or 'description' not in data or 'final_amount' not in data:
-            raise ValueError("Invalid data for payment owner. 'id', 'owner_id', 'description', and 'final_amount' are required.")
+        if not data or 'id' not in data or 'description' not in data or 'final_amount' not in data:
+            raise ValueError("Invalid data for payment owner. 'id', 'description', and 'final_amount' are required.")
 
+        final_amount = _parse_amount(data['final_amount'], 'final_amount')
         payment_owner = self.payment_owner_repository.find_by_id(data['id'])
         if not payment_owner:
             raise ValueError("Payment owner not found")
-        payment_owner.owner_id = data['owner_id']
+        if data.get('owner_id') is not None:
+            payment_owner.owner_id = _parse_id(data['owner_id'], 'owner_id')
         payment_owner.description = data['description']
-        payment_owner.final_amount = data['final_amount']
+        payment_owner.final_amount = final_amount
         return self.payment_owner_repository.update_payment_owner(payment_owner)
 
     def get_payment_owner_by_owner_id(self, owner_id):
-        payment_owner = self.payment_owner_repository.get_payment_owner_by_owner_id(owner_id)
+        payment_owner = self.payment_owner_repository.get_payment_owner_by_owner_id(int(owner_id)) if _is_id(owner_id) else None
         if not payment_owner:
             raise ValueError("Payment owner not found")
         return payment_owner
@@ -83,8 +165,11 @@ class CommerceApplicationService:
 
         return self.subscription_repository.add_subscription(name, content, price, status)
 
-    def get_all_subscriptions(self):
-        return self.subscription_repository.find_all()
+    def get_subscriptions_page(self, page):
+        return self.subscription_repository.find_page(page)
+
+    def stream_subscriptions(self, page):
+        return self.subscription_repository.stream(page)
 
     def get_subscription_by_id(self, subscription_id):
         subscription = self.subscription_repository.find_by_id(subscription_id)
@@ -123,6 +208,11 @@ class CommerceApplicationService:
         if not owner_id or not start_date or not final_date or not subscription_id or not status:
             raise ValueError("Invalid data for contract owner. 'owner_id', 'start_date', 'final_date', 'subscription_id', and 'status' are required.")
 
+        owner_id = _parse_id(owner_id, 'owner_id')
+        subscription_id = _parse_id(subscription_id, 'subscription_id')
+        start_date = _parse_date(start_date, 'start_date')
+        final_date = _parse_date(final_date, 'final_date')
+
         # Validate subscription exists
         subscription = self.subscription_repository.find_by_id(subscription_id)
         if not subscription:
@@ -130,8 +220,11 @@ class CommerceApplicationService:
 
         return self.contract_owner_repository.add_contract_owner(owner_id, start_date, final_date, subscription_id, status)
 
-    def get_all_contract_owners(self):
-        return self.contract_owner_repository.find_all()
+    def get_contract_owners_page(self, page):
+        return self.contract_owner_repository.find_page(page)
+
+    def stream_contract_owners(self, page):
+        return self.contract_owner_repository.stream(page)
 
     def get_contract_owner_by_id(self, contract_id):
         contract_owner = self.contract_owner_repository.find_by_id(contract_id)
@@ -146,21 +239,21 @@ class CommerceApplicationService:
         contract_owner = self.contract_owner_repository.find_by_id(data['id'])
         if not contract_owner:
             raise ValueError("Contract owner not found")
-        contract_owner.owner_id = data['owner_id']
-        contract_owner.start_date = data['start_date']
-        contract_owner.final_date = data['final_date']
-        contract_owner.subscription_id = data['subscription_id']
+        contract_owner.owner_id = _parse_id(data['owner_id'], 'owner_id')
+        contract_owner.start_date = _parse_date(data['start_date'], 'start_date')
+        contract_owner.final_date = _parse_date(data['final_date'], 'final_date')
+        contract_owner.subscription_id = _parse_id(data['subscription_id'], 'subscription_id')
         contract_owner.status = data['status']
         return self.contract_owner_repository.update_contract_owner(contract_owner)
 
     def get_contract_owner_by_owner_id(self, owner_id):
-        contract_owner = self.contract_owner_repository.get_contract_owner_by_owner_id(owner_id)
+        contract_owner = self.contract_owner_repository.get_contract_owner_by_owner_id(int(owner_id)) if _is_id(owner_id) else None
         if not contract_owner:
             raise ValueError("Contract owner not found")
         return contract_owner
 
     def get_contract_owner_by_subscription_id(self, subscription_id):
-        contract_owner = self.contract_owner_repository.get_contract_owner_by_subscription_id(subscription_id)
+        contract_owner = self.contract_owner_repository.get_contract_owner_by_subscription_id(int(subscription_id)) if _is_id(subscription_id) else None
         if not contract_owner:
             raise ValueError("Contract owner not found")
         return contract_owner
\ No newline at end of file
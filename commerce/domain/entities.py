@@ -1,10 +1,14 @@
 ﻿class PaymentCustomer:
+    __slots__ = ("id", "guest_id", "final_amount")
+
     def __init__(self, guest_id, final_amount, id=None):
         self.id = id
         self.guest_id = guest_id
         self.final_amount = final_amount
 
 class PaymentOwner:
+    __slots__ = ("id", "owner_id", "description", "final_amount")
+
     def __init__(self, owner_id, description, final_amount, id=None):
         self.id = id
         self.owner_id = owner_id
@@ -12,6 +16,8 @@ class PaymentOwner:
         self.final_amount = final_amount
 
 class Subscription:
+    __slots__ = ("id", "name", "content", "price", "status")
+
     def __init__(self, name, content, price, status, id=None):
         self.id = id
         self.name = name
@@ -20,6 +26,8 @@ class Subscription:
         self.status = status
 
 class ContractOwner:
+    __slots__ = ("id", "owner_id", "start_date", "final_date", "subscription_id", "status")
+
     def __init__(self, owner_id, start_date, final_date, subscription_id, status, id=None):
         self.id = id
         self.owner_id = owner_id
@@ -1,4 +1,4 @@
-﻿from sqlalchemy import Table, Column, String, Integer, Float
+﻿from sqlalchemy import Table, Column, String, Integer, Float, Numeric, Date, Index
 from shared.infrastructure.database import db
 
 class PaymentCustomer:
@@ -7,7 +7,9 @@ class PaymentCustomer:
         db.meta,
         Column('id', Integer, primary_key=True, autoincrement=True),
         Column('guest_id', String(50), nullable=False),
-        Column('final_amount', String(200), nullable=False),
+        Column('final_amount', Numeric(12, 2), nullable=False),
+        # covers the per-guest totals, so they are computed from the index alone
+        Index('ix_payment_customers_guest_id_final_amount', 'guest_id', 'final_amount')
     )
 
 class PaymentOwner:
@@ -15,9 +17,11 @@ class PaymentOwner:
         'payment_owners',
         db.meta,
         Column('id', Integer, primary_key=True, autoincrement=True),
-        Column('owner_id', String(50), nullable=False),
+        Column('owner_id', Integer, nullable=False),
         Column('description', String(200), nullable=False),
-        Column('final_amount', Float, nullable=False),
+        Column('final_amount', Numeric(12, 2), nullable=False),
+        # covers the per-owner totals, so they are computed from the index alone
+        Index('ix_payment_owners_owner_id_final_amount', 'owner_id', 'final_amount')
     )
 
 class Subscription:
@@ -28,7 +32,9 @@ class Subscription:
         Column('name', String(200), nullable=False),
         Column('content', String(500), nullable=False),
         Column('price', Float, nullable=False),
-        Column('status', String(50), nullable=False)
+        Column('status', String(50), nullable=False),
+        Index('ix_subscriptions_name', 'name'),
+        Index('ix_subscriptions_status', 'status')
     )
 
 class ContractOwner:
@@ -36,9 +42,9 @@ class ContractOwner:
         'contract_owners',
         db.meta,
         Column('id', Integer, primary_key=True, autoincrement=True),
-        Column('owner_id', String(50), nullable=False),
-        Column('start_date', String(50), nullable=False),
-        Column('final_date', String(50), nullable=False),
-        Column('subscription_id', String(50), nullable=False),
+        Column('owner_id', Integer, nullable=False, index=True),
+        Column('start_date', Date, nullable=False),
+        Column('final_date', Date, nullable=False),
+        Column('subscription_id', Integer, nullable=False, index=True),
         Column('status', String(50), nullable=False)
     )
\ No newline at end of file
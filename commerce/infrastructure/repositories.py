@@ -8,9 +8,71 @@ from commerce.infrastructure.models import (
 )
 from commerce.domain.entities import PaymentCustomer, PaymentOwner, Subscription, ContractOwner
 from shared.infrastructure.database import db
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.pagination import InvalidPageRequest, Page, PageRequest, keyset_page, stream_rows
+from sqlalchemy import select, func
 from sqlalchemy.exc import NoResultFound
+import datetime
+
+logger = get_logger(__name__)
+
+
+def _amount_totals(count, total, average) -> dict:
+    return {
+        "count": count,
+        "total": float(total),
+        "average": round(float(average), 2) if average is not None else None
+    }
+
+
+def _amount_summary(table) -> dict:
+    """
+    Sums the final_amount column of a payment table in SQL.
+
+    :param table: The payment table.
+    :return: A dictionary with the number of payments, their total and their average.
+    """
+    amount = table.c.final_amount
+    row = db.session.execute(select(func.count(), func.coalesce(func.sum(amount), 0), func.avg(amount))).one()
+    return _amount_totals(*row)
+
+
+def _amount_summary_page(table, key: str, page: PageRequest) -> Page:
+    """
+    Sums the final_amount column of a payment table per value of `key`, one page of groups at a time.
+
+    Groups are ordered by the key and the page continues after `page.after`, so every page is a
+    `GROUP BY key` over an index range.
+
+    :param table: The payment table.
+    :param key: The column the payments are grouped by.
+    :param page: The page request with the limit and the keyset position.
+    :return: The page, with the key, count, total and average of every group.
+    """
+    column, amount = table.c[key], table.c.final_amount
+    if page.after is not None and (isinstance(page.after, bool) or not isinstance(page.after, column.type.python_type)):
+        raise InvalidPageRequest("Invalid cursor")
+    query = (
+        select(column, func.count(), func.sum(amount), func.avg(amount))
+        .group_by(column)
+        .order_by(column)
+        .limit(page.limit + 1)
+    )
+    if page.after is not None:
+        query = query.where(column > page.after)
+
+    rows = db.session.execute(query).all()
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+    items = [{key: value, **_amount_totals(count, total, average)} for value, count, total, average in rows]
+    return Page(items, rows[-1][0] if has_more else None)
+
 
 class PaymentCustomerRepository:
+    # fields returned by the list endpoint, in output order
+    FIELDS = ("id", "guest_id", "final_amount")
+    CONVERTERS = {"final_amount": float}
+
     def add_payment_customer(self, guest_id: str, final_amount: str) -> Optional[PaymentCustomer]:
         session = db.session
         try:
@@ -20,26 +82,52 @@ class PaymentCustomerRepository:
             )
             session.add(payment_customer)
             session.commit()
-            return PaymentCustomer(payment_customer.id, payment_customer.guest_id, payment_customer.final_amount)
+            return PaymentCustomer(id=payment_customer.id, guest_id=payment_customer.guest_id, final_amount=float(payment_customer.final_amount))
         except Exception as e:
-            print(f"Error adding payment customer: {e}")
+            logger.exception("Error adding payment customer: %s", e)
             session.rollback()
             return None
 
-    def find_all(self) -> list[PaymentCustomer]:
-        try:
-            session = db.session
-            result = session.query(PaymentCustomerModel).all()
-            return [PaymentCustomer(id=r.id, guest_id=r.guest_id, final_amount=r.final_amount) for r in result]
-        except Exception as e:
-            print(f"Error fetching payment customers: {e}")
-            return []
+    def find_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of payment customers, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every payment customer as a dictionary of the selected fields.
+        """
+        return keyset_page(PaymentCustomerModel.__table__, page, self.FIELDS, converters=self.CONVERTERS)
+
+    def stream(self, page: PageRequest):
+        """
+        Yields every payment customer after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(PaymentCustomerModel.__table__, page, self.FIELDS, converters=self.CONVERTERS)
+
+    def summarize(self) -> dict:
+        """
+        Computes the number, total and average of every payment customer amount.
+
+        :return: A dictionary with the count, total and average.
+        """
+        return _amount_summary(PaymentCustomerModel.__table__)
+
+    def summarize_by_guest(self, page: PageRequest) -> Page:
+        """
+        Computes the number, total and average of the payment amounts of every guest.
+
+        :param page: The page request with the limit and the keyset position.
+        :return: The page, with the guest_id, count, total and average of every guest.
+        """
+        return _amount_summary_page(PaymentCustomerModel.__table__, "guest_id", page)
 
     def find_by_id(self, payment_customer_id: str) -> Optional[PaymentCustomer]:
         session = db.session
         try:
             record = session.query(PaymentCustomerModel).filter_by(id=payment_customer_id).one()
-            return PaymentCustomer(record.id, record.guest_id, float(record.final_amount))
+            return PaymentCustomer(id=record.id, guest_id=record.guest_id, final_amount=float(record.final_amount))
         except NoResultFound:
             return None
 
@@ -50,7 +138,7 @@ class PaymentCustomerRepository:
             record.guest_id = payment_customer.guest_id
             record.final_amount = payment_customer.final_amount
             session.commit()
-            return PaymentCustomer(record.id, record.guest_id, float(record.final_amount))
+            return PaymentCustomer(id=record.id, guest_id=record.guest_id, final_amount=float(record.final_amount))
         except NoResultFound:
             return None
 
@@ -58,13 +146,17 @@ class PaymentCustomerRepository:
         session = db.session
         try:
             record = session.query(PaymentCustomerModel).filter_by(guest_id=guest_id).one()
-            return PaymentCustomer(record.id, record.guest_id, float(record.final_amount))
+            return PaymentCustomer(id=record.id, guest_id=record.guest_id, final_amount=float(record.final_amount))
         except NoResultFound:
             return None
 
 
 class PaymentOwnerRepository:
-    def add_payment_owner(self, owner_id: str, description: str, final_amount: str) -> Optional[PaymentOwner]:
+    # fields returned by the list endpoint, in output order
+    FIELDS = ("id", "owner_id", "description", "final_amount")
+    CONVERTERS = {"final_amount": float}
+
+    def add_payment_owner(self, owner_id: int, description: str, final_amount: str) -> Optional[PaymentOwner]:
         session = db.session
         try:
             payment_owner = PaymentOwnerModel(
@@ -76,18 +168,44 @@ class PaymentOwnerRepository:
             session.commit()
             return PaymentOwner(payment_owner.owner_id, payment_owner.description, float(payment_owner.final_amount), payment_owner.id)
         except Exception as e:
-            print(f"Error adding payment owner: {e}")
+            logger.exception("Error adding payment owner: %s", e)
             session.rollback()
             return None
 
-    def find_all(self) -> list[PaymentOwner]:
-        session = db.session
-        try:
-            records = session.query(PaymentOwnerModel).all()
-            return [PaymentOwner(r.owner_id, r.description, float(r.final_amount), r.id) for r in records]
-        except Exception as e:
-            print(f"Error fetching payment owners: {e}")
-            return []
+    def find_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of payment owners, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every payment owner as a dictionary of the selected fields.
+        """
+        return keyset_page(PaymentOwnerModel.__table__, page, self.FIELDS, converters=self.CONVERTERS)
+
+    def stream(self, page: PageRequest):
+        """
+        Yields every payment owner after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(PaymentOwnerModel.__table__, page, self.FIELDS, converters=self.CONVERTERS)
+
+    def summarize(self) -> dict:
+        """
+        Computes the number, total and average of every payment owner amount.
+
+        :return: A dictionary with the count, total and average.
+        """
+        return _amount_summary(PaymentOwnerModel.__table__)
+
+    def summarize_by_owner(self, page: PageRequest) -> Page:
+        """
+        Computes the number, total and average of the payment amounts of every owner.
+
+        :param page: The page request with the limit and the keyset position.
+        :return: The page, with the owner_id, count, total and average of every owner.
+        """
+        return _amount_summary_page(PaymentOwnerModel.__table__, "owner_id", page)
 
     def find_by_id(self, payment_owner_id: str) -> Optional[PaymentOwner]:
         session = db.session
@@ -109,7 +227,7 @@ class PaymentOwnerRepository:
         except NoResultFound:
             return None
 
-    def get_payment_owner_by_owner_id(self, owner_id: str) -> Optional[PaymentOwner]:
+    def get_payment_owner_by_owner_id(self, owner_id: int) -> Optional[PaymentOwner]:
         session = db.session
         try:
             record = session.query(PaymentOwnerModel).filter_by(owner_id=owner_id).one()
@@ -119,6 +237,10 @@ class PaymentOwnerRepository:
 
 
 class SubscriptionRepository:
+    # fields returned by the list endpoint, in output order
+    FIELDS = ("id", "name", "content", "price", "status")
+    CONVERTERS = {"price": float}
+
     def add_subscription(self, name: str, content: str, price: float, status: str) -> Optional[Subscription]:
         session = db.session
         try:
@@ -132,18 +254,27 @@ class SubscriptionRepository:
             session.commit()
             return Subscription(subscription.name, subscription.content, float(subscription.price), subscription.status, subscription.id)
         except Exception as e:
-            print(f"Error adding subscription: {e}")
+            logger.exception("Error adding subscription: %s", e)
             session.rollback()
             return None
 
-    def find_all(self) -> list[Subscription]:
-        session = db.session
-        try:
-            records = session.query(SubscriptionModel).all()
-            return [Subscription(r.name, r.content, float(r.price), r.status, r.id) for r in records]
-        except Exception as e:
-            print(f"Error fetching subscriptions: {e}")
-            return []
+    def find_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of subscriptions, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every subscription as a dictionary of the selected fields.
+        """
+        return keyset_page(SubscriptionModel.__table__, page, self.FIELDS, converters=self.CONVERTERS)
+
+    def stream(self, page: PageRequest):
+        """
+        Yields every subscription after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(SubscriptionModel.__table__, page, self.FIELDS, converters=self.CONVERTERS)
 
     def find_by_id(self, subscription_id: str) -> Optional[Subscription]:
         session = db.session
@@ -184,7 +315,10 @@ class SubscriptionRepository:
 
 
 class ContractOwnerRepository:
-    def add_contract_owner(self, owner_id: str, start_date: str, final_date: str, subscription_id: str, status: str) -> Optional[ContractOwner]:
+    # fields returned by the list endpoint, in output order
+    FIELDS = ("id", "owner_id", "start_date", "final_date", "subscription_id", "status")
+
+    def add_contract_owner(self, owner_id: int, start_date: datetime.date, final_date: datetime.date, subscription_id: int, status: str) -> Optional[ContractOwner]:
         session = db.session
         try:
             contract_owner = ContractOwnerModel(
@@ -198,18 +332,27 @@ class ContractOwnerRepository:
             session.commit()
             return ContractOwner(contract_owner.owner_id, contract_owner.start_date, contract_owner.final_date, contract_owner.subscription_id, contract_owner.status, contract_owner.id)
         except Exception as e:
-            print(f"Error adding contract owner: {e}")
+            logger.exception("Error adding contract owner: %s", e)
             session.rollback()
             return None
 
-    def find_all(self) -> list[ContractOwner]:
-        session = db.session
-        try:
-            records = session.query(ContractOwnerModel).all()
-            return [ContractOwner(r.owner_id, r.start_date, r.final_date, r.subscription_id, r.status, r.id) for r in records]
-        except Exception as e:
-            print(f"Error fetching contract owners: {e}")
-            return []
+    def find_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of contract owners, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every contract owner as a dictionary of the selected fields.
+        """
+        return keyset_page(ContractOwnerModel.__table__, page, self.FIELDS)
+
+    def stream(self, page: PageRequest):
+        """
+        Yields every contract owner after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(ContractOwnerModel.__table__, page, self.FIELDS)
 
     def find_by_id(self, contract_owner_id: str) -> Optional[ContractOwner]:
         session = db.session
@@ -233,7 +376,7 @@ class ContractOwnerRepository:
         except NoResultFound:
             return None
 
-    def get_contract_owner_by_owner_id(self, owner_id: str) -> list[ContractOwner]:
+    def get_contract_owner_by_owner_id(self, owner_id: int) -> list[ContractOwner]:
         session = db.session
         try:
             records = session.query(ContractOwnerModel).filter_by(owner_id=owner_id).all()
@@ -241,7 +384,7 @@ class ContractOwnerRepository:
         except NoResultFound:
             return []
 
-    def get_contract_owner_by_subscription_id(self, subscription_id: str) -> list[ContractOwner]:
+    def get_contract_owner_by_subscription_id(self, subscription_id: int) -> list[ContractOwner]:
         session = db.session
         try:
             records = session.query(ContractOwnerModel).filter_by(subscription_id=subscription_id).all()
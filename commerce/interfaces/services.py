@@ -1,6 +1,9 @@
 from flasgger import swag_from
 from flask import Blueprint, request, jsonify
 from commerce.application.services import CommerceApplicationService
+from shared.infrastructure.pagination import InvalidPageRequest, parse_page_request
+from shared.interfaces.pagination import page_response
+from shared.interfaces.streaming import parse_stream_format, stream_response
 
 commerce = Blueprint('commerce_api', __name__)
 commerce_service = CommerceApplicationService()
@@ -83,9 +86,27 @@ def get_all_payment_customers():
     """
     Retrieves all payment customers.
     ---
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of items to return (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page.
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of the fields to return.
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        description: Stream every remaining item instead of one page, as NDJSON or as a chunked JSON array.
     responses:
       200:
-        description: A list of payment customers
+        description: A page of payment customers
         schema:
           type: array
           items:
@@ -101,16 +122,79 @@ def get_all_payment_customers():
                 type: number
                 format: float
                 description: The final amount for the payment.
+      400:
+        description: Invalid limit, cursor or fields
       500:
         description: Internal server error
     """
     try:
-        payment_customers = commerce_service.get_all_payment_customers()
-        return jsonify([{
-            "id": pc.id,
-            "guest_id": pc.guest_id,
-            "final_amount": float(pc.final_amount)
-        } for pc in payment_customers]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(commerce_service.stream_payment_customers(page), stream)
+        return page_response(commerce_service.get_payment_customers_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@commerce.route('/api/v1/payment-customer/summary', methods=['GET'])
+@swag_from({
+    'tags': ['Payment Customers']
+})
+def get_payment_customers_summary():
+    """
+    Retrieves the number, total and average of the payment customer amounts, computed by the database.
+    ---
+    parameters:
+      - in: query
+        name: group_by
+        type: string
+        enum: [guest]
+        description: Return the totals of every guest instead of the overall totals, one page at a time.
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of guests to return when grouping (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page when grouping.
+    responses:
+      200:
+        description: The overall totals, or a page of totals per guest ordered by guest_id
+        schema:
+          type: object
+          properties:
+            guest_id:
+              type: string
+              description: The ID of the guest; only present when grouping.
+            count:
+              type: integer
+              description: The number of payments.
+            total:
+              type: number
+              format: float
+              description: The sum of the final amounts.
+            average:
+              type: number
+              format: float
+              description: The average final amount, or null when there are no payments.
+      400:
+        description: Invalid group_by, limit or cursor
+      500:
+        description: Internal server error
+    """
+    try:
+        group_by = request.args.get('group_by')
+        if not group_by:
+            return jsonify(commerce_service.get_payment_customers_summary()), 200
+        if group_by != 'guest':
+            return jsonify({"error": "group_by must be 'guest'"}), 400
+        page = parse_page_request(request.args)
+        return page_response(commerce_service.get_payment_customers_summary_by_guest(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -207,10 +291,9 @@ def update_payment_customer(payment_customer_id):
     try:
         final_amount = data['final_amount']
 
-        payment_customer = commerce_service.update_payment_customer(
-            payment_customer_id, final_amount,
-            request.headers.get('X-API-Key')
-        )
+        payment_customer = commerce_service.update_payment_customer({
+            "id": payment_customer_id, "final_amount": final_amount
+        })
 
         return jsonify({
             "id": payment_customer.id,
@@ -284,7 +367,7 @@ def create_payment_owner():
           type: object
           properties:
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             description:
               type: string
@@ -303,7 +386,7 @@ def create_payment_owner():
               type: string
               description: The ID of the payment owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             description:
               type: string
@@ -347,9 +430,27 @@ def get_all_payment_owners():
     """
     Retrieves all payment owners.
     ---
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of items to return (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page.
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of the fields to return.
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        description: Stream every remaining item instead of one page, as NDJSON or as a chunked JSON array.
     responses:
       200:
-        description: A list of payment owners
+        description: A page of payment owners
         schema:
           type: array
           items:
@@ -359,7 +460,7 @@ def get_all_payment_owners():
                 type: string
                 description: The ID of the payment owner.
               owner_id:
-                type: string
+                type: integer
                 description: The ID of the owner.
               description:
                 type: string
@@ -368,17 +469,79 @@ def get_all_payment_owners():
                 type: number
                 format: float
                 description: The final amount for the payment.
+      400:
+        description: Invalid limit, cursor or fields
       500:
         description: Internal server error
     """
     try:
-        payment_owners = commerce_service.get_all_payment_owners()
-        return jsonify([{
-            "id": po.id,
-            "owner_id": po.owner_id,
-            "description": po.description,
-            "final_amount": float(po.final_amount)
-        } for po in payment_owners]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(commerce_service.stream_payment_owners(page), stream)
+        return page_response(commerce_service.get_payment_owners_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@commerce.route('/api/v1/payment-owner/summary', methods=['GET'])
+@swag_from({
+    'tags': ['Payment Owners']
+})
+def get_payment_owners_summary():
+    """
+    Retrieves the number, total and average of the payment owner amounts, computed by the database.
+    ---
+    parameters:
+      - in: query
+        name: group_by
+        type: string
+        enum: [owner]
+        description: Return the totals of every owner instead of the overall totals, one page at a time.
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of owners to return when grouping (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page when grouping.
+    responses:
+      200:
+        description: The overall totals, or a page of totals per owner ordered by owner_id
+        schema:
+          type: object
+          properties:
+            owner_id:
+              type: integer
+              description: The ID of the owner; only present when grouping.
+            count:
+              type: integer
+              description: The number of payments.
+            total:
+              type: number
+              format: float
+              description: The sum of the final amounts.
+            average:
+              type: number
+              format: float
+              description: The average final amount, or null when there are no payments.
+      400:
+        description: Invalid group_by, limit or cursor
+      500:
+        description: Internal server error
+    """
+    try:
+        group_by = request.args.get('group_by')
+        if not group_by:
+            return jsonify(commerce_service.get_payment_owners_summary()), 200
+        if group_by != 'owner':
+            return jsonify({"error": "group_by must be 'owner'"}), 400
+        page = parse_page_request(request.args)
+        return page_response(commerce_service.get_payment_owners_summary_by_owner(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -406,7 +569,7 @@ def get_payment_owner_by_id(payment_owner_id):
               type: string
               description: The ID of the payment owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             description:
               type: string
@@ -467,7 +630,7 @@ def update_payment_owner(payment_owner_id):
               type: string
               description: The ID of the payment owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             description:
               type: string
@@ -486,10 +649,9 @@ def update_payment_owner(payment_owner_id):
         description = data['description']
         final_amount = data['final_amount']
 
-        payment_owner = commerce_service.update_payment_owner(
-            payment_owner_id, description, final_amount,
-            request.headers.get('X-API-Key')
-        )
+        payment_owner = commerce_service.update_payment_owner({
+            "id": payment_owner_id, "description": description, "final_amount": final_amount
+        })
 
         return jsonify({
             "id": payment_owner.id,
@@ -527,7 +689,7 @@ def get_payment_owner_by_owner_id(owner_id):
               type: string
               description: The ID of the payment owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             description:
               type: string
@@ -637,9 +799,27 @@ def get_all_subscriptions():
     """
     Retrieves all subscriptions.
     ---
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of items to return (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page.
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of the fields to return.
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        description: Stream every remaining item instead of one page, as NDJSON or as a chunked JSON array.
     responses:
       200:
-        description: A list of subscriptions
+        description: A page of subscriptions
         schema:
           type: array
           items:
@@ -661,18 +841,19 @@ def get_all_subscriptions():
               status:
                 type: string
                 description: The status of the subscription.
+      400:
+        description: Invalid limit, cursor or fields
       500:
         description: Internal server error
     """
     try:
-        subscriptions = commerce_service.get_all_subscriptions()
-        return jsonify([{
-            "id": sub.id,
-            "name": sub.name,
-            "content": sub.content,
-            "price": float(sub.price),
-            "status": sub.status
-        } for sub in subscriptions]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(commerce_service.stream_subscriptions(page), stream)
+        return page_response(commerce_service.get_subscriptions_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -935,7 +1116,7 @@ def create_contract_owner():
           type: object
           properties:
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             start_date:
               type: string
@@ -946,7 +1127,7 @@ def create_contract_owner():
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -961,7 +1142,7 @@ def create_contract_owner():
               type: string
               description: The ID of the contract owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             start_date:
               type: string
@@ -972,7 +1153,7 @@ def create_contract_owner():
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -1014,9 +1195,27 @@ def get_all_contract_owners():
     """
     Retrieves all contract owners.
     ---
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of items to return (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page.
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of the fields to return.
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        description: Stream every remaining item instead of one page, as NDJSON or as a chunked JSON array.
     responses:
       200:
-        description: A list of contract owners
+        description: A page of contract owners
         schema:
           type: array
           items:
@@ -1026,7 +1225,7 @@ def get_all_contract_owners():
                 type: string
                 description: The ID of the contract owner.
               owner_id:
-                type: string
+                type: integer
                 description: The ID of the owner.
               start_date:
                 type: string
@@ -1037,24 +1236,24 @@ def get_all_contract_owners():
                 format: date
                 description: The final date of the contract.
               subscription_id:
-                type: string
+                type: integer
                 description: The ID of the subscription.
               status:
                 type: string
                 description: The status of the contract.
+      400:
+        description: Invalid limit, cursor or fields
       500:
         description: Internal server error
     """
     try:
-        contract_owners = commerce_service.get_all_contract_owners()
-        return jsonify([{
-            "id": co.id,
-            "owner_id": co.owner_id,
-            "start_date": co.start_date,
-            "final_date": co.final_date,
-            "subscription_id": co.subscription_id,
-            "status": co.status
-        } for co in contract_owners]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(commerce_service.stream_contract_owners(page), stream)
+        return page_response(commerce_service.get_contract_owners_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1082,7 +1281,7 @@ def get_contract_owner_by_id(contract_owner_id):
               type: string
               description: The ID of the contract owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             start_date:
               type: string
@@ -1093,7 +1292,7 @@ def get_contract_owner_by_id(contract_owner_id):
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -1149,7 +1348,7 @@ def update_contract_owner(contract_owner_id):
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -1164,7 +1363,7 @@ def update_contract_owner(contract_owner_id):
               type: string
               description: The ID of the contract owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             start_date:
               type: string
@@ -1175,7 +1374,7 @@ def update_contract_owner(contract_owner_id):
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -1235,7 +1434,7 @@ def get_contract_owner_by_owner_id(owner_id):
               type: string
               description: The ID of the contract owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             start_date:
               type: string
@@ -1246,7 +1445,7 @@ def get_contract_owner_by_owner_id(owner_id):
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -1291,7 +1490,7 @@ def get_contract_owner_by_subscription_id(subscription_id):
               type: string
               description: The ID of the contract owner.
             owner_id:
-              type: string
+              type: integer
               description: The ID of the owner.
             start_date:
               type: string
@@ -1302,7 +1501,7 @@ def get_contract_owner_by_subscription_id(subscription_id):
               format: date
               description: The final date of the contract.
             subscription_id:
-              type: string
+              type: integer
               description: The ID of the subscription.
             status:
               type: string
@@ -2,23 +2,68 @@ from typing import Optional
 
 from iam.domain.entities import Device
 from iam.domain.services import AuthService
+from iam.infrastructure.cache import device_credential_cache
 from iam.infrastructure.repositories import DeviceRepository
 
 
 class AuthApplicationService:
+    # length of the devices.device_id column
+    DEVICE_ID_MAX_LENGTH = 150
+
     def __init__(self):
         self.device_repository = DeviceRepository()
         self.auth_service = AuthService()
 
     def authenticate(self, device_id: str, api_key: str) -> bool:
-        device: Optional[Device] = self.device_repository.find_by_id_and_api_key(device_id, api_key)
-        return self.auth_service.authenticate(device)
+        cached = device_credential_cache.lookup(device_id, api_key)
+        if cached is not None:
+            return cached
+
+        # look the device up by primary key and compare the key here, in constant time
+        device: Optional[Device] = self.device_repository.find_by_id(device_id)
+        valid = self.auth_service.verify_api_key(device, api_key)
+        device_credential_cache.remember(device_id, api_key, valid)
+        return self.auth_service.authenticate(device if valid else None)
 
     def create_device(self, data:dict) -> Device:
         if not data or 'device_id' not in data:
             raise ValueError("Device id is required")
         response = self.device_repository.create_device(data)
+        device_credential_cache.invalidate(data['device_id'])
         return response
 
+    def create_devices(self, device_ids: list) -> list[dict]:
+        """
+        Registers a batch of devices.
+
+        :param device_ids: The device IDs to register, in the order of the request.
+        :return: One result per requested ID, in the same order, with its status and, if created, its API key.
+        """
+        results = []
+        seen = set()
+        candidates = []
+        for device_id in device_ids:
+            if not isinstance(device_id, str) or not device_id.strip() or len(device_id) > self.DEVICE_ID_MAX_LENGTH:
+                results.append({"device_id": device_id, "status": "invalid"})
+            elif device_id in seen:
+                results.append({"device_id": device_id, "status": "duplicate"})
+            else:
+                seen.add(device_id)
+                candidates.append(device_id)
+                results.append({"device_id": device_id, "status": None})
+
+        created = self.device_repository.create_devices(candidates)
+        for device_id in created:
+            device_credential_cache.invalidate(device_id)
+
+        for result in results:
+            if result["status"] is None:
+                device = created.get(result["device_id"])
+                if device:
+                    result.update(status="created", api_key=device.api_key)
+                else:
+                    result["status"] = "already_registered"
+        return results
+
     def get_device_by_id_and_api_key(self, device_id: str, api_key: str) -> Optional[Device]:
         return self.device_repository.find_by_id_and_api_key(device_id, api_key)
\ No newline at end of file
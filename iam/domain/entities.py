@@ -1,4 +1,6 @@
 ﻿class Device:
+    __slots__ = ("device_id", "api_key")
+
     def __init__(self, device_id: str, api_key:str):
         self.device_id = device_id
         self.api_key = api_key
@@ -1,4 +1,5 @@
 from typing import Optional
+import hmac
 
 from iam.domain.entities import Device
 
@@ -9,4 +10,17 @@ class AuthService:
 
     @staticmethod
     def authenticate(device: Optional[Device]) -> bool:
-        return device is not None
\ No newline at end of file
+        return device is not None
+
+    @staticmethod
+    def verify_api_key(device: Optional[Device], api_key: str) -> bool:
+        """
+        Checks an API key against the key of a device in constant time.
+
+        :param device: The device, or None if it is not registered.
+        :param api_key: The API key presented by the caller.
+        :return: True if the key belongs to the device.
+        """
+        if device is None or not api_key:
+            return False
+        return hmac.compare_digest(device.api_key.encode("utf-8"), api_key.encode("utf-8"))
@@ -0,0 +1,75 @@
+from typing import Optional
+from dotenv import load_dotenv
+from shared.infrastructure.cache import TTLCache
+from shared.infrastructure.metrics import register_metrics
+import hashlib, hmac, os
+
+load_dotenv()
+
+
+class DeviceCredentialCache:
+    """
+    In-memory view of the device credentials verified against the `devices` table.
+
+    Only a SHA-256 digest of every API key is kept, and digests are compared in constant time.
+    Verified devices are remembered for IAM_AUTH_CACHE_TTL seconds, rejected (device_id, key)
+    pairs for IAM_AUTH_NEGATIVE_CACHE_TTL seconds, so a flood of bad keys does not reach the
+    database either.
+    """
+
+    def __init__(self, maxsize: int = None, ttl: float = None, negative_ttl: float = None):
+        maxsize = maxsize if maxsize is not None else int(os.getenv("IAM_AUTH_CACHE_SIZE", "10000"))
+        self._verified = TTLCache(maxsize=maxsize, ttl=ttl if ttl is not None else float(os.getenv("IAM_AUTH_CACHE_TTL", "300")))
+        self._rejected = TTLCache(maxsize=maxsize, ttl=negative_ttl if negative_ttl is not None else float(os.getenv("IAM_AUTH_NEGATIVE_CACHE_TTL", "5")))
+
+    @staticmethod
+    def digest(api_key: str) -> bytes:
+        return hashlib.sha256(api_key.encode("utf-8")).digest()
+
+    def lookup(self, device_id: str, api_key: str) -> Optional[bool]:
+        """
+        Checks a credential against the cache.
+
+        :return: True if it was verified, False if it was recently rejected, None if the cache does not know.
+        """
+        digest = self.digest(api_key)
+        verified = self._verified.get(device_id)
+        if verified is not None and hmac.compare_digest(verified, digest):
+            return True
+        if self._rejected.get((device_id, digest)):
+            return False
+        return None
+
+    def remember(self, device_id: str, api_key: str, valid: bool):
+        """
+        Stores the outcome of a credential check made against the database.
+
+        :param device_id: The ID of the device.
+        :param api_key: The API key that was checked.
+        :param valid: Whether the key belongs to the device.
+        """
+        digest = self.digest(api_key)
+        if valid:
+            self._verified.set(device_id, digest)
+            self._rejected.invalidate((device_id, digest))
+        else:
+            self._rejected.set((device_id, digest), True)
+
+    def invalidate(self, device_id: str):
+        """
+        Forgets the verified key of a device, e.g. after it was created or its key rotated.
+
+        Rejections are keyed by the key digest and a freshly generated key cannot have been
+        rejected before, so they are left to expire.
+        """
+        self._verified.invalidate(device_id)
+
+    def stats(self) -> dict:
+        return {
+            "verified": self._verified.stats(),
+            "rejected": self._rejected.stats()
+        }
+
+
+device_credential_cache = DeviceCredentialCache()
+register_metrics("iam_auth_cache", device_credential_cache.stats)
@@ -3,13 +3,33 @@ from sqlalchemy import and_, insert, select
 from iam.infrastructure.models import Device as DeviceModel
 from iam.domain.entities import Device
 from shared.infrastructure.database import db
+from shared.infrastructure.log import get_logger
 from shared.infrastructure.utilities import Utilities
 
+logger = get_logger(__name__)
+
 class DeviceRepository:
 
     def __init__(self):
         self.utilities = Utilities()
     
+    @staticmethod
+    def find_by_id(device_id: str) -> Optional[Device]:
+        """
+        Retrieves a device by its primary key.
+
+        :param device_id: The ID of the device.
+        :return: The device, or None if it is not registered.
+        """
+        session = db.session
+        stmt = select(DeviceModel.__table__.c.device_id, DeviceModel.__table__.c.api_key).where(
+            DeviceModel.__table__.c.device_id == device_id
+        )
+        row = session.execute(stmt).first()
+        if row is None:
+            return None
+        return Device(device_id=row.device_id, api_key=row.api_key)
+
     @staticmethod
     def find_by_id_and_api_key(device_id : str, api_key : str) -> Optional[Device]:
         session = db.session
@@ -46,5 +66,43 @@ class DeviceRepository:
             return Device(device_id=data['device_id'],api_key=generated_api_key)
         except Exception as e:
             session.rollback()
-            print(f"Unexpected error: {str(e)}")  # Debug log
-            raise e
\ No newline at end of file
+            logger.exception("Unexpected error: %s", e)
+            raise e
+
+    @staticmethod
+    def create_devices(device_ids: list[str]) -> dict:
+        """
+        Registers many devices with one multi-row INSERT, generating an API key for each.
+
+        Devices that are already registered are left untouched: the rows are inserted with
+        INSERT IGNORE and read back, and only the rows holding the generated key were created
+        by this call.
+
+        :param device_ids: Distinct device IDs to register.
+        :return: A dictionary mapping every created device ID to its Device.
+        """
+        if not device_ids:
+            return {}
+
+        table = DeviceModel.__table__
+        keys = {device_id: Utilities.generate_api_key() for device_id in device_ids}
+        session = db.session
+        try:
+            session.execute(
+                insert(table).prefix_with("IGNORE").values([
+                    {"device_id": device_id, "api_key": api_key} for device_id, api_key in keys.items()
+                ])
+            )
+            rows = session.execute(
+                select(table.c.device_id, table.c.api_key).where(table.c.device_id.in_(list(keys)))
+            ).all()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Unexpected error: %s", e)
+            raise e
+
+        return {
+            row.device_id: Device(device_id=row.device_id, api_key=row.api_key)
+            for row in rows if row.api_key == keys.get(row.device_id)
+        }
@@ -1,6 +1,6 @@
 from flask import Blueprint
 from flasgger import swag_from
-from iam.interfaces.services import create_device_request
+from iam.interfaces.services import create_device_request, create_devices_request
 
 iam = Blueprint('iam', __name__)
 
@@ -40,4 +40,43 @@ def auth():
         401:
             description: Unauthorized
     """
-   return create_device_request()
\ No newline at end of file
+   return create_device_request()
+
+@iam.route('/sign-up/batch', methods=['POST'])
+@swag_from({
+    'tags': ['Authentication'],
+    'parameters': [
+        {
+            'in': 'body',
+            'name': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'device_ids': {
+                        'type': 'array',
+                        'items': {'type': 'string'},
+                        'example': ['abc123', 'abc124']
+                    }
+                },
+                'required': ['device_ids']
+            }
+        }
+    ],
+    'responses': {
+        201: {'description': 'Every device was registered'},
+        207: {'description': 'Some devices were not registered; see the status of each result'},
+        400: {'description': 'Invalid input'}
+    }
+})
+def auth_batch():
+   """
+    Register a batch of devices by their IDs.
+    ---
+    responses:
+        201:
+            description: Every device was registered
+        207:
+            description: Some devices were not registered
+    """
+   return create_devices_request()
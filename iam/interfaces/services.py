@@ -2,10 +2,13 @@ from dataclasses import asdict
 from flask import Blueprint, request, jsonify
 
 from iam.application.services import AuthApplicationService
+import os
 iam_api = Blueprint('iam', __name__)
 
 auth_service = AuthApplicationService()
 
+SIGN_UP_BATCH_LIMIT = int(os.getenv("IAM_SIGN_UP_BATCH_LIMIT", "1000"))
+
 def authenticate_request():
     retrieved_device_id = request.json.get('device_id') if request.json else None
     api_key = request.headers.get('X-API-Key')
@@ -30,4 +33,26 @@ def create_device_request():
         device_dict = response.to_dict()
         return jsonify(device_dict), 201
     else:
-        return jsonify(), 400
\ No newline at end of file
+        return jsonify(), 400
+
+def create_devices_request():
+    """
+    Register a batch of devices, generating an api_key for each one.
+    """
+    body = request.get_json(silent=True)
+    device_ids = body.get('device_ids') if isinstance(body, dict) else None
+
+    if not isinstance(device_ids, list) or not device_ids:
+        return jsonify({"error": "device_ids must be a non-empty list."}), 400
+    if len(device_ids) > SIGN_UP_BATCH_LIMIT:
+        return jsonify({"error": f"At most {SIGN_UP_BATCH_LIMIT} devices can be registered per request."}), 400
+
+    results = auth_service.create_devices(device_ids)
+    created = sum(1 for result in results if result["status"] == "created")
+
+    # 207 tells the client to look at the per-item statuses
+    return jsonify({
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }), 201 if created == len(results) else 207
@@ -24,6 +24,26 @@ class SupplyService:
         
         return self.supply_repository.get_all_supplies()
     
+    def get_supplies_page(self, page):
+        """
+        Retrieves one page of the supplies in the system.
+        
+        :param page: The page request.
+        :return: The page of supplies.
+        """
+        
+        return self.supply_repository.get_supplies_page(page)
+    
+    def stream_supplies(self, page):
+        """
+        Yields every supply in the system, for streamed responses.
+        
+        :param page: The page request.
+        :return: A generator of supplies.
+        """
+        
+        return self.supply_repository.stream_supplies(page)
+    
     def get_supply_by_id(self, supply_id):
         """
         Retrieves a specific supply by its ID.
@@ -2,6 +2,8 @@
 
 
 class Supply:
+    __slots__ = ("id", "provider_id", "hotel_id", "name", "price", "stock", "state")
+
     def __init__(self, id: int, provider_id: int, hotel_id: int, name: str, price: float, stock: int, state: str):
         self.id = id
         self.provider_id = provider_id
@@ -23,6 +25,8 @@ class Supply:
         }
 
 class SupplyRequest:
+    __slots__ = ("id", "payment_owner_id", "supply_id", "count", "amount")
+
     def __init__(self, id: int, payment_owner_id: int, supply_id: int, count: int, amount: float):
         self.id = id
         self.payment_owner_id = payment_owner_id
@@ -40,6 +44,8 @@ class SupplyRequest:
         }
 
 class Rfid(Device):
+    __slots__ = ("id", "room_id", "u_id")
+
     def __init__(self, id: int, room_id: int, api_key: str, u_id: str, device_id: str):
         super().__init__(device_id, api_key)
         self.id = id
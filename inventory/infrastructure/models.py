@@ -1,5 +1,5 @@
 ﻿from shared.infrastructure.database import db
-from sqlalchemy import Table, Column, String, Integer, Float
+from sqlalchemy import Table, Column, String, Integer, Float, Index
 
 class Supply:
     __table__ = Table(
@@ -27,6 +27,8 @@ class SupplyRequest:
 
 class Rfid(db.Base):
     __tablename__ = 'rfid_devices'
+    # backs the access validation by (room_id, u_id); its leading column also serves room lookups
+    __table_args__ = (Index('ux_rfid_devices_room_id_u_id', 'room_id', 'u_id', unique=True),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     device_id = Column(String(100), unique=True, nullable=True)  # <-- mejor como str
     room_id = Column(Integer, nullable=False)        # <-- mejor como int
@@ -1,11 +1,18 @@
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from shared.infrastructure.database import db
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.pagination import Page, PageRequest, keyset_page, stream_rows
 
 from inventory.infrastructure.models import Supply as SupplyModel, SupplyRequest as SupplyRequestModel
 from inventory.domain.entities import Supply, SupplyRequest
 
+logger = get_logger(__name__)
+
 class SupplyRepository:
+    # fields returned by the list endpoint, in output order
+    FIELDS = ("id", "provider_id", "hotel_id", "name", "price", "stock", "state")
+
     def get_supplies(self, hotel_id: int) -> list[Supply]:
         """
         Retrieves supplies associated with a specific hotel.
@@ -29,6 +36,26 @@ class SupplyRepository:
         
         return [Supply(id=supply.id, provider_id=supply.provider_id, hotel_id=supply.hotel_id, name=supply.name, price=supply.price, stock=supply.stock, state=supply.state) for supply in result]
     
+    def get_supplies_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of supplies, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every supply as a dictionary of the selected fields.
+        """
+
+        return keyset_page(SupplyModel.__table__, page, self.FIELDS)
+    
+    def stream_supplies(self, page: PageRequest):
+        """
+        Yields every supply after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+
+        return stream_rows(SupplyModel.__table__, page, self.FIELDS)
+    
     def get_supply_by_id(self, supply_id: int) -> Supply:
         """
         Retrieves a specific supply by its ID.
@@ -72,7 +99,7 @@ class SupplyRepository:
             # Hacer commit explícito
             session.commit()
             
-            print(f"Supply inserted with ID: {supply_id}")  # Debug log
+            logger.debug("Supply inserted with ID: %s", supply_id)
             
             return Supply(
                 id=supply_id,
@@ -86,11 +113,11 @@ class SupplyRepository:
             
         except SQLAlchemyError as e:
             session.rollback()
-            print(f"Database error: {str(e)}")  # Debug log
+            logger.exception("Database error: %s", e)
             raise e
         except Exception as e:
             session.rollback()
-            print(f"Unexpected error: {str(e)}")  # Debug log
+            logger.exception("Unexpected error: %s", e)
             raise e
 
 class SupplyRequestRepository:
@@ -146,7 +173,7 @@ class SupplyRequestRepository:
             # Hacer commit explícito
             session.commit()
             
-            print(f"Supply request inserted with ID: {request_id}")  # Debug log
+            logger.debug("Supply request inserted with ID: %s", request_id)
             
             return SupplyRequest(
                 id=request_id,
@@ -158,9 +185,9 @@ class SupplyRequestRepository:
             
         except SQLAlchemyError as e:
             session.rollback()
-            print(f"Database error: {str(e)}")  # Debug log
+            logger.exception("Database error: %s", e)
             raise e
         except Exception as e:
             session.rollback()
-            print(f"Unexpected error: {str(e)}")  # Debug log
+            logger.exception("Unexpected error: %s", e)
             raise e
\ No newline at end of file
@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify
 
 from inventory.application.services import SupplyService
 from inventory.application.services import SupplyRequestService
+from shared.infrastructure.pagination import InvalidPageRequest, parse_page_request
+from shared.interfaces.pagination import page_response
+from shared.interfaces.streaming import parse_stream_format, stream_response
 
 supply_api = Blueprint('supply_api', __name__)
 supply_request_api = Blueprint('supply_request_api', __name__)
@@ -24,10 +27,15 @@ def create_supply():
 
 @supply_api.route('/api/v1/supply/get-all-supplies', methods=['GET'])
 def get_all_supplies():
-    """Get all supplies in the system"""
+    """Get a page of the supplies in the system (?limit=, ?cursor=, ?fields=; ?stream=ndjson|json for all of them)"""
     try:
-        supplies = supply_service.get_all_supplies()
-        return jsonify([supply.to_dict() for supply in supplies]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(supply_service.stream_supplies(page), stream)
+        return page_response(supply_service.get_supplies_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
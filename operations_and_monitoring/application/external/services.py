@@ -1,5 +1,11 @@
 from operations_and_monitoring.domain.entities import Booking
 from shared.infrastructure.external_services import ExternalService
+from shared.infrastructure.hotelconfig import HOTEL_ID
+from shared.infrastructure.http_client import backend_client
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.token_manager import token_manager
+
+logger = get_logger(__name__)
 
 class BookingExternalService:
 
@@ -30,7 +36,7 @@ class BookingExternalService:
                 check_out_date=booking_data['check_out_date']
             )
         except Exception as e:
-            print(f"Error retrieving booking by customer ID {customer_id}: {e}")
+            logger.exception("Error retrieving booking by customer ID %s: %s", customer_id, e)
             return None
 
     @staticmethod
@@ -65,7 +71,7 @@ class BookingExternalService:
                 preference_id=booking_data.get('preference_id', None)
             )
         except Exception as e:
-            print(f"Error retrieving booking by ID {booking_id}: {e}")
+            logger.exception("Error retrieving booking by ID %s: %s", booking_id, e)
             return None
 
     @staticmethod
@@ -86,7 +92,7 @@ class BookingExternalService:
 
             return response.status_code == 200
         except Exception as e:
-            print(f"Error updating booking state for {booking_id}: {e}")
+            logger.exception("Error updating booking state for %s: %s", booking_id, e)
             return False
         
     @staticmethod
@@ -119,5 +125,113 @@ class BookingExternalService:
                 preference_id=booking.get('preference_id', None)
             ) for booking in bookings_data]
         except Exception as e:
-            print(f"Error retrieving bookings for hotel {hotel_id}: {e}")
-            return []
\ No newline at end of file
+            logger.exception("Error retrieving bookings for hotel %s: %s", hotel_id, e)
+            return []
+
+
+class DeviceExternalService:
+    # backend endpoint and query parameters of every device list the fog node mirrors
+    RESOURCES = {
+        "thermostats": ("thermostat/get-all-thermostats", {"hotelId": HOTEL_ID}),
+        "rfid_devices": (f"rfid-card/hotel/{HOTEL_ID}", None),
+    }
+
+    @staticmethod
+    def fetch_devices(resource: str, etag: str = None, last_modified: str = None):
+        """
+        Downloads the hotel's device list for a resource, as a conditional request when validators are known.
+
+        :param resource: One of the keys of `RESOURCES`.
+        :param etag: The ETag of the last payload, if the backend sent one.
+        :param last_modified: The Last-Modified value of the last payload, if the backend sent one.
+        :return: The backend response; a 304 means the list has not changed.
+        """
+        token = token_manager.get_token()
+        if not token:
+            raise Exception("Authentication with backend failed")
+
+        endpoint, params = DeviceExternalService.RESOURCES[resource]
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        response = backend_client.get(endpoint, headers=headers, params=params)
+        if response.status_code == 401:
+            # the backend revoked the token before its expiry; sign in again on the next call
+            token_manager.invalidate()
+        return response
+
+
+class HotelExternalService:
+
+    @staticmethod
+    def get_hotel(hotel_id: int) -> dict:
+        """
+        Retrieves a hotel from the backend.
+
+        :param hotel_id: The ID of the hotel.
+        :return: The hotel data as returned by the backend, or None if it could not be retrieved.
+        """
+        token = token_manager.get_token()
+        if not token:
+            raise Exception("Authentication with backend failed")
+
+        try:
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+            response = backend_client.get(f"hotels/{hotel_id}", headers=headers)
+            if response.status_code == 401:
+                token_manager.invalidate()
+            if response.status_code != 200:
+                logger.error("Error fetching hotel %s: %s", hotel_id, response.status_code)
+                return None
+            return response.json()
+        except Exception as e:
+            logger.exception("Error fetching hotel %s: %s", hotel_id, e)
+            return None
+
+
+class NotificationExternalService:
+
+    @staticmethod
+    def send_smoke_alert(device_id: str, room_id: int, current_value: float, owner_id: int):
+        """
+        Posts a smoke alert notification to the hotel owner through the backend.
+
+        :param device_id: The ID of the smoke sensor.
+        :param room_id: The ID of the room where the sensor is located.
+        :param current_value: The analog value reported by the sensor.
+        :param owner_id: The ID of the hotel owner who receives the notification.
+        :return: The backend response.
+        """
+        token = token_manager.get_token()
+        if not token:
+            raise Exception("Authentication with backend failed")
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "title": "SMOKE SENSOR ALERT",
+            "content": "Alerta de humo detectado por el sensor con ID: " + device_id +
+                       " en la habitación con ID: " + str(room_id) +
+                       ". Alcanzó el valor: " + str(current_value),
+            "senderType": "System",
+            "senderId": 0,
+            "receiverId": owner_id,
+            "hotelId": HOTEL_ID
+        }
+        logger.debug("Sending smoke notification: %s", payload)
+
+        response = backend_client.post("notifications", json=payload, headers=headers)
+        if response.status_code == 401:
+            token_manager.invalidate()
+        return response
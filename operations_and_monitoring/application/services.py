@@ -1,36 +1,142 @@
 from operations_and_monitoring.infrastructure.repositories import MonitoringRepository
-from operations_and_monitoring.infrastructure.repositories import BookingRepository
+from operations_and_monitoring.infrastructure.repositories import BookingRepository, TelemetryRepository
+from operations_and_monitoring.domain.services import SmokeEvaluation, SmokeThresholdEngine, SmokeThresholds
+from operations_and_monitoring.infrastructure.cache import smoke_sensor_room_cache
+from operations_and_monitoring.application.workers import SmokeAlarmPromoter, SmokeReadingBuffer, smoke_alert_dispatcher, smoke_reading_buffer
+from operations_and_monitoring.application.workers import thermostat_reading_buffer, telemetry_partition_maintainer
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+import datetime, json, math, os
+
+logger = get_logger(__name__)
+
+# the state stored in smoke_sensors.state for each state of the threshold engine
+SMOKE_SENSOR_STATES = {SmokeEvaluation.NORMAL: "active", SmokeEvaluation.ALARM: "alarm"}
+
+
+def load_smoke_thresholds() -> tuple[SmokeThresholds, dict]:
+    """
+    Reads the smoke thresholds from the environment.
+
+    SMOKE_ROOM_THRESHOLDS is a JSON object keyed by room ID whose values override some of the
+    default settings for that room, e.g. `{"12": {"alarm": 250, "clear": 180}}` for a kitchen.
+
+    :return: The default thresholds and the thresholds of every room that has its own.
+    """
+    rate_of_rise = float(os.getenv("SMOKE_RATE_OF_RISE", "50"))
+    default = SmokeThresholds(
+        alarm=float(os.getenv("SMOKE_ALARM_THRESHOLD", "400")),
+        clear=float(os.getenv("SMOKE_CLEAR_THRESHOLD", "300")),
+        debounce_seconds=float(os.getenv("SMOKE_DEBOUNCE_SECONDS", "3")),
+        clear_seconds=float(os.getenv("SMOKE_CLEAR_SECONDS", "30")),
+        rate_of_rise=rate_of_rise if rate_of_rise > 0 else None
+    )
+
+    rooms = {}
+    try:
+        for room_id, overrides in json.loads(os.getenv("SMOKE_ROOM_THRESHOLDS", "{}")).items():
+            rooms[int(room_id)] = default.replace(**overrides)
+    except (TypeError, ValueError) as e:
+        logger.error("Ignoring SMOKE_ROOM_THRESHOLDS: %s", e)
+        rooms = {}
+    return default, rooms
+
+
+smoke_threshold_engine = SmokeThresholdEngine(*load_smoke_thresholds())
+register_metrics("smoke_thresholds", smoke_threshold_engine.stats)
+
+# the engine forgets the normal sensors that have not reported for this long
+SMOKE_SENSOR_IDLE = datetime.timedelta(seconds=float(os.getenv("SMOKE_SENSOR_IDLE_SECONDS", "3600")))
+
+# readings stamped further in the future than this are refused; the device clock is wrong
+MAX_CLOCK_SKEW = datetime.timedelta(seconds=float(os.getenv("TELEMETRY_MAX_CLOCK_SKEW_SECONDS", "300")))
+
+HISTORY_KINDS = tuple(TelemetryRepository.ROLLUP_DEVICE_MODELS)
+
 
 class MonitoringService:
     def __init__(self):
         self.monitoring_repository = MonitoringRepository()
 
-    def get_thermostats(self):
+    def get_thermostats_page(self, page):
         """
-        Retrieves devices associated with a specific hotel.
-        
-        :return: A list of devices associated with the hotel.
+        Retrieves one page of thermostats.
+
+        :param page: The page request.
+        :return: The page of thermostats.
         """
-        
-        return self.monitoring_repository.get_thermostats()
+
+        return self.monitoring_repository.get_thermostats_page(page)
+
+    def get_smoke_sensors_page(self, page):
+        """
+        Retrieves one page of smoke sensors.
+
+        :param page: The page request.
+        :return: The page of smoke sensors.
+        """
+
+        return self.monitoring_repository.get_smoke_sensors_page(page)
+
+    def get_rfid_page(self, page):
+        """
+        Retrieves one page of RFID devices.
+
+        :param page: The page request.
+        :return: The page of RFID devices.
+        """
+
+        return self.monitoring_repository.get_rfid_page(page)
+
+    def get_devices_page(self, page):
+        """
+        Retrieves one page of thermostats, smoke sensors and RFID devices.
+
+        :param page: The page request.
+        :return: The page, grouped by device kind.
+        """
+
+        return self.monitoring_repository.get_devices_page(page)
     
-    def get_smoke_sensors(self):
+    def stream_thermostats(self, page):
         """
-        Retrieves smoke sensors associated with a specific hotel.
-        
-        :return: A list of smoke sensors associated with the hotel.
+        Yields every thermostat, for streamed responses.
+
+        :param page: The page request.
+        :return: A generator of thermostats.
         """
-        
-        return self.monitoring_repository.get_smoke_sensors()
 
-    def get_rfid(self):
+        return self.monitoring_repository.stream_thermostats(page)
+
+    def stream_smoke_sensors(self, page):
         """
-        Retrieves RFID devices associated with a specific hotel.
+        Yields every smoke sensor, for streamed responses.
+
+        :param page: The page request.
+        :return: A generator of smoke sensors.
+        """
+
+        return self.monitoring_repository.stream_smoke_sensors(page)
+
+    def stream_rfid(self, page):
+        """
+        Yields every RFID device, for streamed responses.
+
+        :param page: The page request.
+        :return: A generator of RFID devices.
+        """
+
+        return self.monitoring_repository.stream_rfid(page)
 
-        :return: A list of RFID devices associated with the hotel.
+    def stream_devices(self, page):
         """
+        Reads every device list, for streamed responses.
 
-        return self.monitoring_repository.get_rfid()
+        :param page: The page request.
+        :return: A list of (device kind, generator) pairs.
+        """
+
+        return self.monitoring_repository.stream_devices(page)
     
     def add_thermostat(self, data):
         """
@@ -70,6 +176,251 @@ class MonitoringService:
 
         return self.monitoring_repository.validation_service(data)
 
+class SmokeDetectionService:
+    """
+    Runs the smoke readings through the threshold engine and acts only when a sensor changes state.
+
+    The latest value and state of every sensor go to the smoke reading buffer, which coalesces
+    them into batched UPDATEs; a reading that raises or clears an alarm makes it flush at once.
+    Only raising an alarm queues an alert for the backend.
+    """
+
+    def __init__(self, engine: SmokeThresholdEngine = None, repository: MonitoringRepository = None, buffer: SmokeReadingBuffer = None):
+        self.engine = engine or smoke_threshold_engine
+        self.monitoring_repository = repository or MonitoringRepository()
+        self.buffer = buffer or smoke_reading_buffer
+
+    def process_reading(self, device_id: str, value: float, recorded_at: datetime.datetime = None):
+        """
+        Evaluates one smoke reading, in the room the sensor is registered in.
+
+        :param device_id: The ID of the smoke sensor.
+        :param value: The analog value reported by the sensor.
+        :param recorded_at: When the value was read, as naive UTC; now when None.
+        :return: The evaluation (None for an unknown sensor), the queued alert (None unless an alarm was raised) and whether it was collapsed.
+        """
+        room_id = self.rooms_of([device_id]).get(device_id)
+        if room_id is None:
+            return None, None, False
+        if recorded_at is None:
+            recorded_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+
+        evaluation = self.engine.evaluate(device_id, room_id, value, recorded_at)
+        alert, collapsed = self._alert(evaluation)
+        self._store([evaluation])
+        return evaluation, alert, collapsed
+
+    def promote_due(self) -> int:
+        """
+        Raises the alarms whose debounce window passed without a newer reading, or whose alert
+        could not be queued before, and forgets the sensors idle for SMOKE_SENSOR_IDLE_SECONDS.
+
+        :return: The number of alarms raised.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+        self.engine.evict_idle(now - SMOKE_SENSOR_IDLE)
+        evaluations = self.engine.promote_due(now)
+        for evaluation in evaluations:
+            self._alert(evaluation)
+        self._store(evaluations)
+        return len(evaluations)
+
+    def ingest_readings(self, readings: list[tuple]) -> tuple[list, list, bool]:
+        """
+        Evaluates a batch of smoke readings, queues the alerts of the alarms they raise, then
+        queues the readings for the next coalesced write.
+
+        :param readings: (device_id, value, recorded_at) tuples, with naive UTC timestamps.
+        :return: The evaluation of every reading in order (None for readings of unknown sensors), the alert queued for every reading (None when none was, or it could not be), and False if the buffer was full.
+        """
+        rooms = self.rooms_of(list({device_id for device_id, _, _ in readings}))
+        evaluations = [
+            self.engine.evaluate(device_id, rooms[device_id], value, recorded_at) if device_id in rooms else None
+            for device_id, value, recorded_at in readings
+        ]
+        alerts = [self._alert(evaluation)[0] if evaluation is not None else None for evaluation in evaluations]
+        buffered = self._store([evaluation for evaluation in evaluations if evaluation is not None])
+        return evaluations, alerts, buffered
+
+    def rooms_of(self, device_ids: list[str]) -> dict:
+        """
+        Returns the room of every known smoke sensor among `device_ids`.
+
+        :param device_ids: The IDs of the smoke sensors.
+        :return: The room IDs keyed by device ID; unknown sensors are left out.
+        """
+        rooms = {}
+        for device_id in device_ids:
+            room_id = smoke_sensor_room_cache.get(device_id)
+            if room_id is not None:
+                rooms[device_id] = room_id
+        missing = [device_id for device_id in device_ids if device_id not in rooms]
+        if missing:
+            for device_id, room_id in self.monitoring_repository.get_smoke_sensor_rooms(missing).items():
+                smoke_sensor_room_cache.set(device_id, room_id)
+                rooms[device_id] = room_id
+        return rooms
+
+    def _store(self, evaluations: list) -> bool:
+        """
+        Hands the evaluated readings to the buffer, or writes the state changes directly when it is full.
+
+        :return: False if the buffer was full.
+        """
+        if not evaluations:
+            return True
+        entries = [(evaluation.device_id, evaluation.room_id, evaluation.value, evaluation.recorded_at,
+                    SMOKE_SENSOR_STATES[evaluation.state], evaluation.recorded_at if evaluation.raised else None)
+                   for evaluation in evaluations]
+        transitions = [entry for entry, evaluation in zip(entries, evaluations) if evaluation.transition]
+        if self.buffer.add(entries, urgent=bool(transitions)):
+            return True
+
+        # an alarm must reach the table even when the buffer is saturated; its alert is already queued
+        if transitions:
+            try:
+                self.monitoring_repository.update_smoke_sensor_states(
+                    {device_id: (value, state, alert_time) for device_id, _, value, _, state, alert_time in transitions},
+                    {device_id: room_id for device_id, room_id, *_ in transitions}
+                )
+            except Exception as e:
+                logger.error("Could not write %d smoke sensor state change(s) with the buffer full: %s", len(transitions), e)
+        return False
+
+    def _alert(self, evaluation) -> tuple:
+        """
+        Queues an alert when the evaluation raised an alarm.
+
+        When the alert cannot be stored the alarm is reverted in the engine, so it is raised again
+        by the next reading or by the debounce worker instead of being silenced until it clears.
+
+        :return: The queued alert, or None, and whether it was collapsed into a recent one.
+        """
+        if evaluation.cleared:
+            logger.info("Smoke alarm of device %s in room %s cleared at %s.", evaluation.device_id, evaluation.room_id, evaluation.value)
+        if not evaluation.raised:
+            return None, False
+
+        logger.warning("Smoke alarm raised by device %s in room %s (%s, value %s).",
+                       evaluation.device_id, evaluation.room_id, evaluation.reason, evaluation.value)
+        try:
+            alert, collapsed = smoke_alert_dispatcher.enqueue(evaluation.device_id, evaluation.room_id, evaluation.value)
+        except Exception as e:
+            logger.exception("Error queuing the smoke alert of device %s: %s", evaluation.device_id, e)
+            alert, collapsed = None, False
+        if alert is None:
+            self.engine.revert(evaluation)
+            logger.error("The smoke alert of device %s could not be queued; it will be raised again.", evaluation.device_id)
+        return alert, collapsed
+
+
+smoke_detection_service = SmokeDetectionService()
+smoke_alarm_promoter = SmokeAlarmPromoter(smoke_detection_service.promote_due)
+
+
+class TelemetryService:
+    """
+    Validates the telemetry posted by the devices and answers the history queries from the rollups.
+    """
+
+    def __init__(self, repository: TelemetryRepository = None, smoke_detection: SmokeDetectionService = None):
+        self.telemetry_repository = repository or TelemetryRepository()
+        self.smoke_detection_service = smoke_detection or smoke_detection_service
+
+    def ingest_thermostat_readings(self, items: list) -> tuple[int, list[dict], bool]:
+        """
+        Validates a batch of thermostat readings and queues the valid ones for the next bulk write.
+
+        :param items: Readings with `device_id`, `temperature` and an optional ISO 8601 `recorded_at`; readings without one are stamped now.
+        :return: The number of accepted readings, the index and error of every rejected one, and False if the write buffer is full.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+        readings, rejected = [], []
+        for index, item in enumerate(items):
+            try:
+                readings.append(_parse_reading(item, now))
+            except ValueError as e:
+                rejected.append({"index": index, "error": str(e)})
+
+        if readings and not thermostat_reading_buffer.add(readings):
+            return 0, rejected, False
+        return len(readings), rejected, True
+
+    def ingest_smoke_readings(self, items: list) -> tuple[int, list[dict], list[dict], bool]:
+        """
+        Validates a batch of smoke readings, evaluates them against the smoke thresholds and queues
+        the latest value of every sensor for the next coalesced write.
+
+        :param items: Readings with `device_id`, `value` and an optional ISO 8601 `recorded_at`; readings without one are stamped now.
+        :return: The number of accepted readings, the index and error of every rejected one, the alarm state changes with the alert queued for each raised alarm, and False if the write buffer is full.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+        indexes, readings, rejected = [], [], []
+        for index, item in enumerate(items):
+            try:
+                readings.append(_parse_reading(item, now, "value"))
+                indexes.append(index)
+            except ValueError as e:
+                rejected.append({"index": index, "error": str(e)})
+
+        evaluations, alerts, buffered = self.smoke_detection_service.ingest_readings(readings) if readings else ([], [], True)
+        accepted, transitions = 0, []
+        for index, evaluation, alert in zip(indexes, evaluations, alerts):
+            if evaluation is None:
+                rejected.append({"index": index, "error": "Unknown smoke sensor"})
+                continue
+            accepted += 1
+            if evaluation.transition:
+                transition = evaluation.to_dict()
+                if evaluation.raised:
+                    # a failed alert is raised again by the smoke alarm promoter
+                    transition["alert_id"] = alert.id if alert else None
+                    transition["alert_queued"] = alert is not None
+                transitions.append(transition)
+        rejected.sort(key=lambda reading: reading["index"])
+        return accepted, rejected, transitions, buffered
+
+    def get_history(self, kind: str, scope: str, scope_id: str, start: datetime.datetime, end: datetime.datetime,
+                    max_points: int, resolution: int = None) -> dict:
+        """
+        Returns the min/max/avg of a device or room over a time range, from the rollups.
+
+        Without an explicit resolution, the finest rollup that still covers the start of the range
+        and returns at most `max_points` buckets is used. When even the coarsest rollup has more
+        buckets than that, consecutive buckets are merged until the budget is met.
+
+        :param kind: The device kind, one of HISTORY_KINDS.
+        :param scope: 'device' or 'room'.
+        :param scope_id: The device ID, or the room ID.
+        :param start: The start of the range, naive UTC.
+        :param end: The end of the range, naive UTC.
+        :param max_points: The maximum number of points to return.
+        :param resolution: A rollup resolution in seconds to use instead of choosing one.
+        :return: The resolution used, the step between points and the points.
+        """
+        if resolution is None:
+            resolution = _choose_resolution(start, end, max_points, telemetry_partition_maintainer.rollup_retention_days)
+        elif resolution not in TelemetryRepository.ROLLUP_RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {', '.join(map(str, TelemetryRepository.ROLLUP_RESOLUTIONS))}")
+
+        aligned = _align(start, resolution)
+        buckets = self.telemetry_repository.get_rollups(kind, scope, str(scope_id), resolution, aligned, end)
+        step = resolution * max(1, math.ceil((end - aligned).total_seconds() / resolution / max_points))
+        return {
+            "kind": kind,
+            "scope": scope,
+            "id": scope_id,
+            "from": start.isoformat() + "Z",
+            "to": end.isoformat() + "Z",
+            "resolution_seconds": resolution,
+            "step_seconds": step,
+            "points": _merge_buckets(buckets, aligned, step)
+        }
+
+
+telemetry_service = TelemetryService()
+
+
 class BookingService:
     def __init__(self):
         self.booking_repository = BookingRepository()
@@ -112,4 +463,96 @@ class BookingService:
         :return: The updated booking entity after check-out.
         """
         
-        return self.booking_repository.check_out(booking_id)
\ No newline at end of file
+        return self.booking_repository.check_out(booking_id)
+
+
+def _parse_reading(item, now: datetime.datetime, field: str = "temperature") -> tuple:
+    """
+    Turns one reading of the ingestion payload into the tuple buffered for writing.
+
+    :param item: The reading sent by the client.
+    :param now: The current time as naive UTC, used when the reading has no timestamp.
+    :param field: The name of the measured value in the reading.
+    :return: (device_id, value, recorded_at), with recorded_at as naive UTC.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Each reading must be an object")
+
+    device_id = item.get("device_id")
+    if not isinstance(device_id, str) or not device_id or len(device_id) > 100:
+        raise ValueError("device_id must be a non-empty string of at most 100 characters")
+
+    value = item.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{field} must be a number")
+
+    recorded_at = item.get("recorded_at")
+    if recorded_at is None:
+        return device_id, float(value), now
+    try:
+        recorded_at = datetime.datetime.fromisoformat(recorded_at)
+    except (TypeError, ValueError):
+        raise ValueError("recorded_at must be an ISO 8601 timestamp")
+    if recorded_at.tzinfo is not None:
+        recorded_at = recorded_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    recorded_at = recorded_at.replace(microsecond=0)
+    if recorded_at > now + MAX_CLOCK_SKEW:
+        raise ValueError("recorded_at is in the future")
+    return device_id, float(value), recorded_at
+
+
+def _choose_resolution(start: datetime.datetime, end: datetime.datetime, max_points: int, retention_days: dict) -> int:
+    """
+    Picks the rollup resolution for a history query.
+
+    :param start: The start of the range, naive UTC.
+    :param end: The end of the range, naive UTC.
+    :param max_points: The maximum number of points to return.
+    :param retention_days: Days kept per resolution; finer rollups are not kept as long.
+    :return: The finest resolution whose rollups reach back to `start` with at most `max_points` buckets, else the coarsest.
+    """
+    window = (end - start).total_seconds()
+    age = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - start
+    resolutions = sorted(retention_days)
+    for resolution in resolutions:
+        if age <= datetime.timedelta(days=retention_days[resolution]) and math.ceil(window / resolution) <= max_points:
+            return resolution
+    return resolutions[-1]
+
+
+def _align(moment: datetime.datetime, seconds: int) -> datetime.datetime:
+    """
+    Rounds a naive UTC time down to a multiple of `seconds`, the way the rollup buckets are aligned.
+    """
+    offset = int((moment - TelemetryRepository.ROLLUP_EPOCH).total_seconds())
+    return TelemetryRepository.ROLLUP_EPOCH + datetime.timedelta(seconds=offset - offset % seconds)
+
+
+def _merge_buckets(buckets: list[tuple], origin: datetime.datetime, step: int) -> list[dict]:
+    """
+    Turns rollup buckets into points, merging the buckets that fall in the same step.
+
+    :param buckets: (bucket_start, samples, total, min_value, max_value) tuples in time order.
+    :param origin: The aligned start of the range; points start at origin + n * step.
+    :param step: The seconds covered by one point.
+    :return: The points, with their start time, sample count, average, minimum and maximum.
+    """
+    points = []
+    current = None
+    for bucket_start, samples, total, low, high in buckets:
+        point_start = origin + datetime.timedelta(seconds=(bucket_start - origin).total_seconds() // step * step)
+        if current is None or current[0] != point_start:
+            current = [point_start, samples, total, low, high]
+            points.append(current)
+        else:
+            current[1] += samples
+            current[2] += total
+            current[3] = min(current[3], low)
+            current[4] = max(current[4], high)
+    return [{
+        "t": point_start.isoformat() + "Z",
+        "count": samples,
+        "avg": round(total / samples, 3),
+        "min": low,
+        "max": high
+    } for point_start, samples, total, low, high in points]
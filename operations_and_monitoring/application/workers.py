@@ -0,0 +1,624 @@
+from dotenv import load_dotenv
+from collections import deque
+from operations_and_monitoring.application.external.services import DeviceExternalService, NotificationExternalService
+from operations_and_monitoring.infrastructure.cache import hotel_metadata_cache
+from operations_and_monitoring.infrastructure.repositories import MonitoringRepository, SmokeAlertRepository, TelemetryRepository
+from shared.infrastructure.hotelconfig import HOTEL_ID
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+from shared.infrastructure.workers import BackgroundWorker
+import datetime, hashlib, os, random, threading, time
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class DeviceRegistrySyncWorker(BackgroundWorker):
+    """
+    Mirrors the backend thermostat and RFID lists into the local device tables.
+
+    Runs every DEVICE_SYNC_INTERVAL_SECONDS and whenever it is triggered. Unchanged lists are
+    detected with the backend ETag/Last-Modified validators when present, and otherwise with a
+    hash of the payload, so the database is only written when something changed.
+    """
+
+    def __init__(self, repository: MonitoringRepository = None, interval: float = None):
+        super().__init__("device-registry-sync", interval if interval is not None else float(os.getenv("DEVICE_SYNC_INTERVAL_SECONDS", "300")))
+        self.repository = repository or MonitoringRepository()
+        self._lock = threading.Lock()
+        self._state = {resource: {
+            "etag": None,
+            "last_modified": None,
+            "digest": None,
+            "last_synced_at": None,
+            "last_attempt_at": None,
+            "last_result": None,
+            "last_error": None
+        } for resource in DeviceExternalService.RESOURCES}
+
+    def run_once(self):
+        for resource in DeviceExternalService.RESOURCES:
+            self.sync(resource)
+
+    def sync(self, resource: str):
+        """
+        Synchronizes one device list with the backend.
+
+        :param resource: One of the resources of `DeviceExternalService.RESOURCES`.
+        """
+        state = self._state[resource]
+        state["last_attempt_at"] = time.time()
+        try:
+            response = DeviceExternalService.fetch_devices(resource, state["etag"], state["last_modified"])
+
+            if response.status_code == 304:
+                result = "not_modified"
+            elif response.status_code == 200:
+                digest = hashlib.sha256(response.content).hexdigest()
+                if digest == state["digest"]:
+                    result = "unchanged"
+                else:
+                    data = response.json()
+                    if resource == "thermostats":
+                        counts = self.repository.sync_thermostats(data)
+                    else:
+                        counts = self.repository.sync_rfids(data)
+                    result = counts
+                    # skipped rows are retried on the next sync even if the payload does not change
+                    if not counts.get("conflicts"):
+                        state["digest"] = digest
+                state["etag"] = response.headers.get("ETag")
+                state["last_modified"] = response.headers.get("Last-Modified")
+            else:
+                raise Exception(f"Error fetching {resource}: {response.status_code}")
+        except Exception as e:
+            with self._lock:
+                state["last_error"] = str(e)
+            logger.error("Failed to sync %s: %s", resource, e)
+            return
+
+        with self._lock:
+            state["last_synced_at"] = time.time()
+            state["last_result"] = result
+            state["last_error"] = None
+
+    def freshness(self, resource: str) -> dict:
+        """
+        Describes how old the local copy of a device list is.
+
+        :param resource: One of the resources of `DeviceExternalService.RESOURCES`.
+        :return: A dictionary with the last successful sync time, its age in seconds and the last error.
+        """
+        with self._lock:
+            state = self._state[resource]
+            synced_at = state["last_synced_at"]
+            return {
+                "last_synced_at": datetime.datetime.fromtimestamp(synced_at, datetime.timezone.utc).isoformat() if synced_at else None,
+                "age_seconds": round(time.time() - synced_at) if synced_at else None,
+                "last_error": state["last_error"]
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {}
+            for resource, state in self._state.items():
+                stats[resource] = {
+                    "last_result": state["last_result"],
+                    "last_error": state["last_error"],
+                    "age_seconds": round(time.time() - state["last_synced_at"]) if state["last_synced_at"] else None
+                }
+            return stats
+
+
+class SmokeAlertDispatcher(BackgroundWorker):
+    """
+    Delivers the queued smoke alerts to the backend notifications endpoint.
+
+    The notifications route only stores the alert and triggers this worker, so a slow or
+    unreachable backend never blocks the sensor. Failed deliveries are retried with a jittered
+    exponential backoff until SMOKE_ALERT_MAX_ATTEMPTS is reached; alerts of the same sensor and
+    room raised within SMOKE_ALERT_COLLAPSE_WINDOW_SECONDS are collapsed into one notification.
+    """
+
+    def __init__(self, repository: SmokeAlertRepository = None, interval: float = None):
+        super().__init__("smoke-alert-dispatcher", interval if interval is not None else float(os.getenv("SMOKE_ALERT_DISPATCH_INTERVAL", "5")))
+        self.repository = repository or SmokeAlertRepository()
+        self.collapse_window = float(os.getenv("SMOKE_ALERT_COLLAPSE_WINDOW_SECONDS", "60"))
+        self.max_attempts = int(os.getenv("SMOKE_ALERT_MAX_ATTEMPTS", "8"))
+        self.batch_size = int(os.getenv("SMOKE_ALERT_BATCH_SIZE", "50"))
+        self.retry_base = float(os.getenv("SMOKE_ALERT_RETRY_BASE_SECONDS", "2"))
+        self.retry_max = float(os.getenv("SMOKE_ALERT_RETRY_MAX_SECONDS", "300"))
+        # a claimed alert is retried after this long if its delivery never settled (e.g. the process died)
+        self.lease = float(os.getenv("SMOKE_ALERT_LEASE_SECONDS", "60"))
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._enqueued = 0
+        self._collapsed = 0
+        self._delivered = 0
+        self._retries = 0
+        self._failed = 0
+
+    def enqueue(self, device_id: str, room_id: int, current_value: float):
+        """
+        Stores a smoke alert and wakes the dispatcher.
+
+        :param device_id: The ID of the smoke sensor.
+        :param room_id: The ID of the room where the sensor is located.
+        :param current_value: The analog value reported by the sensor.
+        :return: The stored alert and whether it was collapsed into a recent one.
+        """
+        alert, collapsed = self.repository.enqueue(device_id, room_id, current_value, self.collapse_window)
+        if alert is None:
+            return None, False
+
+        with self._lock:
+            if collapsed:
+                self._collapsed += 1
+            else:
+                self._enqueued += 1
+        if not collapsed:
+            self.trigger()
+        return alert, collapsed
+
+    def run_once(self):
+        while True:
+            alerts = self.repository.claim_due(self.batch_size, self.lease)
+            for alert in alerts:
+                self.deliver(alert)
+            if len(alerts) < self.batch_size:
+                return
+
+    def deliver(self, alert):
+        """
+        Sends one claimed alert and records the outcome.
+
+        :param alert: The claimed SmokeAlert.
+        """
+        try:
+            owner_id = hotel_metadata_cache.owner_id(HOTEL_ID)
+            if owner_id is None:
+                raise Exception(f"Owner of hotel {HOTEL_ID} is unknown")
+
+            response = NotificationExternalService.send_smoke_alert(alert.device_id, alert.room_id, alert.current_value, owner_id)
+            if response.status_code not in (200, 201):
+                raise Exception(f"Backend answered {response.status_code}")
+        except Exception as e:
+            self._retry_or_fail(alert, str(e))
+            return
+
+        delivered_at = self.repository.mark_delivered(alert.id)
+        with self._lock:
+            self._delivered += 1
+            if delivered_at:
+                self._latencies.append((delivered_at - alert.created_at).total_seconds())
+        logger.info("Smoke alert %s of device %s in room %s delivered after %d attempt(s).", alert.id, alert.device_id, alert.room_id, alert.attempts)
+
+    def _retry_or_fail(self, alert, error: str):
+        if alert.attempts >= self.max_attempts:
+            self.repository.mark_failed(alert.id, error, None)
+            with self._lock:
+                self._failed += 1
+            logger.error("Giving up on smoke alert %s of device %s after %d attempts: %s", alert.id, alert.device_id, alert.attempts, error)
+            return
+
+        # full jitter keeps a fleet of alerts from retrying against a recovering backend in lockstep
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** alert.attempts))
+        retry_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0) + datetime.timedelta(seconds=max(1.0, delay))
+        self.repository.mark_failed(alert.id, error, retry_at)
+        with self._lock:
+            self._retries += 1
+        logger.warning("Smoke alert %s delivery failed (attempt %d), retrying at %s: %s", alert.id, alert.attempts, retry_at.isoformat(), error)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "enqueued": self._enqueued,
+                "collapsed": self._collapsed,
+                "delivered": self._delivered,
+                "retries": self._retries,
+                "failed": self._failed,
+                "latency_seconds_avg": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "latency_seconds_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+                "latency_seconds_max": latencies[-1] if latencies else None
+            }
+        try:
+            stats["queue"] = self.repository.count_by_status()
+        except Exception:
+            stats["queue"] = None
+        return stats
+
+
+class ThermostatReadingBuffer(BackgroundWorker):
+    """
+    In-process write buffer between the telemetry ingestion route and the readings table.
+
+    The route only appends readings to memory; this worker writes them in bulk when
+    TELEMETRY_FLUSH_SIZE readings are waiting or TELEMETRY_FLUSH_INTERVAL_SECONDS have passed,
+    whichever comes first. A flush that fails is retried on the next cycle. The buffer holds at
+    most TELEMETRY_BUFFER_LIMIT readings; beyond that new batches are refused, so a database
+    outage cannot exhaust the memory of the node.
+
+    After TELEMETRY_FLUSH_MAX_ATTEMPTS failed flushes in a row the batch is split and written in
+    smaller parts; a single reading that still fails while the database answers is moved to a
+    bounded dead-letter list, so one bad reading cannot block the ingestion for good.
+    """
+
+    def __init__(self, repository: TelemetryRepository = None, interval: float = None):
+        super().__init__("thermostat-reading-buffer", interval if interval is not None else float(os.getenv("TELEMETRY_FLUSH_INTERVAL_SECONDS", "1")))
+        self.repository = repository or TelemetryRepository()
+        self.flush_size = int(os.getenv("TELEMETRY_FLUSH_SIZE", "2000"))
+        self.limit = int(os.getenv("TELEMETRY_BUFFER_LIMIT", "50000"))
+        self.max_attempts = int(os.getenv("TELEMETRY_FLUSH_MAX_ATTEMPTS", "3"))
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._flush_durations = deque(maxlen=100)
+        self._accepted = 0
+        self._refused = 0
+        self._written = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._consecutive_failures = 0
+        self._thermostats_updated = 0
+        self.dead_letters = deque(maxlen=int(os.getenv("TELEMETRY_DEAD_LETTER_LIMIT", "1000")))
+        self._dead_lettered = 0
+
+    def add(self, readings: list[tuple]) -> bool:
+        """
+        Queues readings for the next flush.
+
+        :param readings: (device_id, temperature, recorded_at) tuples.
+        :return: False if the buffer is full and the readings were refused.
+        """
+        with self._lock:
+            if len(self._pending) + len(readings) > self.limit:
+                self._refused += len(readings)
+                return False
+            self._pending.extend(readings)
+            self._accepted += len(readings)
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self.trigger()
+        return True
+
+    def run_once(self):
+        self.flush()
+
+    def stop(self, timeout: float = None):
+        """
+        Stops the worker and writes the readings still in memory.
+
+        :param timeout: Maximum number of seconds to wait for the thread.
+        """
+        super().stop(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.exception("Error writing the buffered thermostat readings on shutdown: %s", e)
+
+    def flush(self) -> int:
+        """
+        Writes every buffered reading.
+
+        :return: The number of readings written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                readings, self._pending = self._pending, []
+            if not readings:
+                return 0
+
+            start = time.perf_counter()
+            if self._consecutive_failures >= self.max_attempts:
+                written, updated = self._write_isolated(readings)
+            else:
+                try:
+                    updated = self.repository.add_thermostat_readings(readings)
+                except Exception:
+                    self._requeue(readings)
+                    raise
+                written = len(readings)
+                with self._lock:
+                    self._consecutive_failures = 0
+
+            with self._lock:
+                self._flush_durations.append(time.perf_counter() - start)
+                self._flushes += 1
+                self._written += written
+                self._thermostats_updated += updated
+            logger.debug("Flushed %d thermostat readings, %d thermostats updated.", written, updated)
+            return written
+
+    def _requeue(self, readings: list[tuple]):
+        with self._lock:
+            # keep the readings for the next cycle, ahead of the ones that arrived meanwhile
+            self._pending[:0] = readings
+            self._failed_flushes += 1
+            self._consecutive_failures += 1
+
+    def _write_isolated(self, readings: list[tuple]) -> tuple[int, int]:
+        """
+        Writes a batch that keeps failing by halves, down to single readings.
+
+        A single reading that fails while the database answers is dead-lettered; if the database
+        does not answer, what was not written yet is kept for the next cycle and the error is raised.
+
+        :return: The number of readings written and of thermostats updated.
+        """
+        written = updated = 0
+        parts = [readings]
+        while parts:
+            part = parts.pop()
+            try:
+                updated += self.repository.add_thermostat_readings(part)
+                written += len(part)
+                continue
+            except Exception as e:
+                error = e
+            if len(part) > 1:
+                middle = len(part) // 2
+                parts.extend((part[middle:], part[:middle]))
+            elif self.repository.is_available():
+                logger.error("Dropping thermostat reading %s to the dead-letter list: %s", part[0], error)
+                with self._lock:
+                    self.dead_letters.append((part[0], str(error)))
+                    self._dead_lettered += 1
+            else:
+                self._requeue(part + [reading for rest in reversed(parts) for reading in rest])
+                with self._lock:
+                    self._written += written
+                    self._thermostats_updated += updated
+                raise error
+
+        with self._lock:
+            self._consecutive_failures = 0
+        return written, updated
+
+    def stats(self) -> dict:
+        with self._lock:
+            durations = self._flush_durations
+            return {
+                "buffered": len(self._pending),
+                "accepted": self._accepted,
+                "refused": self._refused,
+                "written": self._written,
+                "flushes": self._flushes,
+                "failed_flushes": self._failed_flushes,
+                "dead_lettered": self._dead_lettered,
+                "thermostats_updated": self._thermostats_updated,
+                "flush_seconds_avg": round(sum(durations) / len(durations), 4) if durations else None,
+                "flush_seconds_max": round(max(durations), 4) if durations else None
+            }
+
+
+class SmokeReadingBuffer(BackgroundWorker):
+    """
+    Coalesces the smoke readings into periodic batched writes of the smoke sensor table.
+
+    Only the newest value and state of every sensor is kept in memory, so a sensor reporting many
+    times between two flushes costs one row of a CASE-based UPDATE instead of one UPDATE per
+    reading. Flushes run every SMOKE_FLUSH_INTERVAL_SECONDS, and at once when a reading changed the
+    alarm state of its sensor. Every reading is also kept until the flush for the smoke sensor
+    rollups; at most SMOKE_BUFFER_LIMIT of them, beyond that new batches are refused.
+    """
+
+    def __init__(self, monitoring_repository: MonitoringRepository = None, telemetry_repository: TelemetryRepository = None, interval: float = None):
+        super().__init__("smoke-reading-buffer", interval if interval is not None else float(os.getenv("SMOKE_FLUSH_INTERVAL_SECONDS", "5")))
+        self.monitoring_repository = monitoring_repository or MonitoringRepository()
+        self.telemetry_repository = telemetry_repository or TelemetryRepository()
+        self.limit = int(os.getenv("SMOKE_BUFFER_LIMIT", "50000"))
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # device_id -> (value, state, recorded_at, alert_time)
+        self._latest = {}
+        # device_id -> room_id, for the live device feed
+        self._rooms = {}
+        self._readings = []
+        self._accepted = 0
+        self._refused = 0
+        self._stale = 0
+        self._rows_written = 0
+        self._statements = 0
+        self._flushes = 0
+        self._urgent_flushes = 0
+        self._failed_flushes = 0
+
+    def add(self, readings: list[tuple], urgent: bool = False) -> bool:
+        """
+        Queues readings for the next flush.
+
+        :param readings: (device_id, room_id, value, recorded_at, state, alert_time) tuples; alert_time is None unless the reading raised an alarm.
+        :param urgent: Flush now, because a reading changed the alarm state of its sensor.
+        :return: False if the buffer is full and the readings were refused.
+        """
+        with self._lock:
+            if len(self._readings) + len(readings) > self.limit:
+                self._refused += len(readings)
+                return False
+            for device_id, room_id, value, recorded_at, state, alert_time in readings:
+                self._readings.append((device_id, value, recorded_at))
+                self._rooms[device_id] = room_id
+                self._keep_latest(device_id, (value, state, recorded_at, alert_time))
+            self._accepted += len(readings)
+            if urgent:
+                self._urgent_flushes += 1
+        if urgent:
+            self.trigger()
+        return True
+
+    def _keep_latest(self, device_id: str, entry: tuple):
+        # called with the lock held; an older reading never replaces a newer one, but keeps its alert time
+        current = self._latest.get(device_id)
+        if current is None:
+            self._latest[device_id] = entry
+        elif entry[2] >= current[2]:
+            self._latest[device_id] = entry if entry[3] is not None or current[3] is None else entry[:3] + (current[3],)
+        else:
+            self._stale += 1
+            if entry[3] is not None and current[3] is None:
+                self._latest[device_id] = current[:3] + (entry[3],)
+
+    def run_once(self):
+        self.flush()
+
+    def stop(self, timeout: float = None):
+        """
+        Stops the worker and writes the readings still in memory.
+
+        :param timeout: Maximum number of seconds to wait for the thread.
+        """
+        super().stop(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.exception("Error writing the buffered smoke readings on shutdown: %s", e)
+
+    def flush(self) -> int:
+        """
+        Writes the latest state of every sensor that reported, then folds the readings into the rollups.
+
+        :return: The number of sensors updated.
+        """
+        with self._flush_lock:
+            with self._lock:
+                latest, self._latest = self._latest, {}
+                readings, self._readings = self._readings, []
+                rooms = {device_id: self._rooms.get(device_id) for device_id in latest}
+            if not latest and not readings:
+                return 0
+
+            try:
+                updated, statements = self.monitoring_repository.update_smoke_sensor_states(
+                    {device_id: (value, state, alert_time) for device_id, (value, state, _, alert_time) in latest.items()}, rooms
+                )
+            except Exception:
+                with self._lock:
+                    # newer values that arrived meanwhile win over the requeued ones
+                    for device_id, entry in latest.items():
+                        self._keep_latest(device_id, entry)
+                    self._readings[:0] = readings
+                    self._failed_flushes += 1
+                raise
+
+            with self._lock:
+                self._flushes += 1
+                self._rows_written += updated
+                self._statements += statements
+
+            try:
+                self.telemetry_repository.add_rollups("smoke_sensor", readings)
+            except Exception:
+                with self._lock:
+                    self._readings[:0] = readings
+                    self._failed_flushes += 1
+                raise
+            logger.debug("Flushed %d smoke readings, %d sensors updated.", len(readings), updated)
+            return updated
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered_sensors": len(self._latest),
+                "buffered_readings": len(self._readings),
+                "accepted": self._accepted,
+                "refused": self._refused,
+                "stale": self._stale,
+                "flushes": self._flushes,
+                "urgent_flushes": self._urgent_flushes,
+                "failed_flushes": self._failed_flushes,
+                "rows_written": self._rows_written,
+                "update_statements": self._statements,
+                # one UPDATE per reading is what the writes are compared with
+                "writes_saved": self._accepted - self._statements,
+                "write_amplification_saved": round(self._accepted / self._statements, 1) if self._statements else None
+            }
+
+
+class SmokeAlarmPromoter(BackgroundWorker):
+    """
+    Raises the smoke alarms that no reading would raise: sensors that reported a value at or above
+    their alarm level once and then went quiet before the debounce window passed, and alarms whose
+    alert could not be queued. Runs every SMOKE_DEBOUNCE_CHECK_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, promote, interval: float = None):
+        super().__init__("smoke-alarm-promoter", interval if interval is not None else float(os.getenv("SMOKE_DEBOUNCE_CHECK_INTERVAL_SECONDS", "1")))
+        self.promote = promote
+
+    def run_once(self):
+        raised = self.promote()
+        if raised:
+            logger.info("Raised %d debounced smoke alarm(s).", raised)
+
+
+class TelemetryPartitionMaintainer(BackgroundWorker):
+    """
+    Keeps a daily partition ready in the readings table for the next TELEMETRY_PARTITION_DAYS_AHEAD
+    days and drops the partitions older than TELEMETRY_RETENTION_DAYS.
+
+    Also deletes the rollup buckets past their retention, which grows with the resolution:
+    TELEMETRY_ROLLUP_RETENTION_DAYS lists the days kept for the 1-minute, 15-minute and 1-hour rollups.
+    """
+
+    def __init__(self, repository: TelemetryRepository = None, interval: float = None):
+        super().__init__("telemetry-partition-maintainer", interval if interval is not None else float(os.getenv("TELEMETRY_PARTITION_CHECK_INTERVAL", "3600")))
+        self.repository = repository or TelemetryRepository()
+        self.days_ahead = int(os.getenv("TELEMETRY_PARTITION_DAYS_AHEAD", "7"))
+        self.retention_days = int(os.getenv("TELEMETRY_RETENTION_DAYS", "30"))
+        self.rollup_retention_days = dict(zip(
+            TelemetryRepository.ROLLUP_RESOLUTIONS,
+            (int(days) for days in os.getenv("TELEMETRY_ROLLUP_RETENTION_DAYS", "7,90,730").split(","))
+        ))
+
+    def run_once(self):
+        self.prune_rollups()
+        self.maintain_partitions()
+
+    def prune_rollups(self):
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        for resolution, days in self.rollup_retention_days.items():
+            deleted = self.repository.prune_rollups(resolution, now - datetime.timedelta(days=days))
+            if deleted:
+                logger.info("Deleted %d %ds rollup buckets older than %d days.", deleted, resolution, days)
+
+    def maintain_partitions(self):
+        partitions = self.repository.get_reading_partitions()
+        if "pmax" not in partitions:
+            logger.warning("The thermostat readings table is not partitioned; skipping partition maintenance.")
+            return
+
+        daily = {datetime.datetime.strptime(name[1:], "%Y%m%d").date(): name for name in partitions if name != "pmax"}
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+
+        first_missing = max(daily) + datetime.timedelta(days=1) if daily else today
+        missing = [first_missing + datetime.timedelta(days=offset)
+                   for offset in range((today + datetime.timedelta(days=self.days_ahead) - first_missing).days + 1)]
+        if missing:
+            self.repository.add_reading_partitions(missing)
+            logger.info("Created %d thermostat reading partitions up to %s.", len(missing), missing[-1].isoformat())
+
+        cutoff = today - datetime.timedelta(days=self.retention_days)
+        expired = [name for day, name in sorted(daily.items()) if day < cutoff]
+        if expired:
+            self.repository.drop_reading_partitions(expired)
+            logger.info("Dropped %d thermostat reading partitions older than %s.", len(expired), cutoff.isoformat())
+
+
+device_sync_worker = DeviceRegistrySyncWorker()
+register_metrics("device_sync", device_sync_worker.stats)
+
+smoke_alert_dispatcher = SmokeAlertDispatcher()
+register_metrics("smoke_alerts", smoke_alert_dispatcher.stats)
+
+thermostat_reading_buffer = ThermostatReadingBuffer()
+register_metrics("thermostat_readings", thermostat_reading_buffer.stats)
+
+smoke_reading_buffer = SmokeReadingBuffer()
+register_metrics("smoke_readings", smoke_reading_buffer.stats)
+
+telemetry_partition_maintainer = TelemetryPartitionMaintainer()
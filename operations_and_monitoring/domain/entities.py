@@ -1,6 +1,8 @@
 ﻿from iam.domain.entities import Device
 
 class Thermostat(Device):
+    __slots__ = ("id", "ip_address", "mac_address", "temperature", "last_update", "room_id", "state")
+
     def __init__(self, id: int, device_id: str, api_key: str, ip_address: str, mac_address: str, temperature: float, last_update: str, room_id: int, state: str = None):
         super().__init__(device_id, api_key)
         self.id = id
@@ -25,6 +27,8 @@ class Thermostat(Device):
         }
 
 class SmokeSensor(Device):
+    __slots__ = ("id", "ip_address", "mac_address", "last_analogic_value", "last_alert_time", "room_id", "state")
+
     def __init__(self, id: int, device_id: str, api_key: str, ip_address: str, mac_address: str, last_analogic_value: float, room_id: int, last_alert_time: str = None, state: str = None):
         super().__init__(device_id, api_key)
         self.id = id
@@ -47,7 +51,40 @@ class SmokeSensor(Device):
             "room_id": self.room_id
         }
 
+class SmokeAlert:
+    __slots__ = ("id", "device_id", "room_id", "current_value", "status", "attempts", "collapsed_count", "created_at", "next_attempt_at", "delivered_at", "last_error")
+
+    def __init__(self, id: int, device_id: str, room_id: int, current_value: float, status: str, attempts: int, collapsed_count: int, created_at, next_attempt_at, delivered_at=None, last_error: str = None):
+        self.id = id
+        self.device_id = device_id
+        self.room_id = room_id
+        self.current_value = current_value
+        self.status = status
+        self.attempts = attempts
+        self.collapsed_count = collapsed_count
+        self.created_at = created_at
+        self.next_attempt_at = next_attempt_at
+        self.delivered_at = delivered_at
+        self.last_error = last_error
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "device_id": self.device_id,
+            "room_id": self.room_id,
+            "current_value": self.current_value,
+            "status": self.status,
+            "attempts": self.attempts,
+            "collapsed_count": self.collapsed_count,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "delivered_at": self.delivered_at.isoformat() if self.delivered_at else None,
+            "last_error": self.last_error
+        }
+
 class Booking:
+    __slots__ = ("id", "payment_customer_id", "room_id", "description", "start_date", "final_date", "price_room", "night_count", "amount", "state", "preference_id")
+
     def __init__(self, id: int, payment_customer_id: int, room_id: int, description: str, start_date: str, final_date: str, price_room: float, night_count:int, amount: float, state: str, preference_id: int = None):
         self.id = id
         self.payment_customer_id = payment_customer_id
@@ -77,6 +114,8 @@ class Booking:
         }
 
 class Room:
+    __slots__ = ("id", "type_room_id", "hotel_id", "state")
+
     def __init__(self, id: int, type_room_id: int, hotel_id: int, state: str):
         self.id = id
         self.type_room_id = type_room_id
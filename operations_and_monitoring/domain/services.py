@@ -0,0 +1,259 @@
+from typing import Optional
+import datetime, threading
+
+
+class SmokeThresholds:
+    """
+    Alarm rules of a room.
+
+    A sensor enters the alarm state when its value stays at or above `alarm` for `debounce_seconds`,
+    or at once when it rises by `rate_of_rise` units per second or more while above `clear`. It
+    leaves the alarm state only after staying at or below `clear` for `clear_seconds`; the gap
+    between `clear` and `alarm` is the hysteresis that keeps a value hovering around the alarm
+    level from toggling the state.
+    """
+
+    __slots__ = ("alarm", "clear", "debounce_seconds", "clear_seconds", "rate_of_rise")
+
+    def __init__(self, alarm: float, clear: float, debounce_seconds: float = 0, clear_seconds: float = 0, rate_of_rise: float = None):
+        if clear > alarm:
+            raise ValueError("The clear level of a smoke threshold cannot be above its alarm level")
+        self.alarm = alarm
+        self.clear = clear
+        self.debounce_seconds = debounce_seconds
+        self.clear_seconds = clear_seconds
+        self.rate_of_rise = rate_of_rise
+
+    def replace(self, **changes) -> "SmokeThresholds":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return SmokeThresholds(**values)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SmokeEvaluation:
+    """
+    The outcome of one reading: the state of the sensor after it and whether the state changed.
+    """
+
+    __slots__ = ("device_id", "room_id", "value", "recorded_at", "state", "previous_state", "reason", "rate", "pending")
+
+    NORMAL = "normal"
+    ALARM = "alarm"
+
+    def __init__(self, device_id: str, room_id: int, value: float, recorded_at: datetime.datetime, state: str, previous_state: str, reason: str = None, rate: float = None, pending: bool = False):
+        self.device_id = device_id
+        self.room_id = room_id
+        self.value = value
+        self.recorded_at = recorded_at
+        self.state = state
+        self.previous_state = previous_state
+        self.reason = reason
+        self.rate = rate
+        # at or above the alarm level, waiting for the debounce window to pass
+        self.pending = pending
+
+    @property
+    def transition(self) -> bool:
+        return self.state != self.previous_state
+
+    @property
+    def raised(self) -> bool:
+        return self.transition and self.state == self.ALARM
+
+    @property
+    def cleared(self) -> bool:
+        return self.transition and self.state == self.NORMAL
+
+    def to_dict(self):
+        return {
+            "device_id": self.device_id,
+            "room_id": self.room_id,
+            "value": self.value,
+            "recorded_at": self.recorded_at.isoformat() if self.recorded_at else None,
+            "state": self.state,
+            "previous_state": self.previous_state,
+            "transition": self.transition,
+            "reason": self.reason,
+            "rate": self.rate,
+            "pending": self.pending
+        }
+
+
+class _SensorState:
+    __slots__ = ("room_id", "state", "last_value", "last_at", "above_since", "below_since", "last_alert_time")
+
+    def __init__(self, room_id: int):
+        self.room_id = room_id
+        self.state = SmokeEvaluation.NORMAL
+        self.last_value = None
+        self.last_at = None
+        # when the value crossed the alarm level (normal state) or the clear level (alarm state)
+        self.above_since = None
+        self.below_since = None
+        self.last_alert_time = None
+
+
+class SmokeThresholdEngine:
+    """
+    Evaluates smoke readings in memory and reports only the changes of alarm state.
+
+    Keeps the state of every sensor it has seen; a reading older than the last one of its sensor
+    is reported with the current state and never changes it. A sensor that stops reporting while
+    above its alarm level is raised by `promote_due` once its debounce window has passed, so a
+    single reading is enough to raise an alarm.
+    """
+
+    def __init__(self, default: SmokeThresholds, rooms: Optional[dict] = None):
+        self.default = default
+        self.rooms = dict(rooms or {})
+        self._sensors = {}
+        self._lock = threading.Lock()
+
+    def thresholds_for(self, room_id: int) -> SmokeThresholds:
+        """
+        Returns the thresholds of a room, or the default ones when the room has none of its own.
+
+        :param room_id: The ID of the room.
+        :return: The thresholds.
+        """
+        return self.rooms.get(room_id, self.default)
+
+    def evaluate(self, device_id: str, room_id: int, value: float, recorded_at: datetime.datetime) -> SmokeEvaluation:
+        """
+        Applies one reading of a sensor.
+
+        :param device_id: The ID of the smoke sensor.
+        :param room_id: The ID of the room where the sensor is located.
+        :param value: The analog value read.
+        :param recorded_at: When the value was read.
+        :return: The evaluation; `transition` is True only for the reading that changed the state.
+        """
+        thresholds = self.thresholds_for(room_id)
+        with self._lock:
+            sensor = self._sensors.get(device_id)
+            if sensor is None:
+                sensor = self._sensors[device_id] = _SensorState(room_id)
+            sensor.room_id = room_id
+            previous = sensor.state
+
+            if sensor.last_at is not None and recorded_at < sensor.last_at:
+                return SmokeEvaluation(device_id, room_id, value, recorded_at, previous, previous)
+
+            rate = None
+            if sensor.last_at is not None and recorded_at > sensor.last_at:
+                rate = (value - sensor.last_value) / (recorded_at - sensor.last_at).total_seconds()
+            sensor.last_value = value
+            sensor.last_at = recorded_at
+
+            reason = None
+            if previous == SmokeEvaluation.NORMAL:
+                sensor.below_since = None
+                if value >= thresholds.alarm:
+                    if sensor.above_since is None:
+                        sensor.above_since = recorded_at
+                    if (recorded_at - sensor.above_since).total_seconds() >= thresholds.debounce_seconds:
+                        reason = "threshold"
+                else:
+                    sensor.above_since = None
+                if reason is None and thresholds.rate_of_rise is not None and rate is not None \
+                        and rate >= thresholds.rate_of_rise and value > thresholds.clear:
+                    reason = "rate_of_rise"
+                if reason:
+                    sensor.state = SmokeEvaluation.ALARM
+                    sensor.above_since = None
+                    sensor.last_alert_time = recorded_at
+            else:
+                sensor.above_since = None
+                if value <= thresholds.clear:
+                    if sensor.below_since is None:
+                        sensor.below_since = recorded_at
+                    if (recorded_at - sensor.below_since).total_seconds() >= thresholds.clear_seconds:
+                        reason = "cleared"
+                        sensor.state = SmokeEvaluation.NORMAL
+                        sensor.below_since = None
+                else:
+                    sensor.below_since = None
+
+            return SmokeEvaluation(device_id, room_id, value, recorded_at, sensor.state, previous, reason, rate,
+                                   sensor.state == SmokeEvaluation.NORMAL and sensor.above_since is not None)
+
+    def promote_due(self, now: datetime.datetime) -> list[SmokeEvaluation]:
+        """
+        Raises the sensors whose last reading was at or above the alarm level and whose debounce
+        window has passed without a newer reading, and the ones reverted by `revert`.
+
+        :param now: The current time, as naive UTC.
+        :return: The evaluation of every sensor raised.
+        """
+        raised = []
+        with self._lock:
+            for device_id, sensor in self._sensors.items():
+                if sensor.state != SmokeEvaluation.NORMAL or sensor.above_since is None:
+                    continue
+                if (now - sensor.above_since).total_seconds() < self.thresholds_for(sensor.room_id).debounce_seconds:
+                    continue
+                sensor.state = SmokeEvaluation.ALARM
+                sensor.above_since = None
+                sensor.last_alert_time = now
+                raised.append(SmokeEvaluation(device_id, sensor.room_id, sensor.last_value, now,
+                                              SmokeEvaluation.ALARM, SmokeEvaluation.NORMAL, "threshold"))
+        return raised
+
+    def revert(self, evaluation: SmokeEvaluation):
+        """
+        Undoes an alarm whose alert could not be stored, so it is raised again.
+
+        The sensor goes back to the normal state with its debounce window already passed: the next
+        reading at or above the alarm level, or the next `promote_due`, raises it again.
+
+        :param evaluation: The evaluation that raised the alarm.
+        """
+        with self._lock:
+            sensor = self._sensors.get(evaluation.device_id)
+            if sensor is None or sensor.state != SmokeEvaluation.ALARM or sensor.last_alert_time != evaluation.recorded_at:
+                return
+            sensor.state = SmokeEvaluation.NORMAL
+            sensor.below_since = None
+            sensor.last_alert_time = None
+            sensor.above_since = datetime.datetime.min
+
+    def evict_idle(self, before: datetime.datetime) -> int:
+        """
+        Drops the state of the normal sensors that have not reported since `before`.
+
+        Sensors in alarm, or waiting for their debounce window, are kept; a sensor that reports
+        again simply starts over from the normal state.
+
+        :param before: The oldest last reading to keep, as naive UTC.
+        :return: The number of sensors dropped.
+        """
+        with self._lock:
+            idle = [
+                device_id for device_id, sensor in self._sensors.items()
+                if sensor.state == SmokeEvaluation.NORMAL and sensor.above_since is None
+                and (sensor.last_at is None or sensor.last_at < before)
+            ]
+            for device_id in idle:
+                del self._sensors[device_id]
+        return len(idle)
+
+    def forget(self, device_id: str):
+        """
+        Drops the state of a sensor, e.g. after it was removed.
+
+        :param device_id: The ID of the smoke sensor.
+        """
+        with self._lock:
+            self._sensors.pop(device_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            alarms = [device_id for device_id, sensor in self._sensors.items() if sensor.state == SmokeEvaluation.ALARM]
+            return {
+                "sensors": len(self._sensors),
+                "in_alarm": len(alarms),
+                "alarm_devices": alarms[:50]
+            }
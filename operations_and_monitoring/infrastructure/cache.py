@@ -0,0 +1,214 @@
+from typing import Optional
+from dotenv import load_dotenv
+from operations_and_monitoring.application.external.services import HotelExternalService
+from shared.infrastructure.cache import TTLCache
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+import os, threading, time
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class RfidAccessCache:
+    """
+    In-memory view of the (room_id, u_id) pairs registered in `rfid_devices`.
+
+    Granted pairs are loaded once from the table and kept up to date by the repository writes.
+    Denied pairs are remembered only for `negative_ttl` seconds, so a card registered by another
+    process is accepted shortly after.
+    """
+
+    def __init__(self, negative_ttl: float = None):
+        self._granted = set()
+        self._denied = TTLCache(maxsize=10000, ttl=negative_ttl if negative_ttl is not None else float(os.getenv("RFID_NEGATIVE_CACHE_TTL", "5")))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(room_id, u_id) -> tuple:
+        return int(room_id), str(u_id)
+
+    def warm(self, pairs):
+        """
+        Replaces the granted pairs with the content of the table.
+
+        :param pairs: An iterable of (room_id, u_id) tuples.
+        """
+        granted = {self.key(room_id, u_id) for room_id, u_id in pairs}
+        with self._lock:
+            self._granted = granted
+        self._denied.clear()
+
+    def lookup(self, room_id, u_id) -> Optional[bool]:
+        """
+        Checks a card against the cache.
+
+        :return: True if access is granted, False if it was recently denied or the room ID is not a number, None if the cache does not know.
+        """
+        try:
+            key = self.key(room_id, u_id)
+        except (TypeError, ValueError):
+            # no room has such an ID, so there is nothing to look up
+            return False
+        if key in self._granted:
+            return True
+        if self._denied.get(key):
+            return False
+        return None
+
+    def grant(self, room_id, u_id):
+        key = self.key(room_id, u_id)
+        with self._lock:
+            self._granted.add(key)
+        self._denied.invalidate(key)
+
+    def revoke(self, room_id, u_id):
+        with self._lock:
+            self._granted.discard(self.key(room_id, u_id))
+
+    def deny(self, room_id, u_id):
+        self._denied.set(self.key(room_id, u_id), True)
+
+    def stats(self) -> dict:
+        return {
+            "granted": len(self._granted),
+            "denied": self._denied.stats()
+        }
+
+
+rfid_access_cache = RfidAccessCache()
+register_metrics("rfid_access_cache", rfid_access_cache.stats)
+
+# device_id -> room_id of the smoke sensors, for the reading ingestion; refreshed by add_smoke_sensor
+smoke_sensor_room_cache = TTLCache(maxsize=int(os.getenv("SMOKE_ROOM_CACHE_SIZE", "10000")),
+                                   ttl=float(os.getenv("SMOKE_ROOM_CACHE_TTL_SECONDS", "300")))
+register_metrics("smoke_sensor_room_cache", smoke_sensor_room_cache.stats)
+
+
+class HotelMetadataCache:
+    """
+    Keeps the hotel records of the backend (`/hotels/{id}`) in memory.
+
+    Entries expire after HOTEL_METADATA_TTL_SECONDS. When the backend cannot be reached the last
+    known record keeps being served, and the backend is asked again only every
+    HOTEL_METADATA_RETRY_SECONDS, so notifications are still addressed during an outage.
+    """
+
+    def __init__(self, loader, ttl: float = None, retry_interval: float = None):
+        self.loader = loader
+        self.retry_interval = retry_interval if retry_interval is not None else float(os.getenv("HOTEL_METADATA_RETRY_SECONDS", "10"))
+        self._hotels = TTLCache(maxsize=64, ttl=ttl if ttl is not None else float(os.getenv("HOTEL_METADATA_TTL_SECONDS", "3600")))
+        self._load_lock = threading.Lock()
+        self._retry_at = {}
+        self._loads = 0
+        self._load_failures = 0
+        self._stale_served = 0
+
+    def get(self, hotel_id) -> Optional[dict]:
+        """
+        Returns the hotel record, loading it from the backend when it is missing or expired.
+
+        :param hotel_id: The ID of the hotel.
+        :return: The hotel data, possibly stale if the backend is unavailable, or None if it was never loaded.
+        """
+        hotel_id = int(hotel_id)
+        hotel = self._hotels.get(hotel_id)
+        if hotel is not None:
+            return hotel
+
+        with self._load_lock:
+            # another caller may have loaded the hotel while we were waiting for the lock
+            hotel = self._hotels.get(hotel_id)
+            if hotel is not None:
+                return hotel
+            if time.monotonic() >= self._retry_at.get(hotel_id, 0):
+                hotel = self._load(hotel_id)
+                if hotel is not None:
+                    return hotel
+
+        stale = self._hotels.get_stale(hotel_id)
+        if stale is not None:
+            self._stale_served += 1
+        return stale
+
+    def owner_id(self, hotel_id) -> Optional[int]:
+        """
+        Returns the owner of a hotel.
+
+        :param hotel_id: The ID of the hotel.
+        :return: The owner ID, or None if the hotel is unknown.
+        """
+        hotel = self.get(hotel_id)
+        return hotel.get("ownerId") if hotel else None
+
+    def warm(self, hotel_id):
+        """
+        Loads a hotel up front, e.g. the configured hotel at startup.
+
+        :param hotel_id: The ID of the hotel.
+        """
+        with self._load_lock:
+            self._load(int(hotel_id))
+
+    def refresh(self, hotel_id) -> Optional[dict]:
+        """
+        Loads a hotel from the backend now, replacing the cached record only when the load succeeds.
+
+        :param hotel_id: The ID of the hotel.
+        :return: The fresh hotel data, or the last known one if the backend is unavailable.
+        """
+        hotel_id = int(hotel_id)
+        with self._load_lock:
+            hotel = self._load(hotel_id)
+        if hotel is not None:
+            return hotel
+
+        stale = self._hotels.get_stale(hotel_id)
+        if stale is not None:
+            self._stale_served += 1
+        return stale
+
+    def invalidate(self, hotel_id=None):
+        """
+        Forgets a cached hotel, or every hotel, so the next lookup asks the backend.
+
+        :param hotel_id: The ID of the hotel, or None for all of them.
+        """
+        with self._load_lock:
+            if hotel_id is None:
+                self._hotels.clear()
+                self._retry_at.clear()
+            else:
+                self._hotels.invalidate(int(hotel_id))
+                self._retry_at.pop(int(hotel_id), None)
+
+    def _load(self, hotel_id: int) -> Optional[dict]:
+        """Fetches a hotel from the backend. Must be called with the load lock held."""
+        self._loads += 1
+        try:
+            hotel = self.loader(hotel_id)
+        except Exception as e:
+            logger.error("Error loading hotel %s: %s", hotel_id, e)
+            hotel = None
+
+        if hotel is None:
+            self._load_failures += 1
+            self._retry_at[hotel_id] = time.monotonic() + self.retry_interval
+            return None
+
+        self._hotels.set(hotel_id, hotel)
+        self._retry_at.pop(hotel_id, None)
+        return hotel
+
+    def stats(self) -> dict:
+        return {
+            "hotels": self._hotels.stats(),
+            "loads": self._loads,
+            "load_failures": self._load_failures,
+            "stale_served": self._stale_served
+        }
+
+
+hotel_metadata_cache = HotelMetadataCache(HotelExternalService.get_hotel)
+register_metrics("hotel_metadata_cache", hotel_metadata_cache.stats)
@@ -0,0 +1,157 @@
+from collections import deque
+from itertools import islice
+from typing import Optional
+from dotenv import load_dotenv
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+import datetime, os, threading, uuid
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# fields of a device that may be pushed to the dashboards; api keys never leave the node
+DEVICE_EVENT_FIELDS = {
+    "thermostat": ("ip_address", "mac_address", "state", "temperature", "last_update"),
+    "smoke_sensor": ("ip_address", "mac_address", "state", "last_analogic_value", "last_alert_time"),
+    "rfid": ()
+}
+
+
+class DeviceEvent:
+    __slots__ = ("seq", "device_type", "action", "device_id", "room_id", "data", "at")
+
+    def __init__(self, seq: int, device_type: str, action: str, device_id: str, room_id: int, data: dict, at: datetime.datetime):
+        self.seq = seq
+        self.device_type = device_type
+        self.action = action
+        self.device_id = device_id
+        self.room_id = room_id
+        self.data = data
+        self.at = at
+
+    def to_json(self):
+        return {
+            "seq": self.seq,
+            "type": self.device_type,
+            "action": self.action,
+            "device_id": self.device_id,
+            "room_id": self.room_id,
+            "data": self.data,
+            "at": self.at.isoformat() + "Z"
+        }
+
+
+class DeviceEventBus:
+    """
+    In-memory, sequence-numbered log of the device state changes written by this node.
+
+    The repositories publish a delta after every committed write; the live feed reads the log from
+    the sequence number a client has seen. Only the last `capacity` events are kept, so a client
+    that fell further behind is told to reload the device lists instead of replaying them.
+
+    Sequence numbers restart with the process; `epoch` is random per process, so a client resuming
+    with the cursor of a previous run is told to reload as well.
+    """
+
+    def __init__(self, capacity: int = None, max_subscribers: int = None):
+        self.capacity = capacity or int(os.getenv("DEVICE_EVENTS_BUFFER", "10000"))
+        self.max_subscribers = max_subscribers if max_subscribers is not None else int(os.getenv("DEVICE_EVENTS_MAX_SUBSCRIBERS", "100"))
+        self.epoch = uuid.uuid4().hex
+
+        self._events = deque(maxlen=self.capacity)
+        self._seq = 0
+        self._condition = threading.Condition()
+        self._subscribers = 0
+        self._published = 0
+        self._refused = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, device_type: str, action: str, changes: list[tuple]) -> int:
+        """
+        Appends device changes to the log and wakes the subscribers.
+
+        :param device_type: A key of DEVICE_EVENT_FIELDS.
+        :param action: 'added' or 'updated'.
+        :param changes: (device_id, room_id, fields) tuples; fields not in DEVICE_EVENT_FIELDS are dropped.
+        :return: The sequence number of the last event.
+        """
+        if not changes:
+            return self._seq
+        allowed = DEVICE_EVENT_FIELDS[device_type]
+        at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+        with self._condition:
+            for device_id, room_id, fields in changes:
+                self._seq += 1
+                self._events.append(DeviceEvent(
+                    self._seq, device_type, action, str(device_id), room_id,
+                    {name: value for name, value in fields.items() if name in allowed}, at
+                ))
+            self._published += len(changes)
+            self._condition.notify_all()
+            return self._seq
+
+    def since(self, seq: int, device_types: Optional[set] = None, room_ids: Optional[set] = None) -> tuple[list, bool, int]:
+        """
+        Reads the events after a sequence number.
+
+        :param seq: The last sequence number the reader has seen.
+        :param device_types: Only return events of these device types; all when None.
+        :param room_ids: Only return events of these rooms; all when None.
+        :return: The matching events, whether events after `seq` were already dropped, and the sequence number read up to.
+        """
+        with self._condition:
+            last = self._seq
+            first = self._events[0].seq if self._events else last + 1
+            missed = seq + 1 < first
+            events = list(islice(self._events, max(0, seq + 1 - first), None))
+        return [
+            event for event in events
+            if (device_types is None or event.device_type in device_types) and (room_ids is None or event.room_id in room_ids)
+        ], missed, last
+
+    def wait(self, seq: int, timeout: float) -> bool:
+        """
+        Blocks until an event after `seq` is published.
+
+        :param seq: The last sequence number the reader has seen.
+        :param timeout: Maximum number of seconds to wait.
+        :return: False if the timeout expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._seq > seq, timeout)
+
+    def subscribe(self) -> bool:
+        """
+        Reserves one of the `max_subscribers` live feed connections.
+
+        :return: False if every connection is taken.
+        """
+        with self._condition:
+            if self._subscribers >= self.max_subscribers:
+                self._refused += 1
+                return False
+            self._subscribers += 1
+            return True
+
+    def unsubscribe(self):
+        with self._condition:
+            self._subscribers -= 1
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "epoch": self.epoch,
+                "last_seq": self._seq,
+                "buffered": len(self._events),
+                "published": self._published,
+                "subscribers": self._subscribers,
+                "refused_subscribers": self._refused
+            }
+
+
+device_event_bus = DeviceEventBus()
+register_metrics("device_events", device_event_bus.stats)
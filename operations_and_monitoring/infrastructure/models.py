@@ -1,5 +1,5 @@
 ﻿from shared.infrastructure.database import db
-from sqlalchemy import Table, Column, String, Float, DateTime, Integer
+from sqlalchemy import Table, Column, String, Float, Double, DateTime, Integer, BigInteger, Index
 
 class Thermostat(db.Base):
     __tablename__ = 'thermostats'
@@ -11,7 +11,7 @@ class Thermostat(db.Base):
     state = Column(String(50), nullable=False)
     temperature = Column(Float, nullable=False)
     last_update = Column(DateTime, nullable=False)
-    room_id = Column(Integer, nullable=False)
+    room_id = Column(Integer, nullable=False, index=True)
 
 class SmokeSensor(db.Base):
     __tablename__ = 'smoke_sensors'
@@ -23,7 +23,59 @@ class SmokeSensor(db.Base):
     state = Column(String(50), nullable=False)
     last_analogic_value = Column(Float, nullable=False)
     last_alert_time = Column(DateTime, nullable=True)
-    room_id=Column(Integer, nullable=False)
+    room_id = Column(Integer, nullable=False, index=True)
+
+class SmokeAlert(db.Base):
+    __tablename__ = 'smoke_alerts'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    device_id = Column(String(100), nullable=False)
+    room_id = Column(Integer, nullable=False)
+    current_value = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    collapsed_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=False)
+    delivered_at = Column(DateTime, nullable=True)
+    last_error = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        # the dispatcher polls for due alerts, the route looks up the latest alert of a device
+        Index('ix_smoke_alerts_status_next_attempt_at', 'status', 'next_attempt_at'),
+        Index('ix_smoke_alerts_device_id_room_id_created_at', 'device_id', 'room_id', 'created_at'),
+    )
+
+# append-only history of the thermostat temperatures, partitioned by day on recorded_at (see the migrations)
+class ThermostatReading(db.Base):
+    __tablename__ = 'thermostat_readings'
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # MySQL requires the partitioning column in every unique key, the primary key included
+    recorded_at = Column(DateTime, primary_key=True)
+    device_id = Column(String(100), nullable=False)
+    temperature = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('ix_thermostat_readings_device_id_recorded_at', 'device_id', 'recorded_at'),
+    )
+
+# min/max/sum/count of the readings of one device or room per time bucket, at several resolutions
+class TelemetryRollup(db.Base):
+    __tablename__ = 'telemetry_rollups'
+    kind = Column(String(20), primary_key=True)
+    scope = Column(String(10), primary_key=True)
+    scope_id = Column(String(100), primary_key=True)
+    resolution = Column(Integer, primary_key=True, autoincrement=False)
+    bucket_start = Column(DateTime, primary_key=True)
+    samples = Column(Integer, nullable=False)
+    # a sum of many readings; single-precision FLOAT would lose the decimals
+    total = Column(Double, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # the primary key serves the range queries of one series; this one the retention pruning
+        Index('ix_telemetry_rollups_resolution_bucket_start', 'resolution', 'bucket_start'),
+    )
 
 class Booking(db.Base):
     __tablename__ = 'bookings'
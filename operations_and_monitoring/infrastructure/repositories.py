@@ -1,82 +1,48 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, case, literal, null, union_all, func, text, tuple_, or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from shared.infrastructure.database import db
 
-from operations_and_monitoring.infrastructure.models import Thermostat as ThermostatModel, SmokeSensor as SmokeSensorModel
+from operations_and_monitoring.infrastructure.models import Thermostat as ThermostatModel, SmokeSensor as SmokeSensorModel, SmokeAlert as SmokeAlertModel
+from operations_and_monitoring.infrastructure.models import ThermostatReading as ThermostatReadingModel, TelemetryRollup as TelemetryRollupModel
 from inventory.infrastructure.models import Rfid as RfidModel
-from operations_and_monitoring.domain.entities import Thermostat, SmokeSensor
+from operations_and_monitoring.domain.entities import Thermostat, SmokeSensor, SmokeAlert
 from inventory.domain.entities import Rfid
 
 from operations_and_monitoring.domain.entities import Booking
 from operations_and_monitoring.infrastructure.models import Booking as BookingModel
 
 from operations_and_monitoring.application.external.services import BookingExternalService
+from operations_and_monitoring.infrastructure.cache import rfid_access_cache, smoke_sensor_room_cache
+from operations_and_monitoring.infrastructure.events import device_event_bus
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.pagination import InvalidPageRequest, Page, PageRequest, keyset_page, select_fields, stream_rows
 
 from typing import Optional
 import datetime
 
-class MonitoringRepository:
-
+logger = get_logger(__name__)
 
-    def get_thermostats(self) -> list[Thermostat]:
-        """
-        Retrieves thermostats associated with a specific hotel.
-        
-        :param hotel_id: The ID of the hotel to retrieve thermostats for.
-        :return: A list of Thermostat entities associated with the hotel.
-        """
-        try:
-            session = db.session
-            result = session.query(ThermostatModel).all()
-            print(f"Found {len(result)} thermostats.")
-
-            return [Thermostat(id=device.id, device_id=device.device_id,
-                               api_key=device.api_key,ip_address=device.ip_address,
-                               mac_address=device.mac_address,
-                               state=device.state, temperature=device.temperature,
-                               last_update=device.last_update,
-                               room_id=device.room_id) for device in result]
-        except Exception as e:
-            print(f"Error retrieving thermostats: {e}")
-            return []
+class MonitoringRepository:
+    # rows per INSERT ... ON DUPLICATE KEY UPDATE statement when syncing from the backend
+    SYNC_CHUNK_SIZE = 500
 
-    def get_rfid(self) -> list[Rfid]:
-        """
-        Retrieves RFID devices associated with a specific hotel.
-        """
-        try:
-            session = db.session
-            print("[Repository] Getting RFID devices from DB...")
-            result = session.query(RfidModel).all()
-            print(f"[Repository] Raw result from DB: {result}")
-            print(f"[Repository] Found {len(result)} RFID devices.")
-
-            rfids = []
-            for device in result:
-                print("[Repository] Mapping device to entity:")
-                print(f"  - ID: {device.id}")
-                print(f"  - device_id: {getattr(device, 'device_id', 'MISSING')}")
-                print(f"  - room_id: {device.room_id}")
-                print(f"  - api_key: {device.api_key}")
-                print(f"  - u_id: {device.u_id}")
-
-                try:
-                    rfid_entity = Rfid(
-                        id=device.id,
-                        room_id=device.room_id,
-                        device_id=device.device_id,
-                        api_key=device.api_key,
-                        u_id=device.u_id,
-                    )
-                    rfids.append(rfid_entity)
-                except Exception as inner_e:
-                    print(f"[Repository] Error mapping RFID entity: {inner_e}")
+    # values of the fields the backend left out, used only when a device is inserted
+    THERMOSTAT_SYNC_DEFAULTS = {"api_key": "", "ip_address": "", "mac_address": "", "state": "OFF", "temperature": 0.0}
+    RFID_SYNC_DEFAULTS = {"api_key": "", "u_id": ""}
 
-            print(f"[Repository] Total mapped RFID entities: {len(rfids)}")
-            return rfids
+    # fields returned by the list endpoints, in output order
+    THERMOSTAT_FIELDS = ("id", "device_id", "api_key", "ip_address", "mac_address", "temperature", "last_update", "room_id", "state")
+    SMOKE_SENSOR_FIELDS = ("id", "device_id", "api_key", "ip_address", "mac_address", "last_analogic_value", "last_alert_time", "room_id")
+    RFID_FIELDS = ("id", "room_id", "device_id", "api_key", "u_id")
 
-        except Exception as e:
-            print(f"[Repository] Error retrieving RFID devices: {e}")
-            return []
+    # columns in the positional order of the entity constructors, so every row maps with Entity(*row)
+    THERMOSTAT_COLUMNS = (ThermostatModel.id, ThermostatModel.device_id, ThermostatModel.api_key, ThermostatModel.ip_address,
+                          ThermostatModel.mac_address, ThermostatModel.temperature, ThermostatModel.last_update,
+                          ThermostatModel.room_id, ThermostatModel.state)
+    SMOKE_SENSOR_COLUMNS = (SmokeSensorModel.id, SmokeSensorModel.device_id, SmokeSensorModel.api_key, SmokeSensorModel.ip_address,
+                            SmokeSensorModel.mac_address, SmokeSensorModel.last_analogic_value, SmokeSensorModel.room_id,
+                            SmokeSensorModel.last_alert_time, SmokeSensorModel.state)
+    RFID_COLUMNS = (RfidModel.id, RfidModel.room_id, RfidModel.api_key, RfidModel.u_id, RfidModel.device_id)
 
     def save_thermostat(self, item: dict, ):
         session = db.session
@@ -85,7 +51,7 @@ class MonitoringRepository:
             existing = session.query(ThermostatModel).filter_by(device_id=item["id"]).first()
 
             if existing:
-                print(f"[Repository] Thermostat with ID {item['id']} already exists. Skipping.")
+                logger.debug("Thermostat %s already exists. Skipping.", item['id'])
                 return
 
             # Crear uno nuevo si no existe
@@ -95,35 +61,224 @@ class MonitoringRepository:
                 ip_address=item.get("ipAddress", ""),
                 mac_address=item.get("macAddress", ""),
                 state=item.get("state", "OFF"),
-                last_update=item.get("lastUpdate", datetime.datetime.now()),
+                last_update=_parse_datetime(item.get("lastUpdate")) or _utcnow(),
                 temperature=item.get("temperature", "0"),
                 room_id=item.get("roomId"),
             )
 
             session.add(new_thermostat)
             session.commit()
-            print(f"[Repository] Thermostat {item['id']} inserted successfully.")
+            logger.info("Thermostat %s inserted.", item['id'])
 
         except Exception as e:
             session.rollback()
-            print(f"[Repository] Error inserting thermostat: {e}")
+            logger.exception("Error inserting thermostat: %s", e)
 
+    def get_thermostats_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of thermostats, ordered by id.
 
-    def get_smoke_sensors(self) -> list[SmokeSensor]:
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every thermostat as a dictionary of the selected fields.
         """
-        Retrieves smoke sensors associated with a specific hotel.
-        
-        :param hotel_id: The ID of the hotel to retrieve smoke sensors for.
-        :return: A list of SmokeSensor entities associated with the hotel.
+        return keyset_page(ThermostatModel.__table__, page, self.THERMOSTAT_FIELDS)
+
+    def get_smoke_sensors_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of smoke sensors, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every smoke sensor as a dictionary of the selected fields.
+        """
+        return keyset_page(SmokeSensorModel.__table__, page, self.SMOKE_SENSOR_FIELDS)
+
+    def get_rfid_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of RFID devices, ordered by id.
+
+        :param page: The page request with the limit, the keyset position and the projected fields.
+        :return: The page, with every RFID device as a dictionary of the selected fields.
+        """
+        return keyset_page(RfidModel.__table__, page, self.RFID_FIELDS)
+
+    def stream_thermostats(self, page: PageRequest):
+        """
+        Yields every thermostat after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(ThermostatModel.__table__, page, self.THERMOSTAT_FIELDS)
+
+    def stream_smoke_sensors(self, page: PageRequest):
+        """
+        Yields every smoke sensor after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(SmokeSensorModel.__table__, page, self.SMOKE_SENSOR_FIELDS)
+
+    def stream_rfid(self, page: PageRequest):
+        """
+        Yields every RFID device after the page position, ordered by id, reading through a server-side cursor.
+
+        :param page: The page request; its limit is ignored.
+        :return: A generator of dictionaries of the selected fields.
+        """
+        return stream_rows(RfidModel.__table__, page, self.RFID_FIELDS)
+
+    def get_devices_page(self, page: PageRequest) -> Page:
+        """
+        Retrieves one page of every device list: up to `page.limit` thermostats, smoke sensors and RFID devices.
+
+        The keyset position maps every list that has more rows to the last id returned for it;
+        lists missing from a position were already read to the end.
+
+        :param page: The page request; fields may belong to any of the device kinds.
+        :return: The page, whose items map every list name to its rows.
+        """
+        items = {}
+        next_after = {}
+        for name, table, fields, after in self._device_lists(page):
+            if fields is None:
+                items[name] = []
+                continue
+            kind_page = keyset_page(table, PageRequest(page.limit, after, fields), fields)
+            items[name] = kind_page.items
+            if kind_page.next_after is not None:
+                next_after[name] = kind_page.next_after
+        return Page(items, next_after or None)
+
+    def stream_devices(self, page: PageRequest) -> list[tuple]:
+        """
+        Reads every device list after the page position through server-side cursors.
+
+        :param page: The page request; its limit is ignored.
+        :return: A list of (list name, generator of rows) pairs; the lists are read one after the other.
+        """
+        groups = []
+        for name, table, fields, after in self._device_lists(page):
+            rows = stream_rows(table, PageRequest(after=after, fields=fields), fields) if fields is not None else iter(())
+            groups.append((name, rows))
+        return groups
+
+    def _device_lists(self, page: PageRequest):
+        """
+        Resolves, for every device list, the fields to select and where to continue from.
+
+        :return: (name, table, fields, after) tuples; fields is None for lists that must be skipped.
+        """
+        lists = (
+            ("thermostats", ThermostatModel.__table__, self.THERMOSTAT_FIELDS),
+            ("smoke_sensors", SmokeSensorModel.__table__, self.SMOKE_SENSOR_FIELDS),
+            ("rfid_devices", RfidModel.__table__, self.RFID_FIELDS)
+        )
+        if page.after is not None and not isinstance(page.after, dict):
+            raise InvalidPageRequest("Invalid cursor")
+        available = list(dict.fromkeys(field for _, _, fields in lists for field in fields))
+        requested = select_fields(page, available) if page.fields else None
+
+        resolved = []
+        for name, table, fields in lists:
+            kind_fields = [field for field in fields if requested is None or field in requested]
+            finished = page.after is not None and name not in page.after
+            after = page.after.get(name) if page.after else None
+            resolved.append((name, table, kind_fields if kind_fields and not finished else None, after))
+        return resolved
+
+    def get_thermostats_by_room_id(self, room_id: int) -> list[Thermostat]:
+        """
+        Retrieves the thermostats installed in a room.
+
+        :param room_id: The ID of the room.
+        :return: A list of Thermostat entities located in the room.
+        """
+        try:
+            query = select(*self.THERMOSTAT_COLUMNS).where(ThermostatModel.room_id == room_id)
+            return [Thermostat(*row) for row in db.session.execute(query)]
+        except Exception as e:
+            logger.exception("Error retrieving thermostats for room %s: %s", room_id, e)
+            return []
+
+    def get_smoke_sensors_by_room_id(self, room_id: int) -> list[SmokeSensor]:
+        """
+        Retrieves the smoke sensors installed in a room.
+
+        :param room_id: The ID of the room.
+        :return: A list of SmokeSensor entities located in the room.
+        """
+        try:
+            query = select(*self.SMOKE_SENSOR_COLUMNS).where(SmokeSensorModel.room_id == room_id)
+            return [SmokeSensor(*row) for row in db.session.execute(query)]
+        except Exception as e:
+            logger.exception("Error retrieving smoke sensors for room %s: %s", room_id, e)
+            return []
+
+    def get_rfid_by_room_id(self, room_id: int) -> list[Rfid]:
+        """
+        Retrieves the RFID readers installed in a room.
+
+        :param room_id: The ID of the room.
+        :return: A list of Rfid entities located in the room.
         """
+        try:
+            query = select(*self.RFID_COLUMNS).where(RfidModel.room_id == room_id)
+            return [Rfid(*row) for row in db.session.execute(query)]
+        except Exception as e:
+            logger.exception("Error retrieving RFID devices for room %s: %s", room_id, e)
+            return []
+
+    def get_devices_by_room_id(self, room_id: int) -> list:
+        """
+        Retrieves every device in a room (thermostats, smoke sensors and RFID readers) in a single query.
+
+        :param room_id: The ID of the room.
+        :return: A list of Thermostat, SmokeSensor and Rfid entities located in the room.
+        """
+        thermostats = ThermostatModel.__table__
+        smoke_sensors = SmokeSensorModel.__table__
+        rfid_devices = RfidModel.__table__
+
+        # every branch exposes the same columns; the ones a device kind lacks are NULL
+        query = union_all(
+            select(literal("thermostat").label("kind"), thermostats.c.id, thermostats.c.device_id,
+                   thermostats.c.api_key, thermostats.c.room_id, thermostats.c.ip_address,
+                   thermostats.c.mac_address, thermostats.c.state,
+                   thermostats.c.temperature.label("value"), thermostats.c.last_update.label("updated_at"),
+                   null().label("u_id"))
+            .where(thermostats.c.room_id == room_id),
+            select(literal("smoke_sensor"), smoke_sensors.c.id, smoke_sensors.c.device_id,
+                   smoke_sensors.c.api_key, smoke_sensors.c.room_id, smoke_sensors.c.ip_address,
+                   smoke_sensors.c.mac_address, smoke_sensors.c.state,
+                   smoke_sensors.c.last_analogic_value, smoke_sensors.c.last_alert_time, null())
+            .where(smoke_sensors.c.room_id == room_id),
+            select(literal("rfid"), rfid_devices.c.id, rfid_devices.c.device_id,
+                   rfid_devices.c.api_key, rfid_devices.c.room_id, null(), null(), null(), null(), null(),
+                   rfid_devices.c.u_id)
+            .where(rfid_devices.c.room_id == room_id)
+        )
+
         try:
             session = db.session
-            result = session.query(SmokeSensorModel).all()
-            print(f"Found {len(result)} smoke sensors.")
-        
-            return [SmokeSensor(id=device.id, device_id=device.device_id, api_key=device.api_key, ip_address=device.ip_address, mac_address=device.mac_address, state=device.state, last_analogic_value=device.last_analogic_value,room_id=device.room_id, last_alert_time=device.last_alert_time) for device in result]
+            devices = []
+            for row in session.execute(query):
+                if row.kind == "thermostat":
+                    devices.append(Thermostat(id=row.id, device_id=row.device_id, api_key=row.api_key,
+                                              ip_address=row.ip_address, mac_address=row.mac_address,
+                                              state=row.state, temperature=row.value,
+                                              last_update=row.updated_at, room_id=row.room_id))
+                elif row.kind == "smoke_sensor":
+                    devices.append(SmokeSensor(id=row.id, device_id=row.device_id, api_key=row.api_key,
+                                               ip_address=row.ip_address, mac_address=row.mac_address,
+                                               state=row.state, last_analogic_value=row.value,
+                                               room_id=row.room_id, last_alert_time=row.updated_at))
+                else:
+                    devices.append(Rfid(id=row.id, room_id=row.room_id, device_id=row.device_id,
+                                        api_key=row.api_key, u_id=row.u_id))
+            return devices
         except Exception as e:
-            print(f"Error retrieving smoke sensors: {e}")
+            logger.exception("Error retrieving devices for room %s: %s", room_id, e)
             return []
 
     def save_rfid(self, item: dict):
@@ -132,7 +287,7 @@ class MonitoringRepository:
 
             existing = session.query(RfidModel).filter_by(device_id=item["id"]).first()
             if existing:
-                print(f"[Repository] RFID with ID {item['id']} already exists. Skipping.")
+                logger.debug("RFID %s already exists. Skipping.", item['id'])
                 return
 
             new_rfid = RfidModel(
@@ -144,10 +299,168 @@ class MonitoringRepository:
 
             session.add(new_rfid)
             session.commit()
-            print(f"[Repository] RFID device {item['id']} inserted successfully.")
+            rfid_access_cache.grant(new_rfid.room_id, new_rfid.u_id)
+            device_event_bus.publish("rfid", "added", [(new_rfid.device_id, new_rfid.room_id, {})])
+            logger.info("RFID device %s inserted.", item['id'])
 
         except Exception as e:
-            print(f"[Repository] Error inserting RFID device: {e}")
+            logger.exception("Error inserting RFID device: %s", e)
+
+    def sync_thermostats(self, items: list[dict]) -> dict:
+        """
+        Upserts the thermostats returned by the backend in a single transaction.
+
+        :param items: The thermostat payload of the backend.
+        :return: A dictionary with the number of inserted, updated, unchanged and invalid thermostats.
+        """
+        rows, invalid = _sync_rows("thermostat", items, lambda item: {
+            "device_id": _sync_id(item["id"]),
+            "api_key": item.get("api_key"),
+            "ip_address": item.get("ipAddress"),
+            "mac_address": item.get("macAddress"),
+            "state": item.get("state"),
+            "last_update": _parse_datetime(item.get("lastUpdate")),
+            "temperature": float(item["temperature"]) if item.get("temperature") is not None else None,
+            "room_id": int(item["roomId"]),
+        })
+
+        counts, changes = self._bulk_upsert(ThermostatModel.__table__, rows, defaults=self.THERMOSTAT_SYNC_DEFAULTS, newer=("temperature",))
+        counts["invalid"] = invalid
+        _publish_changes("thermostat", changes)
+        logger.info("Thermostat sync finished: %s", counts)
+        return counts
+
+    def sync_rfids(self, items: list[dict]) -> dict:
+        """
+        Upserts the RFID readers returned by the backend in a single transaction.
+
+        :param items: The RFID payload of the backend.
+        :return: A dictionary with the number of inserted, updated, unchanged, conflicting and invalid RFID readers.
+        """
+        rows, invalid = _sync_rows("RFID", items, lambda item: {
+            "device_id": _sync_id(item["id"]),
+            "room_id": int(item["roomId"]),
+            "api_key": item.get("apiKey"),
+            "u_id": item.get("uId"),
+        })
+
+        counts, changes = self._bulk_upsert(RfidModel.__table__, rows, defaults=self.RFID_SYNC_DEFAULTS, unique=("room_id", "u_id"))
+        counts["invalid"] = invalid
+        for previous, current in changes:
+            if previous is not None:
+                rfid_access_cache.revoke(previous["room_id"], previous["u_id"])
+            rfid_access_cache.grant(current["room_id"], current["u_id"])
+        _publish_changes("rfid", changes)
+        logger.info("RFID sync finished: %s", counts)
+        return counts
+
+    def _bulk_upsert(self, table, rows: list[dict], key: str = "device_id", defaults: dict = None, unique: tuple = None, newer: tuple = None):
+        """
+        Writes rows with one INSERT ... ON DUPLICATE KEY UPDATE per chunk, all in one transaction.
+
+        The current rows of each chunk are read first so unchanged rows are skipped and the
+        inserted/updated/unchanged counts are exact.
+
+        When the table has another unique index, a row whose values in it are held by a different
+        row would make MySQL update that other row instead; such rows are skipped and counted as
+        conflicts.
+
+        The `newer` columns of an existing row, together with its last_update, are only written when
+        the incoming last_update is newer than the stored one, so readings recorded locally since the
+        backend's snapshot are not overwritten.
+
+        :param table: The table to write to.
+        :param rows: The rows to upsert; `None` values keep the stored value of existing rows.
+        :param key: The unique column that identifies a row.
+        :param defaults: Values for the `None` fields of the rows that are inserted.
+        :param unique: The columns of another unique index of the table.
+        :param newer: The columns that follow last_update; only written along with a newer last_update.
+        :return: The counts and the list of (previous_row, new_row) pairs that were written.
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "conflicts": 0}
+        changes = []
+        # the backend may repeat a device; the last occurrence wins
+        rows = list({row[key]: row for row in rows}.values())
+
+        session = db.session
+        try:
+            for start in range(0, len(rows), self.SYNC_CHUNK_SIZE):
+                chunk = rows[start:start + self.SYNC_CHUNK_SIZE]
+                existing = {
+                    current[key]: current
+                    for current in session.execute(
+                        select(table).where(table.c[key].in_([row[key] for row in chunk]))
+                    ).mappings()
+                }
+
+                # the values of the other unique index each row will end up with
+                claims = {}
+                if unique:
+                    for row in chunk:
+                        current = existing.get(row[key])
+                        fallback = current if current is not None else (defaults or {})
+                        claims[row[key]] = tuple(row[column] if row[column] is not None else fallback.get(column) for column in unique)
+                    columns = [table.c[column] for column in unique]
+                    holders = {
+                        tuple(holder[1:]): holder[0]
+                        for holder in session.execute(
+                            select(table.c[key], *columns).where(tuple_(*columns).in_(list(set(claims.values()))))
+                        ).all()
+                    }
+
+                pending = []
+                for row in chunk:
+                    current = existing.get(row[key])
+                    if unique:
+                        holder = holders.setdefault(claims[row[key]], row[key])
+                        if holder != row[key]:
+                            counts["conflicts"] += 1
+                            logger.warning("Skipping %s %s: %s %s already belong to %s.", table.name, row[key], unique, claims[row[key]], holder)
+                            continue
+
+                    if current is None:
+                        for column, value in (defaults or {}).items():
+                            if row.get(column) is None:
+                                row[column] = value
+                        if "last_update" in row and row["last_update"] is None:
+                            row["last_update"] = _utcnow()
+                        counts["inserted"] += 1
+                        pending.append(row)
+                        changes.append((None, row))
+                        continue
+
+                    for column, value in row.items():
+                        if value is None:
+                            row[column] = current[column]
+                    if newer and current["last_update"] is not None and row["last_update"] <= current["last_update"]:
+                        for column in (*newer, "last_update"):
+                            row[column] = current[column]
+                    if all(current[column] == value for column, value in row.items()):
+                        counts["unchanged"] += 1
+                    else:
+                        counts["updated"] += 1
+                        pending.append(row)
+                        changes.append((dict(current), row))
+
+                if pending:
+                    stmt = mysql_insert(table).values(pending)
+                    assignments = [(column, stmt.inserted[column]) for column in pending[0] if column != key and column not in (newer or ())]
+                    if newer:
+                        # MySQL applies the assignments in order, so last_update must be compared before it is replaced
+                        is_newer = or_(table.c.last_update.is_(None), table.c.last_update < stmt.inserted.last_update)
+                        assignments = [item for item in assignments if item[0] != "last_update"] + [
+                            (column, case((is_newer, stmt.inserted[column]), else_=table.c[column]))
+                            for column in (*newer, "last_update")
+                        ]
+                    stmt = stmt.on_duplicate_key_update(assignments)
+                    session.execute(stmt)
+
+            session.commit()
+            return counts, changes
+        except Exception as e:
+            session.rollback()
+            logger.exception("Error syncing %s: %s", table.name, e)
+            raise
 
     def add_thermostat(self, data: dict) -> Optional[Thermostat]:
         """
@@ -165,20 +478,24 @@ class MonitoringRepository:
                 ip_address=data['ip_address'],
                 mac_address=data['mac_address'],
                 temperature=data.get('temperature', 20.0),  # Default temperature
-                last_update=datetime.datetime.now(),
+                last_update=_utcnow(),
                 state=data.get('state', 'active'),  # Default state
                 room_id=data['room_id']
             )
             
             session.add(thermostat)
             session.commit()
-            print(f"Thermostat added with ID: {thermostat.id}")
+            logger.info("Thermostat added with ID: %s", thermostat.id)
+            device_event_bus.publish("thermostat", "added", [(thermostat.device_id, thermostat.room_id, {
+                "ip_address": thermostat.ip_address, "mac_address": thermostat.mac_address, "state": thermostat.state,
+                "temperature": thermostat.temperature, "last_update": thermostat.last_update
+            })])
             
             return Thermostat(
                 id=thermostat.id, device_id=thermostat.device_id, api_key=thermostat.api_key, ip_address=thermostat.ip_address, mac_address=thermostat.mac_address, state=thermostat.state, temperature=thermostat.temperature, last_update=thermostat.last_update, room_id=thermostat.room_id)
 
         except Exception as e:
-            print(f"Error add_thermostat: {e}")
+            logger.exception("Error add_thermostat: %s", e)
             session.rollback()
             return None
     
@@ -198,21 +515,89 @@ class MonitoringRepository:
                 ip_address=data['ip_address'],
                 mac_address=data['mac_address'],
                 last_analogic_value=data.get('last_analogic_value', 0.0),  # Default value
-                last_alert_time=data.get('last_alert_time', datetime.datetime.now()),  # Default to now
+                last_alert_time=_parse_datetime(data.get('last_alert_time')) or _utcnow(),  # Default to now
                 state=data.get('state', 'active'),  # Default state
                 room_id=data['room_id']
             )
             
             session.add(smoke_sensor)
             session.commit()
-            print(f"Smoke sensor added with ID: {smoke_sensor.id}")
+            logger.info("Smoke sensor added with ID: %s", smoke_sensor.id)
+            smoke_sensor_room_cache.set(smoke_sensor.device_id, smoke_sensor.room_id)
+            device_event_bus.publish("smoke_sensor", "added", [(smoke_sensor.device_id, smoke_sensor.room_id, {
+                "ip_address": smoke_sensor.ip_address, "mac_address": smoke_sensor.mac_address, "state": smoke_sensor.state,
+                "last_analogic_value": smoke_sensor.last_analogic_value, "last_alert_time": smoke_sensor.last_alert_time
+            })])
             
             return SmokeSensor(id=smoke_sensor.id, device_id=smoke_sensor.device_id, api_key=smoke_sensor.api_key, ip_address=smoke_sensor.ip_address, mac_address=smoke_sensor.mac_address, state=smoke_sensor.state,last_analogic_value=smoke_sensor.last_analogic_value, room_id=smoke_sensor.room_id, last_alert_time=smoke_sensor.last_alert_time)
         except Exception as e:
-            print(f"Error add_smoke_sensor: {e}")
+            logger.exception("Error add_smoke_sensor: %s", e)
             session.rollback()
             return None
 
+    def get_smoke_sensor_rooms(self, device_ids: list[str]) -> dict:
+        """
+        Looks up the room of smoke sensors.
+
+        :param device_ids: The IDs of the smoke sensors.
+        :return: The room ID of every known sensor, keyed by device ID.
+        """
+        rooms = {}
+        session = db.session
+        for start in range(0, len(device_ids), self.SYNC_CHUNK_SIZE):
+            rooms.update(session.execute(
+                select(SmokeSensorModel.device_id, SmokeSensorModel.room_id)
+                .where(SmokeSensorModel.device_id.in_(device_ids[start:start + self.SYNC_CHUNK_SIZE]))
+            ).all())
+        return rooms
+
+    def update_smoke_sensor_states(self, states: dict, rooms: dict = None) -> tuple[int, int]:
+        """
+        Writes the latest value and state of many smoke sensors, in one transaction.
+
+        Every chunk of sensors is written with a single UPDATE that sets each row from a CASE on
+        device_id; last_alert_time is only changed for the sensors that raised an alarm.
+
+        :param states: (value, state, alert_time) tuples keyed by device ID; alert_time is None when no alarm was raised.
+        :param rooms: The room of the sensors, keyed by device ID, for the live device feed.
+        :return: The number of sensors updated and the number of UPDATE statements run.
+        """
+        if not states:
+            return 0, 0
+
+        sensors = SmokeSensorModel.__table__
+        session = db.session
+        try:
+            updated = statements = 0
+            devices = list(states.items())
+            for start in range(0, len(devices), self.SYNC_CHUNK_SIZE):
+                chunk = dict(devices[start:start + self.SYNC_CHUNK_SIZE])
+                values = {
+                    "last_analogic_value": case({device_id: value[0] for device_id, value in chunk.items()}, value=sensors.c.device_id),
+                    "state": case({device_id: value[1] for device_id, value in chunk.items()}, value=sensors.c.device_id)
+                }
+                alerts = {device_id: value[2] for device_id, value in chunk.items() if value[2] is not None}
+                if alerts:
+                    values["last_alert_time"] = case(alerts, value=sensors.c.device_id, else_=sensors.c.last_alert_time)
+                result = session.execute(update(sensors).where(sensors.c.device_id.in_(list(chunk))).values(**values))
+                updated += result.rowcount
+                statements += 1
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Error writing the state of %d smoke sensors: %s", len(states), e)
+            raise
+
+        rooms = rooms or {}
+        changes = []
+        for device_id, (value, state, alert_time) in states.items():
+            fields = {"state": state, "last_analogic_value": value}
+            if alert_time is not None:
+                fields["last_alert_time"] = alert_time
+            changes.append((device_id, rooms.get(device_id), fields))
+        device_event_bus.publish("smoke_sensor", "updated", changes)
+        return updated, statements
+
     def validation_service(self, data: dict) -> bool:
         """
         Validates if there's an existing rfid device with the provided room_id and u_id.
@@ -225,16 +610,430 @@ class MonitoringRepository:
         room_id = data['room_id']
         u_id = data['u_id']
 
+        cached = rfid_access_cache.lookup(room_id, u_id)
+        if cached is not None:
+            return cached
+
         try:
             session = db.session
-            query = select(RfidModel).where(RfidModel.room_id == room_id, RfidModel.u_id == u_id)
-            device = session.execute(query).scalar_one_or_none()
-            return device is not None
+            query = select(RfidModel.id).where(RfidModel.room_id == room_id, RfidModel.u_id == u_id).limit(1)
+            exists = session.execute(query).scalar() is not None
+            if exists:
+                rfid_access_cache.grant(room_id, u_id)
+            else:
+                rfid_access_cache.deny(room_id, u_id)
+            return exists
         except Exception as e:
-            print(f"Error validating service: {e}")
+            logger.exception("Error validating service: %s", e)
             return False
 
-    
+    def warm_rfid_access_cache(self):
+        """
+        Loads every registered (room_id, u_id) pair into the RFID access cache.
+        """
+        try:
+            session = db.session
+            pairs = session.execute(select(RfidModel.room_id, RfidModel.u_id)).all()
+            rfid_access_cache.warm(pairs)
+            logger.info("RFID access cache warmed with %d cards.", len(pairs))
+        except Exception as e:
+            logger.exception("Error warming RFID access cache: %s", e)
+
+
+class SmokeAlertRepository:
+    """
+    Durable queue of smoke alerts waiting to be delivered to the backend.
+
+    An alert is `pending` until the dispatcher claims it, `sending` while a delivery is in
+    flight, and ends `delivered` or `failed`. A claim is a lease: an alert whose dispatcher
+    died mid-delivery becomes due again once `next_attempt_at` passes.
+    """
+
+    def enqueue(self, device_id: str, room_id: int, current_value: float, collapse_window: float) -> tuple[Optional[SmokeAlert], bool]:
+        """
+        Stores a smoke alert, or folds it into an alert of the same device and room raised within the collapse window.
+
+        :param device_id: The ID of the smoke sensor.
+        :param room_id: The ID of the room where the sensor is located.
+        :param current_value: The analog value reported by the sensor.
+        :param collapse_window: Seconds during which repeated alerts of a device are collapsed.
+        :return: The stored alert and whether it was collapsed into an existing one, or (None, False) on error.
+        """
+        session = db.session
+        now = _utcnow()
+        try:
+            query = select(SmokeAlertModel).where(
+                SmokeAlertModel.device_id == device_id,
+                SmokeAlertModel.room_id == room_id,
+                SmokeAlertModel.created_at >= now - datetime.timedelta(seconds=collapse_window),
+                SmokeAlertModel.status != 'failed'
+            ).order_by(SmokeAlertModel.created_at.desc()).limit(1).with_for_update()
+            alert = session.execute(query).scalar_one_or_none()
+
+            collapsed = alert is not None
+            if collapsed:
+                alert.collapsed_count += 1
+                if alert.status == 'pending':
+                    # the owner is told about the worst reading seen before the alert goes out
+                    alert.current_value = max(alert.current_value, current_value)
+            else:
+                alert = SmokeAlertModel(
+                    device_id=device_id,
+                    room_id=room_id,
+                    current_value=current_value,
+                    status='pending',
+                    attempts=0,
+                    collapsed_count=0,
+                    created_at=now,
+                    next_attempt_at=now
+                )
+                session.add(alert)
+            session.commit()
+            return self._to_entity(alert), collapsed
+        except Exception as e:
+            logger.exception("Error enqueuing smoke alert for device %s: %s", device_id, e)
+            session.rollback()
+            return None, False
+
+    def claim_due(self, limit: int, lease_seconds: float) -> list[SmokeAlert]:
+        """
+        Claims the alerts that are due for a delivery attempt.
+
+        :param limit: Maximum number of alerts to claim.
+        :param lease_seconds: Seconds after which a claimed alert that was not settled becomes due again.
+        :return: The claimed alerts, oldest first.
+        """
+        session = db.session
+        now = _utcnow()
+        try:
+            query = select(SmokeAlertModel).where(
+                SmokeAlertModel.status.in_(['pending', 'sending']),
+                SmokeAlertModel.next_attempt_at <= now
+            ).order_by(SmokeAlertModel.next_attempt_at).limit(limit).with_for_update(skip_locked=True)
+            alerts = session.execute(query).scalars().all()
+            for alert in alerts:
+                alert.status = 'sending'
+                alert.attempts += 1
+                alert.next_attempt_at = now + datetime.timedelta(seconds=lease_seconds)
+            session.commit()
+            return [self._to_entity(alert) for alert in alerts]
+        except Exception as e:
+            logger.exception("Error claiming smoke alerts: %s", e)
+            session.rollback()
+            return []
+
+    def mark_delivered(self, alert_id: int) -> Optional[datetime.datetime]:
+        """
+        Records a successful delivery.
+
+        :param alert_id: The ID of the alert.
+        :return: The delivery time, or None on error.
+        """
+        session = db.session
+        try:
+            alert = session.get(SmokeAlertModel, alert_id)
+            alert.status = 'delivered'
+            alert.delivered_at = _utcnow()
+            alert.last_error = None
+            session.commit()
+            return alert.delivered_at
+        except Exception as e:
+            logger.exception("Error marking smoke alert %s as delivered: %s", alert_id, e)
+            session.rollback()
+            return None
+
+    def mark_failed(self, alert_id: int, error: str, retry_at: Optional[datetime.datetime]):
+        """
+        Records a failed delivery attempt.
+
+        :param alert_id: The ID of the alert.
+        :param error: Description of the failure.
+        :param retry_at: When to try again, or None to give up on the alert.
+        """
+        session = db.session
+        try:
+            alert = session.get(SmokeAlertModel, alert_id)
+            alert.last_error = error[:255]
+            if retry_at is None:
+                alert.status = 'failed'
+            else:
+                alert.status = 'pending'
+                alert.next_attempt_at = retry_at
+            session.commit()
+        except Exception as e:
+            logger.exception("Error marking smoke alert %s as failed: %s", alert_id, e)
+            session.rollback()
+
+    def count_by_status(self) -> dict:
+        """
+        Counts the alerts of the queue by status.
+
+        :return: A dictionary with the number of alerts of every status.
+        """
+        session = db.session
+        rows = session.execute(select(SmokeAlertModel.status, func.count()).group_by(SmokeAlertModel.status)).all()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _to_entity(alert) -> SmokeAlert:
+        return SmokeAlert(id=alert.id, device_id=alert.device_id, room_id=alert.room_id,
+                          current_value=alert.current_value, status=alert.status,
+                          attempts=alert.attempts, collapsed_count=alert.collapsed_count,
+                          created_at=alert.created_at, next_attempt_at=alert.next_attempt_at,
+                          delivered_at=alert.delivered_at, last_error=alert.last_error)
+
+
+
+class TelemetryRepository:
+    """
+    Writes the thermostat reading history, maintains its daily partitions and keeps the
+    per-device and per-room rollups of every device kind up to date.
+    """
+
+    # rows per multi-row INSERT, and thermostats per CASE-based UPDATE
+    INSERT_CHUNK_SIZE = 1000
+    UPDATE_CHUNK_SIZE = 500
+
+    READINGS_TABLE = "thermostat_readings"
+
+    # rollup bucket sizes in seconds: 1 minute, 15 minutes and 1 hour
+    ROLLUP_RESOLUTIONS = (60, 900, 3600)
+    # rollup buckets start at multiples of their resolution counted from this instant
+    ROLLUP_EPOCH = datetime.datetime(1970, 1, 1)
+    # the table that knows the room of every device of a kind
+    ROLLUP_DEVICE_MODELS = {"thermostat": ThermostatModel, "smoke_sensor": SmokeSensorModel}
+
+    def add_thermostat_readings(self, readings: list[tuple]) -> int:
+        """
+        Appends readings to the history and moves every thermostat to its newest reading, in one transaction.
+
+        The readings are written with multi-row INSERTs. The current values are written with one
+        UPDATE per chunk of thermostats, which sets every row from a CASE on device_id. The stored
+        last_update of the chunk is read and locked first, so thermostats that already hold a newer
+        value are skipped and only the ones actually updated are published. Readings of unknown
+        thermostats are kept in the history but update nothing.
+
+        device_id is compared the way MySQL does (case-insensitive, ignoring trailing spaces), so a
+        reading for "THERM-1 " updates the stored "therm-1" and is published under that ID.
+
+        :param readings: (device_id, temperature, recorded_at) tuples, with naive UTC timestamps.
+        :return: The number of thermostats whose current values were updated.
+        """
+        if not readings:
+            return 0
+
+        latest = {}
+        for device_id, temperature, recorded_at in readings:
+            key = _collation_key(device_id)
+            current = latest.get(key)
+            if current is None or recorded_at >= current[2]:
+                latest[key] = (device_id, temperature, recorded_at)
+
+        readings_table = ThermostatReadingModel.__table__
+        thermostats = ThermostatModel.__table__
+        session = db.session
+        try:
+            for start in range(0, len(readings), self.INSERT_CHUNK_SIZE):
+                session.execute(insert(readings_table).values([
+                    {"device_id": device_id, "temperature": temperature, "recorded_at": recorded_at}
+                    for device_id, temperature, recorded_at in readings[start:start + self.INSERT_CHUNK_SIZE]
+                ]))
+
+            updated = {}
+            devices = list(latest.values())
+            for start in range(0, len(devices), self.UPDATE_CHUNK_SIZE):
+                stored = session.execute(
+                    select(thermostats.c.device_id, thermostats.c.last_update)
+                    .where(thermostats.c.device_id.in_([device[0] for device in devices[start:start + self.UPDATE_CHUNK_SIZE]]))
+                    .with_for_update()
+                ).all()
+                # keyed by the stored device_id from here on
+                chunk = {}
+                for device_id, last_update in stored:
+                    reading = latest.get(_collation_key(device_id))
+                    if reading is not None and last_update is not None and last_update <= reading[2]:
+                        chunk[device_id] = reading[1:]
+                if not chunk:
+                    continue
+                recorded_at = case({device_id: value[1] for device_id, value in chunk.items()}, value=thermostats.c.device_id)
+                session.execute(
+                    update(thermostats)
+                    .where(thermostats.c.device_id.in_(list(chunk)))
+                    .values(
+                        temperature=case({device_id: value[0] for device_id, value in chunk.items()}, value=thermostats.c.device_id),
+                        last_update=recorded_at
+                    )
+                )
+                updated.update(chunk)
+
+            rooms = self._add_rollups(session, "thermostat", readings)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Error writing %d thermostat readings: %s", len(readings), e)
+            raise
+
+        device_event_bus.publish("thermostat", "updated", [
+            (device_id, rooms[device_id], {"temperature": temperature, "last_update": recorded_at})
+            for device_id, (temperature, recorded_at) in updated.items() if device_id in rooms
+        ])
+        return len(updated)
+
+    def is_available(self) -> bool:
+        """
+        Checks whether the database answers, to tell an outage from a write that cannot succeed.
+        """
+        session = db.session
+        try:
+            session.execute(text("SELECT 1"))
+            session.rollback()
+            return True
+        except Exception as e:
+            session.rollback()
+            logger.warning("Database unavailable: %s", e)
+            return False
+
+    def add_rollups(self, kind: str, readings: list[tuple]):
+        """
+        Folds readings into the rollups of their devices and rooms, in its own transaction.
+
+        :param kind: A key of ROLLUP_DEVICE_MODELS.
+        :param readings: (device_id, value, recorded_at) tuples, with naive UTC timestamps.
+        """
+        session = db.session
+        try:
+            self._add_rollups(session, kind, readings)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Error writing %s rollups: %s", kind, e)
+            raise
+
+    def _add_rollups(self, session, kind: str, readings: list[tuple]):
+        """
+        Adds readings to the rollups with one INSERT ... ON DUPLICATE KEY UPDATE per chunk.
+
+        The readings are aggregated per bucket in memory first, so a flush writes one row per
+        series and bucket however many readings it holds; existing buckets are merged in SQL.
+
+        :return: The room of every known device among the readings, keyed by device ID.
+        """
+        if not readings:
+            return {}
+        devices = self.ROLLUP_DEVICE_MODELS[kind].__table__
+        rooms = {}
+        device_ids = list({reading[0] for reading in readings})
+        for start in range(0, len(device_ids), self.UPDATE_CHUNK_SIZE):
+            rooms.update(session.execute(
+                select(devices.c.device_id, devices.c.room_id)
+                .where(devices.c.device_id.in_(device_ids[start:start + self.UPDATE_CHUNK_SIZE]))
+            ).all())
+
+        buckets = _rollup_buckets(readings, rooms, self.ROLLUP_RESOLUTIONS)
+        # a stable key order keeps concurrent upserts from locking the same rows in opposite orders
+        rows = [{
+            "kind": kind, "scope": scope, "scope_id": scope_id, "resolution": resolution, "bucket_start": bucket_start,
+            "samples": samples, "total": total, "min_value": low, "max_value": high
+        } for (scope, scope_id, resolution, bucket_start), (samples, total, low, high) in sorted(buckets.items())]
+
+        table = TelemetryRollupModel.__table__
+        for start in range(0, len(rows), self.INSERT_CHUNK_SIZE):
+            stmt = mysql_insert(table).values(rows[start:start + self.INSERT_CHUNK_SIZE])
+            session.execute(stmt.on_duplicate_key_update(
+                samples=table.c.samples + stmt.inserted.samples,
+                total=table.c.total + stmt.inserted.total,
+                min_value=func.least(table.c.min_value, stmt.inserted.min_value),
+                max_value=func.greatest(table.c.max_value, stmt.inserted.max_value)
+            ))
+        return rooms
+
+    def get_rollups(self, kind: str, scope: str, scope_id: str, resolution: int, start: datetime.datetime, end: datetime.datetime) -> list[tuple]:
+        """
+        Reads the rollup buckets of one series that start within a time range.
+
+        :param kind: The device kind, e.g. 'thermostat'.
+        :param scope: 'device' or 'room'.
+        :param scope_id: The device ID, or the room ID as a string.
+        :param resolution: The bucket size in seconds, one of ROLLUP_RESOLUTIONS.
+        :param start: The first bucket start included, naive UTC.
+        :param end: The bucket starts before this time are included, naive UTC.
+        :return: (bucket_start, samples, total, min_value, max_value) tuples in time order.
+        """
+        table = TelemetryRollupModel.__table__
+        query = (
+            select(table.c.bucket_start, table.c.samples, table.c.total, table.c.min_value, table.c.max_value)
+            .where(table.c.kind == kind, table.c.scope == scope, table.c.scope_id == scope_id,
+                   table.c.resolution == resolution, table.c.bucket_start >= start, table.c.bucket_start < end)
+            .order_by(table.c.bucket_start)
+        )
+        return [tuple(row) for row in db.session.execute(query)]
+
+    def prune_rollups(self, resolution: int, before: datetime.datetime, batch_size: int = 10000) -> int:
+        """
+        Deletes the rollup buckets of a resolution that start before a time, a batch at a time.
+
+        :param resolution: The bucket size in seconds.
+        :param before: The buckets starting before this time are deleted, naive UTC.
+        :param batch_size: Rows deleted per statement, so no statement holds locks for long.
+        :return: The number of buckets deleted.
+        """
+        table = TelemetryRollupModel.__table__
+        session = db.session
+        deleted = 0
+        while True:
+            result = session.execute(
+                table.delete()
+                .where(table.c.resolution == resolution, table.c.bucket_start < before)
+                .with_dialect_options(mysql_limit=batch_size)
+            )
+            session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+    def get_reading_partitions(self) -> list[str]:
+        """
+        Lists the partitions of the readings table.
+
+        :return: The partition names in order, e.g. `p20250601` for the readings of that day and `pmax` last.
+        """
+        rows = db.session.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() "
+            "AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {"table": self.READINGS_TABLE}).scalars().all()
+        db.session.commit()
+        return list(rows)
+
+    def add_reading_partitions(self, days: list[datetime.date]):
+        """
+        Creates one partition per day by splitting the catch-all partition.
+
+        :param days: The days to create partitions for, in ascending order, all after the last daily partition.
+        """
+        if not days:
+            return
+        partitions = ", ".join(
+            f"PARTITION p{day:%Y%m%d} VALUES LESS THAN (TO_DAYS('{day + datetime.timedelta(days=1):%Y-%m-%d}'))"
+            for day in days
+        )
+        db.session.execute(text(
+            f"ALTER TABLE {self.READINGS_TABLE} REORGANIZE PARTITION pmax INTO "
+            f"({partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ))
+        db.session.commit()
+
+    def drop_reading_partitions(self, names: list[str]):
+        """
+        Drops whole partitions of readings, which is how old readings are deleted.
+
+        :param names: The partition names.
+        """
+        if not names:
+            return
+        db.session.execute(text(f"ALTER TABLE {self.READINGS_TABLE} DROP PARTITION {', '.join(names)}"))
+        db.session.commit()
+
+
 class BookingRepository:
     def get_booking_by_customer_id(self, customer_id: str) -> Optional[Booking]:
         """
@@ -249,7 +1048,7 @@ class BookingRepository:
             
             return booking
         except Exception as e:
-            print(f"Error retrieving booking by customer ID {customer_id}: {e}")
+            logger.exception("Error retrieving booking by customer ID %s: %s", customer_id, e)
             return None
 
 
@@ -264,7 +1063,7 @@ class BookingRepository:
             bookings = BookingExternalService.get_bookings(hotel_id)
             return bookings
         except Exception as e:
-            print(f"Error retrieving bookings for hotel {hotel_id}: {e}")
+            logger.exception("Error retrieving bookings for hotel %s: %s", hotel_id, e)
             return []
     
     def check_in(self, booking_id: str) -> bool:
@@ -281,7 +1080,7 @@ class BookingRepository:
         try:
             BookingExternalService.update_booking_state(booking_id, 'checked_in')
         except Exception as e:
-            print(f"Error updating booking state for {booking_id}: {e}")
+            logger.warning("Error updating booking state for %s: %s", booking_id, e)
 
         session = db.session
         try:
@@ -307,7 +1106,7 @@ class BookingRepository:
             return True
         except Exception as e:
             session.rollback()
-            print(f"Error checking in booking {booking_id}: {e}")
+            logger.exception("Error checking in booking %s: %s", booking_id, e)
             return False
         
     def check_out(self, booking_id: str) -> bool:
@@ -322,7 +1121,7 @@ class BookingRepository:
         try:
             BookingExternalService.update_booking_state(booking_id, 'checked_out')
         except Exception as e:
-            print(f"Error updating booking state for {booking_id}: {e}")
+            logger.warning("Error updating booking state for %s: %s", booking_id, e)
         
         session = db.session
 
@@ -330,7 +1129,7 @@ class BookingRepository:
             # removing from the local database
             
             query = select(BookingModel).where(BookingModel.id == booking_id)
-            booking = db.session.execute(query).scalar_one_or_none()
+            booking = session.execute(query).scalar_one_or_none()
             if not booking:
                 return False
             
@@ -339,7 +1138,109 @@ class BookingRepository:
             return True
         except Exception as e:
             session.rollback()
-            print(f"Error checking out booking {booking_id}: {e}")
+            logger.exception("Error checking out booking %s: %s", booking_id, e)
             return False
-        
-        
\ No newline at end of file
+
+
+def _rollup_buckets(readings: list[tuple], rooms: dict, resolutions) -> dict:
+    """
+    Aggregates readings into the buckets of their device and of their room at every resolution.
+
+    :param readings: (device_id, value, recorded_at) tuples, with naive UTC timestamps.
+    :param rooms: The room ID of every known device; readings of other devices only roll up per device.
+    :param resolutions: The bucket sizes in seconds.
+    :return: [samples, total, min, max] per (scope, scope_id, resolution, bucket_start).
+    """
+    buckets = {}
+    for device_id, value, recorded_at in readings:
+        seconds = int((recorded_at - TelemetryRepository.ROLLUP_EPOCH).total_seconds())
+        room_id = rooms.get(device_id)
+        for resolution in resolutions:
+            bucket_start = TelemetryRepository.ROLLUP_EPOCH + datetime.timedelta(seconds=seconds - seconds % resolution)
+            for scope, scope_id in (("device", device_id), ("room", room_id)):
+                if scope_id is None:
+                    continue
+                key = (scope, str(scope_id), resolution, bucket_start)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = [1, value, value, value]
+                else:
+                    bucket[0] += 1
+                    bucket[1] += value
+                    if value < bucket[2]:
+                        bucket[2] = value
+                    if value > bucket[3]:
+                        bucket[3] = value
+    return buckets
+
+
+def _publish_changes(device_type: str, changes: list[tuple]):
+    """
+    Publishes the rows written by a backend sync to the live device feed.
+
+    :param device_type: A key of DEVICE_EVENT_FIELDS.
+    :param changes: The (previous_row, new_row) pairs returned by `_bulk_upsert`.
+    """
+    for action, rows in (("added", [row for previous, row in changes if previous is None]),
+                         ("updated", [row for previous, row in changes if previous is not None])):
+        device_event_bus.publish(device_type, action, [(row["device_id"], row["room_id"], row) for row in rows])
+
+
+def _sync_rows(device_type: str, items: list, build) -> tuple[list[dict], int]:
+    """
+    Builds the rows of a backend sync, leaving out the items that cannot be stored.
+
+    :param device_type: The kind of device, for the log.
+    :param items: The payload of the backend.
+    :param build: Turns one item into a row; raises when the item is malformed.
+    :return: The rows and the number of items left out.
+    """
+    rows, invalid = [], 0
+    for item in items:
+        try:
+            rows.append(build(item))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            invalid += 1
+            logger.warning("Skipping invalid %s from the backend (%s): %.200r", device_type, e, item)
+    return rows, invalid
+
+
+def _sync_id(value) -> str:
+    if value is None or isinstance(value, (bool, dict, list)) or not str(value).strip():
+        raise ValueError("missing id")
+    if len(str(value)) > 100:
+        raise ValueError("id longer than 100 characters")
+    return str(value)
+
+
+def _parse_datetime(value):
+    """
+    Parses a datetime sent by the backend into the naive, second-precision value MySQL stores.
+
+    :param value: An ISO-8601 string, a datetime or None.
+    :return: The parsed datetime, or None.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def _collation_key(device_id: str) -> str:
+    """
+    Folds a device ID the way the case-insensitive, pad-space collation of the device tables compares it.
+    """
+    return device_id.rstrip(" ").casefold()
+
+
+def _utcnow() -> datetime.datetime:
+    """
+    Returns the current time as the naive UTC value MySQL stores.
+    """
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
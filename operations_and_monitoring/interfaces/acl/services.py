@@ -1,180 +1,95 @@
-from flasgger import swag_from
-
 from inventory.domain.entities import Rfid
-from operations_and_monitoring.domain.entities import Thermostat, SmokeSensor
+from operations_and_monitoring.domain.entities import Thermostat
 from operations_and_monitoring.infrastructure.repositories import MonitoringRepository
+from operations_and_monitoring.infrastructure.cache import hotel_metadata_cache
+from operations_and_monitoring.application.workers import device_sync_worker
+from operations_and_monitoring.application.services import smoke_detection_service, telemetry_service
 from iam.domain.entities import Device
-import requests
-from shared.infrastructure.hotelconfig import   BACKEND_URL, HOTEL_ID
+from shared.infrastructure.token_manager import token_manager
+import datetime
 
 
 class MonitoringFacade:
     def __init__(self):
         self.repository = MonitoringRepository()
+        self.smoke_detection_service = smoke_detection_service
+        self.telemetry_service = telemetry_service
 
     def get_devices_by_room_id(self, room_id: str) -> list[Device]:
         if room_id == None or room_id == "":
             raise Exception("room_id parameter is necessary")
 
-        thermostats = self.repository.get_thermostats()
-        smoke_sensors = self.repository.get_smoke_sensors()
-        rfid_devices = self.repository.get_rfid()
-
-        devices = thermostats + smoke_sensors + rfid_devices
-        
-        return [device for device in devices if device.room_id == room_id]
+        return self.repository.get_devices_by_room_id(room_id)
 
     def get_rfid_by_room_id(self, room_id) -> list[Rfid]:
-        print(f"[MonitoringFacade] Entrando a get_rfid_by_room_id con room_id={room_id}")
-
         if not room_id:
             raise Exception("room_id parameter is necessary")
 
-        #rfids = self.repository.get_rfid()
-        #print(f"[MonitoringFacade] Total RFID in DB: {len(rfids)}")
-
-        #result = [r for r in rfids if r.room_id == room_id]
-        #print(f"[MonitoringFacade] Found {len(result)} RFID for room_id={room_id}")
-
-        #if result:
-            #print("[MonitoringFacade] Returning local RFID readers.")
-            #return result
-
-        print("[MonitoringFacade] No local RFID readers found. Fetching from backend...")
-
-        # Paso 1: Obtener token
-        token = self._get_auth_token()
-        if not token:
-            raise Exception("Authentication with backend failed")
-
-        # Paso 2: Obtener RFID readers del backend
-        try:
-            url = f"{BACKEND_URL}/rfid-card/hotel/{HOTEL_ID}"  # ✅ insertar hotelId en la URL
-
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-
-            response = requests.get(url, headers=headers)
-
-            print(f"[MonitoringFacade] Backend responded with status code: {response.status_code}")
-            if response.status_code != 200:
-                raise Exception(f"Error fetching RFID readers: {response.status_code}")
-
-            data = response.json()
-            print(f"[MonitoringFacade] Received {len(data)} items from backend.")
-            print(f"[MonitoringFacade] Backend raw response text: {response.text}")
-            print(f"[MonitoringFacade] Backend parsed JSON: {data}")
-
-            for item in data:
-                print(f"[MonitoringFacade] Saving RFID item: {item}")
-                self.repository.save_rfid(item)
-
-            # Luego de guardar, consultar nuevamente en local
-            rfids = self.repository.get_rfid()
-            print(f"[MonitoringFacade] Filtrando por room_id={room_id} (type={type(room_id)})")
-            for r in rfids:
-                print(f" - RFID room_id={r.room_id} (type={type(r.room_id)})")
-
-            final_result = [r for r in rfids if int(r.room_id) == int(room_id)]
-            return final_result
-
-        except Exception as e:
-            print(f"[MonitoringFacade] Failed to fetch RFID readers: {e}")
-            return []
+        # the local table is kept in sync with the backend by the device registry sync worker
+        return self.repository.get_rfid_by_room_id(int(room_id))
 
     def get_thermostats_by_room_id(self, room_id) -> list[Thermostat]:
         if not room_id:
             raise Exception("room_id parameter is necessary")
 
-        thermostats = self.repository.get_thermostats()
+        return self.repository.get_thermostats_by_room_id(room_id)
 
-        result = [t for t in thermostats if t.room_id == room_id]
+    def get_sync_status(self, resource: str) -> dict:
+        """
+        Returns how stale the local copy of a backend device list is.
 
-        #if result:
-        #    return result
+        :param resource: 'thermostats' or 'rfid_devices'.
+        :return: The freshness information of the device registry sync worker.
+        """
+        return device_sync_worker.freshness(resource)
 
-        # Si no hay termostatos en la base local, hacer fetch al backend
-        print("[MonitoringFacade] No local thermostats found. Fetching from backend...")
+    def request_sync(self):
+        """
+        Asks the device registry sync worker to refresh the local device tables now.
+        """
+        device_sync_worker.trigger()
 
-        # Paso 1: Obtener token
-        token = self._get_auth_token()
-        if not token:
-            raise Exception("Authentication with backend failed")
+    def get_owner_id_by_hotel_id(self, hotel_id: str) -> int:
+        return hotel_metadata_cache.owner_id(hotel_id)
 
-        # Paso 2: Obtener termostatos del backend
-        try:
-            url = f"{BACKEND_URL}/thermostat/get-all-thermostats"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            params = {
-                "hotelId": HOTEL_ID
-            }
-            response = requests.get(url, headers=headers, params=params)
+    def get_hotel(self, hotel_id: str) -> dict:
+        """
+        Returns the hotel record of the backend, served from the hotel metadata cache.
 
-            if response.status_code != 200:
-                raise Exception(f"Error fetching thermostats: {response.status_code}")
+        :param hotel_id: The ID of the hotel.
+        :return: The hotel data, or None if it is unknown.
+        """
+        return hotel_metadata_cache.get(hotel_id)
 
-            data = response.json()
+    def refresh_hotel(self, hotel_id: str) -> dict:
+        """
+        Loads the hotel record again from the backend, keeping the cached one if that fails.
 
-            for item in data:
-                self.repository.save_thermostat(item)
+        :param hotel_id: The ID of the hotel.
+        :return: The hotel data, or the last known one if the backend is unavailable.
+        """
+        return hotel_metadata_cache.refresh(hotel_id)
 
-            # Ahora sí los buscas otra vez localmente
-            thermostats = self.repository.get_thermostats()
-            return [t for t in thermostats if t.room_id == room_id]
+    def send_notification(self, device_id: str, current_value: float):
+        """
+        Evaluates a smoke reading and queues an alert for the hotel owner when it raises an alarm.
 
-        except Exception as e:
-            print(f"[MonitoringFacade] Failed to fetch thermostats: {e}")
-            return []
+        :param device_id: The ID of the smoke sensor.
+        :param current_value: The analog value reported by the sensor.
+        :return: The evaluation (None for an unknown sensor), the queued alert (None unless an alarm was raised) and whether it was collapsed into a recent alert of the same sensor.
+        """
+        return self.smoke_detection_service.process_reading(device_id, current_value)
 
-    def get_owner_id_by_hotel_id(self, hotel_id: str) -> int:
-        token = self._get_auth_token()
-        if not token:
-            raise Exception("Authentication with backend failed")
-
-        try:
-            url = f"{BACKEND_URL}/hotels/{hotel_id}"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            response = requests.get(url, headers=headers)
-
-            if response.status_code != 200:
-                print(f"[MonitoringFacade] Error al obtener owner_id: {response.status_code}")
-                return None
-
-            data = response.json()
-            owner_id = data.get("ownerId")
-            print(f"[MonitoringFacade] Owner ID obtenido: {owner_id}")
-            return owner_id
-        except Exception as e:
-            print(f"[MonitoringFacade] Excepción al obtener owner_id: {e}")
-            return None
+    def ingest_thermostat_readings(self, items: list) -> tuple[int, list[dict], bool]:
+        return self.telemetry_service.ingest_thermostat_readings(items)
+
+    def ingest_smoke_readings(self, items: list) -> tuple[int, list[dict], list[dict], bool]:
+        return self.telemetry_service.ingest_smoke_readings(items)
+
+    def get_history(self, kind: str, scope: str, scope_id: str, start: datetime.datetime, end: datetime.datetime,
+                    max_points: int, resolution: int = None) -> dict:
+        return self.telemetry_service.get_history(kind, scope, scope_id, start, end, max_points, resolution)
 
     def _get_auth_token(self) -> str:
-        """Obtiene el token de autenticación para acceder al backend"""
-        try:
-            auth_url = f"{BACKEND_URL}/authentication/sign-in"
-            payload = {
-                "email": "iot@manager.com",
-                "password": "string",
-                "roleId": 1
-            }
-            response = requests.post(auth_url, json=payload)
-            print(f"[Auth] Status: {response.status_code}, Response: {response.text}")
-
-            if response.status_code != 200:
-                print(f"[Auth] Error al autenticar: {response.status_code}")
-                return None
-
-            token = response.json().get("token")
-            print(f"[Auth] Token recibido: {token}")
-            return token
-        except Exception as e:
-            print(f"[Auth] Excepción durante la autenticación: {e}")
-            return None
+        """Obtiene el token de autenticación para acceder al backend (cacheado por el token manager)"""
+        return token_manager.get_token()
@@ -1,14 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flasgger import swag_from
 
-from inventory.domain.entities import Rfid
 from operations_and_monitoring.application.services import MonitoringService
 from operations_and_monitoring.application.services import BookingService
-from operations_and_monitoring.domain.entities import Thermostat
-from operations_and_monitoring.infrastructure.repositories import MonitoringRepository
+from operations_and_monitoring.infrastructure.events import DEVICE_EVENT_FIELDS, device_event_bus
+from operations_and_monitoring.application.services import HISTORY_KINDS
 from operations_and_monitoring.interfaces.acl.services import MonitoringFacade
-import requests
-from shared.infrastructure.hotelconfig import   BACKEND_URL, HOTEL_ID
+from shared.infrastructure.hotelconfig import HOTEL_ID
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.pagination import InvalidPageRequest, parse_page_request
+from shared.interfaces.pagination import page_response
+from shared.interfaces.streaming import event_stream_response, parse_stream_format, sse_event, stream_grouped_response, stream_response
+import datetime, math, os
+
+logger = get_logger(__name__)
 
 monitoring_api = Blueprint('monitoring', __name__)
 operations_api = Blueprint('operations', __name__)
@@ -17,6 +22,12 @@ monitoring_service = MonitoringService()
 operations_service = BookingService()
 monitoring_facade = MonitoringFacade()
 
+TELEMETRY_BATCH_LIMIT = int(os.getenv("TELEMETRY_BATCH_LIMIT", "5000"))
+HISTORY_DEFAULT_POINTS = int(os.getenv("HISTORY_DEFAULT_POINTS", "500"))
+HISTORY_MAX_POINTS = int(os.getenv("HISTORY_MAX_POINTS", "5000"))
+DEVICE_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("DEVICE_EVENTS_HEARTBEAT_SECONDS", "15"))
+DEVICE_EVENTS_RETRY_MS = int(os.getenv("DEVICE_EVENTS_RETRY_MS", "3000"))
+
 
 
 """
@@ -29,29 +40,158 @@ Endpoint to retrieve all devices (thermostats, smoke sensors adn rfid readers) a
 def get_devices():
     """
     Retrieves all devices (thermostats, smoke sensors and rfid readers) associated with a hotel.
+    The limit applies to every device list; the next page continues only the lists that have more devices.
     ---
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of items to return (default 100, capped at 1000).
+      - in: query
+        name: cursor
+        type: string
+        description: The X-Next-Cursor header of the previous page.
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of the fields to return.
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        description: Stream every remaining item instead of one page, as NDJSON or as a chunked JSON array.
     responses:
       200:
         description: Devices retrieved successfully
+      400:
+        description: Invalid limit, cursor or fields
       500:
         description: Internal server error
     """
 
     try:
-        thermostats = monitoring_service.get_thermostats()
-        smoke_sensors = monitoring_service.get_smoke_sensors()
-        rfid_devices = monitoring_service.get_rfid()
-
-        devices = {
-            "thermostats": [thermostat.to_json() for thermostat in thermostats],
-            "smoke_sensors": [smoke_sensor.to_json() for smoke_sensor in smoke_sensors],
-            "rfid_devices": [rfid.to_json() for rfid in rfid_devices]
-        }
-
-        return jsonify(devices), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_grouped_response(monitoring_service.stream_devices(page), stream)
+        return page_response(monitoring_service.get_devices_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@monitoring_api.route('/monitoring/devices/events', methods=['GET'])
+@swag_from({
+    'tags': ['Monitoring']
+})
+def get_device_events():
+    """
+    Pushes the device state changes as Server-Sent Events, instead of polling /monitoring/devices.
+    Every event is one device delta (`added` or `updated`) named after the device type, with the
+    changed fields in `data`. A client without a cursor receives a `ready` event: it loads the
+    device lists once, then applies the deltas. On reconnect the browser sends the last event id
+    in Last-Event-ID and the missed events are replayed; a `reset` event means they are no longer
+    available (or the node restarted) and the device lists must be loaded again.
+    ---
+    parameters:
+      - in: query
+        name: type
+        type: string
+        description: Comma-separated device types to receive (thermostat, smoke_sensor, rfid); all by default.
+      - in: query
+        name: room_id
+        type: string
+        description: Comma-separated room IDs to receive; all rooms by default.
+      - in: query
+        name: since
+        type: string
+        description: The id of the last event seen, for clients that cannot send Last-Event-ID.
+      - in: header
+        name: Last-Event-ID
+        type: string
+        description: The id of the last event seen; sent by the browser when it reconnects.
+    produces:
+      - text/event-stream
+    responses:
+      200:
+        description: The event stream; a comment line is sent every DEVICE_EVENTS_HEARTBEAT_SECONDS while idle
+      400:
+        description: Invalid type or room_id
+      503:
+        description: Every live feed connection is taken; retry later
+    """
+    try:
+        device_types = _query_set('type', str)
+        room_ids = _query_set('room_id', int)
+    except ValueError:
+        return jsonify({"error": "room_id must be a comma-separated list of integers"}), 400
+    if device_types and not device_types <= set(DEVICE_EVENT_FIELDS):
+        return jsonify({"error": f"type must be a comma-separated list of {', '.join(DEVICE_EVENT_FIELDS)}"}), 400
+
+    if not device_event_bus.subscribe():
+        response = jsonify({"error": "Too many live feed connections, retry later"})
+        response.headers['Retry-After'] = str(DEVICE_EVENTS_RETRY_MS // 1000 or 1)
+        return response, 503
+
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since')
+    response = event_stream_response(_device_event_stream(cursor, device_types, room_ids, current_app.json.dumps))
+    # runs when the server closes the response, also when the client left before the first event
+    response.call_on_close(device_event_bus.unsubscribe)
+    return response
+
+
+def _query_set(name: str, cast):
+    """
+    Reads a comma-separated query parameter.
+
+    :return: The set of values, or None when the parameter is missing.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    return {cast(item.strip()) for item in value.split(',') if item.strip()}
+
+
+def _device_event_stream(cursor, device_types, room_ids, dumps):
+    """
+    Yields the device events of one live feed connection until the client goes away.
+
+    :param cursor: The `<epoch>:<seq>` id of the last event seen, or None.
+    :param device_types: The device types to send, or None for all.
+    :param room_ids: The rooms to send, or None for all.
+    :param dumps: The JSON serializer of the application.
+    """
+    epoch = device_event_bus.epoch
+    yield f"retry: {DEVICE_EVENTS_RETRY_MS}\n\n"
+
+    seq = None
+    if cursor:
+        cursor_epoch, _, cursor_seq = cursor.partition(':')
+        if cursor_epoch == epoch and cursor_seq.isdigit():
+            seq = int(cursor_seq)
+    if seq is None:
+        seq = device_event_bus.last_seq
+        if cursor:
+            yield sse_event(dumps({"seq": seq, "reason": "restarted"}), "reset", f"{epoch}:{seq}")
+        else:
+            yield sse_event(dumps({"seq": seq}), "ready", f"{epoch}:{seq}")
+
+    while True:
+        events, missed, last = device_event_bus.since(seq, device_types, room_ids)
+        if missed:
+            yield sse_event(dumps({"seq": last, "reason": "missed"}), "reset", f"{epoch}:{last}")
+        else:
+            for event in events:
+                yield sse_event(dumps(event.to_json()), event.device_type, f"{epoch}:{event.seq}")
+            if last > seq and (not events or events[-1].seq != last):
+                # moves the client cursor past the events it filtered out, so a reconnect does not replay them
+                yield f"id: {epoch}:{last}\n\n"
+        seq = last
+
+        if not device_event_bus.wait(seq, DEVICE_EVENTS_HEARTBEAT_SECONDS):
+            yield ": keepalive\n\n"
+
+
 @monitoring_api.route('/monitoring/devices/validation', methods=['POST'])
 @swag_from({
     'tags': ['Monitoring']
@@ -85,7 +225,7 @@ def validation_service():
 
     try:
         data = request.json
-        print(data)
+        logger.debug("Validation request: %s", data)
         room_id = data.get('room_id')
         u_id = data.get('u_id')
         if not room_id or not u_id:
@@ -106,6 +246,7 @@ Endpoint to retrieve all thermostats associated with a hotel.
     'tags': ['Monitoring'],
     'responses': {
         200: {'description': 'Thermostats retrieved successfully'},
+        400: {'description': 'Invalid limit, cursor or fields'},
         500: {'description': 'Internal server error'}
     }
 })
@@ -114,8 +255,13 @@ def get_thermostats():
     Retrieves all thermostats associated with a hotel.
     """
     try:
-        thermostats = monitoring_service.get_thermostats()
-        return jsonify([t.to_json() for t in thermostats]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(monitoring_service.stream_thermostats(page), stream)
+        return page_response(monitoring_service.get_thermostats_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -124,6 +270,7 @@ def get_thermostats():
     'tags': ['Monitoring'],
     'responses': {
         200: {'description': 'Smoke sensors retrieved successfully'},
+        400: {'description': 'Invalid limit, cursor or fields'},
         500: {'description': 'Internal server error'}
     }
 })
@@ -132,8 +279,13 @@ def get_smoke_sensors():
     Retrieves all smoke sensors associated with a hotel.
     """
     try:
-        smoke_sensors = monitoring_service.get_smoke_sensors()
-        return jsonify([s.to_json() for s in smoke_sensors]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(monitoring_service.stream_smoke_sensors(page), stream)
+        return page_response(monitoring_service.get_smoke_sensors_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -142,6 +294,7 @@ def get_smoke_sensors():
     'tags': ['Monitoring'],
     'responses': {
         200: {'description': 'RFID devices retrieved successfully'},
+        400: {'description': 'Invalid limit, cursor or fields'},
         500: {'description': 'Internal server error'}
     }
 })
@@ -150,8 +303,13 @@ def get_rfid_devices():
     Retrieves all RFID devices associated with a hotel.
     """
     try:
-        rfid_devices = monitoring_service.get_rfid()
-        return jsonify([r.to_json() for r in rfid_devices]), 200
+        page = parse_page_request(request.args)
+        stream = parse_stream_format(request.args)
+        if stream:
+            return stream_response(monitoring_service.stream_rfid(page), stream)
+        return page_response(monitoring_service.get_rfid_page(page))
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -298,16 +456,29 @@ def get_bookings(hotel_id):
         name: hotel_id
         type: string
         required: true
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        description: Stream every remaining item instead of one page, as NDJSON or as a chunked JSON array.
     responses:
       200:
         description: Bookings retrieved successfully
+      400:
+        description: Invalid stream format
       500:
         description: Internal server error
     """
 
     try:
+        stream = parse_stream_format(request.args)
         bookings = operations_service.get_bookings(hotel_id)
-        return jsonify([booking.to_dict() for booking in bookings]), 200
+        if stream:
+            # bookings come from the backend; streaming saves building the serialized response in one buffer
+            return stream_response(bookings, stream)
+        return jsonify(bookings), 200
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -410,7 +581,8 @@ def get_thermostats_by_room_id(room_id):
         # Usa el service correctamente instanciado
         thermostats = monitoring_facade.get_thermostats_by_room_id(room_id)
 
-        return jsonify([thermostat.to_json() for thermostat in thermostats]), 200
+        response = jsonify(thermostats)
+        return _with_sync_status(response, 'thermostats'), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -440,16 +612,270 @@ def get_rfid_by_room_id(room_id):
     if room_id == None or room_id == "":
         raise Exception("room_id parameter is necessary")
 
-    print("[Route] LLAMANDO A monitoring_facade.get_rfid_by_room_id...")
     rfid_devices = monitoring_facade.get_rfid_by_room_id(room_id)
-    print(f"[Route] Recibido {len(rfid_devices)} dispositivos.")
 
-    # TODO si es que esta vacio, le pide al backend
-    # y guarda en la base de datos
-    # Pero como lo haria si el backend requiere json token
-    # si no, devuelve los dispositivos que ya tiene
+    response = jsonify(rfid_devices)
+    return _with_sync_status(response, 'rfid_devices'), 200
+
+
+@monitoring_api.route('/monitoring/devices/sync', methods=['POST'])
+@swag_from({
+    'tags': ['Monitoring']
+})
+def sync_devices():
+    """
+    Asks the fog node to refresh its thermostat and RFID tables from the backend.
+    ---
+    responses:
+      202:
+        description: Synchronization requested
+    """
+    monitoring_facade.request_sync()
+    return jsonify({
+        "thermostats": monitoring_facade.get_sync_status('thermostats'),
+        "rfid_devices": monitoring_facade.get_sync_status('rfid_devices')
+    }), 202
+
 
-    return [rfid_device.to_json() for rfid_device in rfid_devices]
+@monitoring_api.route('/monitoring/hotel/refresh', methods=['POST'])
+@swag_from({
+    'tags': ['Monitoring']
+})
+def refresh_hotel():
+    """
+    Reloads the configured hotel (owner and other metadata) from the backend, e.g. after its owner changed.
+    ---
+    responses:
+      200:
+        description: The hotel as currently known by the fog node
+      503:
+        description: The hotel could not be loaded from the backend
+    """
+    hotel = monitoring_facade.refresh_hotel(HOTEL_ID)
+    if hotel is None:
+        return jsonify({"error": "The hotel could not be loaded from the backend"}), 503
+    return jsonify(hotel), 200
+
+
+@monitoring_api.route('/monitoring/telemetry/thermostats', methods=['POST'])
+@swag_from({
+    'tags': ['Monitoring']
+})
+def ingest_thermostat_readings():
+    """
+    Receives a batch of temperature readings from any number of thermostats.
+    The readings are buffered in memory and written in bulk to the readings history; the current
+    temperature of every thermostat is moved to its newest reading in the same write.
+    ---
+    parameters:
+      - in: body
+        name: batch
+        required: true
+        schema:
+          type: object
+          properties:
+            readings:
+              type: array
+              items:
+                type: object
+                properties:
+                  device_id:
+                    type: string
+                    description: The ID of the thermostat
+                  temperature:
+                    type: number
+                    format: float
+                  recorded_at:
+                    type: string
+                    format: date-time
+                    description: When the reading was taken, ISO 8601; without an offset it is read as UTC, and when missing the arrival time is used.
+    responses:
+      202:
+        description: The valid readings were queued; invalid ones are listed with their index in the batch
+      400:
+        description: The body has no readings array
+      413:
+        description: The batch has more readings than TELEMETRY_BATCH_LIMIT
+      503:
+        description: The write buffer is full; retry the whole batch later
+    """
+    data = request.get_json(silent=True)
+    readings = data.get('readings') if isinstance(data, dict) else None
+    if not isinstance(readings, list):
+        return jsonify({"error": "The body must be an object with a readings array"}), 400
+    if len(readings) > TELEMETRY_BATCH_LIMIT:
+        return jsonify({"error": f"A batch can hold at most {TELEMETRY_BATCH_LIMIT} readings"}), 413
+
+    accepted, rejected, buffered = monitoring_facade.ingest_thermostat_readings(readings)
+    if not buffered:
+        response = jsonify({"error": "The telemetry buffer is full, retry later", "rejected": rejected})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    return jsonify({"accepted": accepted, "rejected": rejected}), 202
+
+
+@monitoring_api.route('/monitoring/telemetry/smoke-sensors', methods=['POST'])
+@swag_from({
+    'tags': ['Monitoring']
+})
+def ingest_smoke_readings():
+    """
+    Receives a batch of analog readings from any number of smoke sensors.
+    Every reading is evaluated against the smoke thresholds of its room. Only the latest value
+    and state of each sensor are written, in periodic batched updates; a reading that raises or
+    clears an alarm is written at once, and raising an alarm notifies the hotel owner.
+    ---
+    parameters:
+      - in: body
+        name: batch
+        required: true
+        schema:
+          type: object
+          properties:
+            readings:
+              type: array
+              items:
+                type: object
+                properties:
+                  device_id:
+                    type: string
+                    description: The ID of the smoke sensor
+                  value:
+                    type: number
+                    format: float
+                    description: The analog value read
+                  recorded_at:
+                    type: string
+                    format: date-time
+                    description: When the reading was taken, ISO 8601; without an offset it is read as UTC, and when missing the arrival time is used.
+    responses:
+      202:
+        description: The valid readings were queued; invalid ones are listed with their index in the batch, and alarm state changes are listed in transitions. A raised alarm whose alert could not be queued has alert_queued false and is raised again automatically.
+      400:
+        description: The body has no readings array
+      413:
+        description: The batch has more readings than TELEMETRY_BATCH_LIMIT
+      503:
+        description: The write buffer is full; alarm state changes were still recorded, retry the whole batch later
+    """
+    data = request.get_json(silent=True)
+    readings = data.get('readings') if isinstance(data, dict) else None
+    if not isinstance(readings, list):
+        return jsonify({"error": "The body must be an object with a readings array"}), 400
+    if len(readings) > TELEMETRY_BATCH_LIMIT:
+        return jsonify({"error": f"A batch can hold at most {TELEMETRY_BATCH_LIMIT} readings"}), 413
+
+    accepted, rejected, transitions, buffered = monitoring_facade.ingest_smoke_readings(readings)
+    if not buffered:
+        response = jsonify({"error": "The smoke reading buffer is full, retry later", "rejected": rejected, "transitions": transitions})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    return jsonify({"accepted": accepted, "rejected": rejected, "transitions": transitions}), 202
+
+
+@monitoring_api.route('/monitoring/history', methods=['GET'])
+@swag_from({
+    'tags': ['Monitoring']
+})
+def get_history():
+    """
+    Retrieves the minimum, maximum and average readings of a device or a room over a time range.
+    The points come from the 1-minute, 15-minute or 1-hour rollups: the finest one that fits the
+    point budget is used, and buckets are merged when even the 1-hour rollup has too many.
+    ---
+    parameters:
+      - in: query
+        name: kind
+        type: string
+        enum: [thermostat, smoke_sensor]
+        description: The device kind (default thermostat)
+      - in: query
+        name: device_id
+        type: string
+        description: The device to query; give either device_id or room_id
+      - in: query
+        name: room_id
+        type: integer
+        description: The room to query, aggregating every device of the kind in it
+      - in: query
+        name: from
+        type: string
+        format: date-time
+        description: Start of the range, ISO 8601 (default 24 hours before `to`); without an offset it is read as UTC
+      - in: query
+        name: to
+        type: string
+        format: date-time
+        description: End of the range, ISO 8601 (default now)
+      - in: query
+        name: max_points
+        type: integer
+        description: Maximum number of points to return (default 500, capped at 5000)
+      - in: query
+        name: resolution
+        type: integer
+        enum: [60, 900, 3600]
+        description: Force a rollup resolution in seconds instead of choosing one
+    responses:
+      200:
+        description: The points of the range, oldest first, with the resolution and step used
+      400:
+        description: Invalid kind, device, room, range, budget or resolution
+    """
+    args = request.args
+    try:
+        kind = args.get('kind', 'thermostat')
+        if kind not in HISTORY_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(HISTORY_KINDS)}")
+
+        device_id, room_id = args.get('device_id'), args.get('room_id')
+        if bool(device_id) == bool(room_id):
+            raise ValueError("Give either device_id or room_id")
+        scope, scope_id = ('device', device_id) if device_id else ('room', int(room_id))
+
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+        end = _query_time(args.get('to'), 'to') or now
+        start = _query_time(args.get('from'), 'from') or end - datetime.timedelta(days=1)
+        if start >= end:
+            raise ValueError("from must be before to")
+
+        max_points = min(int(args.get('max_points', HISTORY_DEFAULT_POINTS)), HISTORY_MAX_POINTS)
+        if max_points < 1:
+            raise ValueError("max_points must be greater than 0")
+        resolution = int(args['resolution']) if args.get('resolution') else None
+
+        history = monitoring_facade.get_history(kind, scope, scope_id, start, end, max_points, resolution)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(history), 200
+
+
+def _query_time(value, name):
+    """
+    Reads an ISO 8601 query parameter as naive UTC.
+    """
+    if not value:
+        return None
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _with_sync_status(response, resource):
+    """
+    Tells the client how stale the locally served device list is.
+    """
+    status = monitoring_facade.get_sync_status(resource)
+    if status["last_synced_at"]:
+        response.headers['X-Last-Synced-At'] = status["last_synced_at"]
+        response.headers['X-Data-Age-Seconds'] = str(status["age_seconds"])
+    else:
+        response.headers['X-Data-Age-Seconds'] = 'unknown'
+    return response
 
 
 @swag_from({
@@ -458,7 +884,11 @@ def get_rfid_by_room_id(room_id):
 @operations_api.route('/notifications', methods=['POST'])
 def send_smoke_sensor_notification():
     """
-    Sends a notification when a smoke sensor detects smoke.
+    Evaluates a smoke sensor reading and notifies the hotel owner when it raises an alarm.
+
+    Readings are checked against the smoke thresholds of the room; only the reading that moves a
+    sensor into the alarm state queues a notification. The others are answered with the current
+    state of the sensor.
     ---
     parameters:
       - in: body
@@ -476,63 +906,48 @@ def send_smoke_sensor_notification():
               description: The current analog value from the smoke sensor
             room_id:
               type: integer
-              description: The ID of the room where the smoke sensor is located
+              description: Ignored; the alarm is attributed to the room the smoke sensor is registered in
     responses:
+      202:
+        description: Alarm raised; the notification is delivered to the backend in the background
       200:
-        description: Notification sent successfully
+        description: No alarm raised; the reading was evaluated and the sensor state is returned. `pending` means the value is at or above the alarm level and the alarm is raised in the background once the debounce window passes, even without another reading.
       400:
-        description: Invalid request, device_id and current_value are required
+        description: Invalid request, device_id and a finite numeric current_value are required
+      404:
+        description: The smoke sensor is not registered
       500:
-        description: Internal server error
+        description: The alarm was raised but its notification could not be queued; it is raised again automatically
     """
 
-    token = monitoring_facade._get_auth_token()
-    if not token:
-        raise Exception("Authentication with backend failed")
-
     data = request.json
     device_id = data.get('device_id')
     current_value = data.get('current_value')
-    room_id = data.get('room_id')
-    if not device_id or not current_value or not room_id:
-        return jsonify({"error": "Invalid request, device_id, current_value and room_id are required"}), 400
-
-    back_url = f"{BACKEND_URL}/notifications"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    owner_id = monitoring_facade.get_owner_id_by_hotel_id(HOTEL_ID)
-    payload = {
-        "title": "SMOKE SENSOR ALERT",
-        "content": "Alerta de humo detectado por el sensor con ID: " + device_id +
-                   " en la habitación con ID: " + str(room_id) +
-                   ". Alcanzó el valor: " + str(current_value),
-        "senderType": "System",
-        "senderId": 0,
-        "receiverId": owner_id,
-        "hotelId": HOTEL_ID
-    }
-
-    print(f"[OperationsAndMonitoringService] Enviando solicitud POST a {back_url} con payload:")
-    print(payload)
-
+    if not device_id or current_value is None:
+        return jsonify({"error": "Invalid request, device_id and current_value are required"}), 400
     try:
-        response = requests.post(back_url, json=payload, headers=headers)
-
-        print(f"[OperationsAndMonitoringService] Código de respuesta del API: {response.status_code}")
-
-        if response.status_code != 200 and response.status_code != 201:
-            print("[OperationsAndMonitoringService] ❌ Error en la respuesta del API.")
-            return {"access": False}
-
-        back_result = response.json()
-        print(f"[OperationsAndMonitoringService] Respuesta del API: {back_result}")
-
-        access_granted = back_result.get("access", False)
-
-        return {"access": access_granted}
-
-    except Exception as e:
-        print(f"[OperationsAndMonitoringService] 🛑 Excepción durante la solicitud al API: {e}")
-        return {"access": False}
\ No newline at end of file
+        current_value = float(current_value)
+    except (TypeError, ValueError):
+        return jsonify({"error": "current_value must be a number"}), 400
+    if not math.isfinite(current_value):
+        return jsonify({"error": "current_value must be a finite number"}), 400
+
+    evaluation, alert, collapsed = monitoring_facade.send_notification(str(device_id), current_value)
+    if evaluation is None:
+        return jsonify({"error": "Smoke sensor not found"}), 404
+    if not evaluation.raised:
+        return jsonify({
+            "status": "cleared" if evaluation.cleared else "pending" if evaluation.pending else "suppressed",
+            "state": evaluation.state,
+            "evaluation": evaluation.to_dict()
+        }), 200
+    if alert is None:
+        return jsonify({"error": "The notification could not be queued"}), 500
+
+    return jsonify({
+        "alert_id": alert.id,
+        "status": alert.status,
+        "collapsed": collapsed,
+        "state": evaluation.state,
+        "evaluation": evaluation.to_dict()
+    }), 202
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+import threading, time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after a time-to-live.
+
+    Expired entries are kept until they are evicted, so callers that prefer a stale value
+    over no value at all can still read them with `get_stale`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for a key if it has not expired.
+
+        :param key: The cache key.
+        :param default: The value returned on a miss.
+        :return: The cached value, or `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[1] <= time.monotonic():
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def get_stale(self, key, default=None):
+        """
+        Returns the last value stored for a key, even if it has already expired.
+
+        :param key: The cache key.
+        :param default: The value returned when the key was never stored or was evicted.
+        :return: The cached value, or `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Stores a value, evicting the least recently used entry when the cache is full.
+
+        :param key: The cache key.
+        :param value: The value to store.
+        :param ttl: Optional time-to-live in seconds that overrides the cache default.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None
+            }
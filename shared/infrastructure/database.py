@@ -1,12 +1,20 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, inspect, MetaData
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker, scoped_session
+from flask import has_app_context, jsonify
+from flask.globals import app_ctx
 from dotenv import load_dotenv
-import os
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+from shared.infrastructure.migrations import run_migrations
+from shared.infrastructure.pool_monitor import MonitoredQueuePool, pool_monitor
+import os, threading
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 class Database:
     _instance = None
     _meta = None
@@ -29,36 +37,138 @@ class Database:
         # mysql+pymysql://<username>:<password>@<server>/<database>
 
         # ensure the database is created before running the application
-        print(username, password, database, server, port)
         if not all([username, password, database, server]):
             raise ValueError("Database connection parameters are not set in the environment variables.")
 
+        self.pool_settings = self._read_pool_settings()
         self._engine = create_engine(
             f"mysql+pymysql://{username}:{password}@{server}:{port}/{database}",
-            poolclass=QueuePool,
-            pool_size=10,
-            max_overflow=15
+            poolclass=MonitoredQueuePool,
+            pool_size=self.pool_settings["pool_size"],
+            max_overflow=self.pool_settings["max_overflow"],
+            pool_timeout=self.pool_settings["pool_timeout"],
+            # MySQL drops idle connections (wait_timeout); recycle them before that and test them on checkout
+            pool_recycle=self.pool_settings["pool_recycle"],
+            pool_pre_ping=self.pool_settings["pool_pre_ping"]
         )
 
         self.Base = declarative_base()
         self.Base.metadata.bind = self._engine
         
         self._session_factory = sessionmaker(bind=self._engine)
+        # one session per Flask app context (i.e. per request), one per thread outside of it
+        self._scoped_session = scoped_session(self._session_factory, scopefunc=self._current_scope)
         self._meta = self.Base.metadata
+
+        pool_monitor.attach(self._engine)
+        register_metrics("db_pool", pool_monitor.stats)
         
-        print("Database initialized with engine:", self._engine)
+        logger.info("Database initialized on %s:%s/%s with pool settings %s", server, port, database, self.pool_settings)
+
+    @staticmethod
+    def _read_pool_settings() -> dict:
+        """
+        Reads the connection pool configuration from the environment.
+
+        :return: A dictionary with the pool settings used to create the engine.
+        """
+        return {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "15")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+            "warm_up": os.getenv("DB_POOL_WARMUP", "false").lower() in ("1", "true", "yes")
+        }
+
+    def warm_pool(self) -> int:
+        """
+        Opens `pool_size` connections up front so the first requests do not pay for the connects.
+
+        :return: The number of connections opened.
+        """
+        connections = []
+        try:
+            for _ in range(self.pool_settings["pool_size"]):
+                connections.append(self._engine.connect())
+        except Exception as e:
+            logger.exception("Error warming up the connection pool: %s", e)
+        finally:
+            for connection in connections:
+                connection.close()
+        logger.info("Connection pool warmed up with %d connections.", len(connections))
+        return len(connections)
+
+    @property
+    def engine(self):
+        return self._engine
+
+    @staticmethod
+    def _current_scope():
+        if has_app_context():
+            return "app", id(app_ctx._get_current_object())
+        return "thread", threading.get_ident()
 
     @property
     def session(self):
-        return self._session_factory()
+        """
+        The session of the current request, or of the current thread outside of a request.
+
+        Every access in the same scope returns the same session; it is closed by `remove`.
+        """
+        return self._scoped_session()
+
+    def remove(self):
+        """
+        Closes the session of the current scope and returns its connection to the pool.
+        """
+        self._scoped_session.remove()
+
+    def init_app(self, app):
+        """
+        Ties the session lifecycle to the Flask application context.
+
+        :param app: The Flask application.
+        """
+        app.teardown_appcontext(self._teardown)
+        app.register_error_handler(PoolTimeoutError, self._pool_timeout)
+
+    def _teardown(self, exception=None):
+        self.remove()
+
+    @staticmethod
+    def _pool_timeout(error):
+        return jsonify({"error": "Database connection pool exhausted, try again later"}), 503
     
     @property
     def meta(self):
         return self._meta
     
     def create_all(self):
-        """Create all tables in the database."""
+        """Create all tables in the database and bring existing ones up to date."""
         self._meta.create_all(self._engine)
-        print("All tables created in the database.")
+        # column changes go through migrations; they run before the indexes that may depend on them
+        run_migrations(self._engine)
+        self._create_missing_indexes()
+        logger.info("All tables created in the database.")
+
+    def _create_missing_indexes(self):
+        """
+        Creates the indexes declared on the models that are missing in tables that already exist.
+
+        `create_all` only emits CREATE INDEX together with CREATE TABLE, so indexes added to an
+        existing model would otherwise never reach the database.
+        """
+        inspector = inspect(self._engine)
+        for table in self._meta.sorted_tables:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    try:
+                        index.create(self._engine)
+                        logger.info("Index %s created on %s.", index.name, table.name)
+                    except Exception as e:
+                        # e.g. a unique index over rows that still hold duplicates
+                        logger.error("Error creating index %s on %s: %s", index.name, table.name, e)
     
 db = Database()
\ No newline at end of file
@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
-import requests, os
+from shared.infrastructure.http_client import backend_client
+import os
 
 load_dotenv()
 
@@ -16,8 +17,9 @@ class ExternalService:
         :return: The response from the external service.
         """
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, params=params)
+        response = backend_client.get(url, params=params)
         response.raise_for_status()
+        return response
 
     def put(self, endpoint: str, data: dict):
         """
@@ -28,5 +30,6 @@ class ExternalService:
         :return: The response from the external service.
         """
         url = f"{self.base_url}/{endpoint}"
-        response = requests.put(url, json=data)
-        response.raise_for_status()
\ No newline at end of file
+        response = backend_client.put(url, json=data)
+        response.raise_for_status()
+        return response
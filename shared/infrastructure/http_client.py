@@ -0,0 +1,89 @@
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from shared.infrastructure.hotelconfig import BACKEND_URL
+import requests, os
+
+load_dotenv()
+
+
+class BackendClient:
+    """
+    Shared HTTP client for the SweetManager backend.
+
+    Every call goes through one pooled `requests.Session`, so TCP and TLS connections to the
+    backend are kept alive and reused between requests. Idempotent verbs are retried with a
+    jittered exponential backoff; POST is never retried automatically.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+    RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(self, base_url: str = BACKEND_URL):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (
+            float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3.05")),
+            float(os.getenv("BACKEND_READ_TIMEOUT", "10"))
+        )
+
+        retries = int(os.getenv("BACKEND_MAX_RETRIES", "3"))
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            allowed_methods=self.IDEMPOTENT_METHODS,
+            status_forcelist=self.RETRY_STATUSES,
+            backoff_factor=float(os.getenv("BACKEND_BACKOFF_FACTOR", "0.3")),
+            backoff_jitter=float(os.getenv("BACKEND_BACKOFF_JITTER", "0.3")),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        # pool_connections is the number of hosts kept in the pool, pool_maxsize the connections per host
+        adapter = HTTPAdapter(
+            pool_connections=int(os.getenv("BACKEND_POOL_HOSTS", "4")),
+            pool_maxsize=int(os.getenv("BACKEND_POOL_MAXSIZE", "20")),
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, endpoint: str) -> str:
+        """
+        Builds the absolute URL for an endpoint of the backend.
+
+        :param endpoint: A path relative to the backend base URL, or an absolute URL.
+        :return: The absolute URL.
+        """
+        if endpoint.startswith("http://") or endpoint.startswith("https://"):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session.
+
+        :param method: The HTTP verb.
+        :param endpoint: The endpoint to call.
+        :param kwargs: Extra arguments for `requests.Session.request`.
+        :return: The response from the backend.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, self.url(endpoint), **kwargs)
+
+    def get(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("POST", endpoint, **kwargs)
+
+    def put(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("PUT", endpoint, **kwargs)
+
+    def delete(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", endpoint, **kwargs)
+
+
+backend_client = BackendClient()
@@ -0,0 +1,70 @@
+from flask.json.provider import DefaultJSONProvider
+import decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, Flask's provider is used without it
+    orjson = None
+
+
+def serialize_entity(obj):
+    """
+    Fallback for objects the JSON encoder does not know natively.
+
+    Entities are serialized through their `to_json`/`to_dict` method, so endpoints can pass
+    entities (or lists of them) straight to `jsonify`.
+
+    :param obj: The object to serialize.
+    :return: A JSON-serializable representation of the object.
+    """
+    to_json = getattr(obj, "to_json", None) or getattr(obj, "to_dict", None)
+    if to_json is not None:
+        return to_json()
+    if isinstance(obj, decimal.Decimal):
+        # same as Flask's provider: keep the exact value
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    orjson serializes dicts, lists and datetimes natively in C, writes bytes straight into the
+    response, and falls back to `serialize_entity` for entities. Datetimes are written as
+    ISO 8601 and keys keep their insertion order.
+    """
+
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=serialize_entity, option=self.option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=serialize_entity, option=option), mimetype=self.mimetype)
+
+
+class EntityJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default provider, with entities serialized through their `to_json`/`to_dict` method.
+    """
+
+    @staticmethod
+    def default(obj):
+        try:
+            return serialize_entity(obj)
+        except TypeError:
+            return DefaultJSONProvider.default(obj)
+
+
+# the provider installed on the app; orjson when it is available
+JSONProvider = OrjsonProvider if orjson is not None else EntityJSONProvider
@@ -0,0 +1,108 @@
+from logging.handlers import QueueHandler, QueueListener
+from dotenv import load_dotenv
+import atexit, copy, datetime, json, logging, os, queue, random, sys, threading
+
+load_dotenv()
+
+# attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats every record as one JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps the exception apart from the message, so the output formatter can place it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            # tracebacks cannot cross the queue; render them in the calling thread
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through only a fraction of the DEBUG records, so per-row debug lines cannot flood the output.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+def configure_logging():
+    """
+    Installs the application log pipeline on the root logger. Calling it again does nothing.
+
+    Records are put on an in-memory queue by the calling thread and written to stdout by a
+    listener thread, so request threads never block on the output. The level, the format
+    (`json` or `text`) and the DEBUG sampling rate come from LOG_LEVEL, LOG_FORMAT and
+    LOG_DEBUG_SAMPLE_RATE.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+
+        output = logging.StreamHandler(sys.stdout)
+        if os.getenv("LOG_FORMAT", "json").lower() == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, output, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+
+        handler = _QueueHandler(records)
+        handler.addFilter(SamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))))
+
+        root = logging.getLogger()
+        root.handlers = [handler]
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger attached to the application log pipeline.
+
+    :param name: The logger name, usually the module `__name__`.
+    :return: The logger.
+    """
+    configure_logging()
+    return logging.getLogger(name)
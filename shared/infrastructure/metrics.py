@@ -0,0 +1,20 @@
+_sources = {}
+
+
+def register_metrics(name: str, source):
+    """
+    Registers a callable whose result is published under `name` at /internal/metrics.
+
+    :param name: The key of the metrics group.
+    :param source: A callable without arguments that returns a JSON-serializable dictionary.
+    """
+    _sources[name] = source
+
+
+def collect_metrics() -> dict:
+    """
+    Collects the current value of every registered metrics group.
+
+    :return: A dictionary keyed by metrics group name.
+    """
+    return {name: source() for name, source in list(_sources.items())}
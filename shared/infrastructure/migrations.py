@@ -0,0 +1,175 @@
+from sqlalchemy import Table, Column, String, DateTime, MetaData, select, insert, text
+from shared.infrastructure.log import get_logger
+import datetime
+
+logger = get_logger(__name__)
+
+# kept out of the application metadata so create_all never touches it
+_meta = MetaData()
+schema_migrations = Table(
+    'schema_migrations',
+    _meta,
+    Column('id', String(100), primary_key=True),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+# only one process applies migrations at a time; the others wait for it
+_LOCK_NAME = "fog_api_schema_migrations"
+_LOCK_TIMEOUT_SECONDS = 120
+
+# MySQL regular expressions of the values a text column must hold before it is converted
+_INTEGER = "^[0-9]+$"
+_DECIMAL = "^-?[0-9]+(\\\\.[0-9]+)?$"
+
+
+class MigrationError(Exception):
+    """
+    Raised when a migration cannot be applied, e.g. because existing rows would not survive it.
+    """
+
+
+def _reject_invalid_rows(connection, table: str, condition: str, problem: str):
+    """
+    Stops a migration when rows would not survive a type change, instead of letting MySQL truncate them.
+
+    :param connection: The connection the migration runs on.
+    :param table: The table to check.
+    :param condition: A SQL condition matching the rows that cannot be converted.
+    :param problem: What is wrong with those rows, for the error message.
+    """
+    invalid = connection.execute(text(f"SELECT id FROM {table} WHERE {condition} LIMIT 10")).scalars().all()
+    if invalid:
+        raise MigrationError(f"{table} holds {problem} (ids {', '.join(map(str, invalid))}); fix them and restart.")
+
+
+def _payment_customers_final_amount_numeric(connection):
+    """
+    payment_customers.final_amount was a VARCHAR(200); turn it into DECIMAL(12, 2) so it can be summed in SQL.
+    """
+    _reject_invalid_rows(connection, "payment_customers", f"TRIM(final_amount) NOT REGEXP '{_DECIMAL}'",
+                         "final amounts that are not numbers")
+    connection.execute(text("UPDATE payment_customers SET final_amount = TRIM(final_amount)"))
+    connection.execute(text("ALTER TABLE payment_customers MODIFY final_amount DECIMAL(12, 2) NOT NULL"))
+
+
+def _payment_owners_final_amount_numeric(connection):
+    """
+    payment_owners.final_amount was a FLOAT; store it as DECIMAL(12, 2) so totals are exact.
+    """
+    connection.execute(text("ALTER TABLE payment_owners MODIFY final_amount DECIMAL(12, 2) NOT NULL"))
+
+
+def _payment_owners_owner_id_integer(connection):
+    """
+    payment_owners.owner_id was a VARCHAR(50) holding the integer id of the owner.
+    """
+    _reject_invalid_rows(connection, "payment_owners", f"TRIM(owner_id) NOT REGEXP '{_INTEGER}'",
+                         "owner ids that are not integers")
+    connection.execute(text("UPDATE payment_owners SET owner_id = TRIM(owner_id)"))
+    connection.execute(text("ALTER TABLE payment_owners MODIFY owner_id INT NOT NULL"))
+
+
+def _contract_owners_typed_columns(connection):
+    """
+    contract_owners kept its owner and subscription ids and its dates in VARCHAR(50) columns.
+
+    Dates may have been stored with a time part (`2025-06-01T00:00:00`); only the date is kept.
+    """
+    _reject_invalid_rows(
+        connection, "contract_owners",
+        f"TRIM(owner_id) NOT REGEXP '{_INTEGER}' OR TRIM(subscription_id) NOT REGEXP '{_INTEGER}' "
+        "OR STR_TO_DATE(LEFT(TRIM(start_date), 10), '%Y-%m-%d') IS NULL "
+        "OR STR_TO_DATE(LEFT(TRIM(final_date), 10), '%Y-%m-%d') IS NULL",
+        "owner or subscription ids that are not integers, or dates that are not YYYY-MM-DD"
+    )
+    connection.execute(text(
+        "UPDATE contract_owners SET owner_id = TRIM(owner_id), subscription_id = TRIM(subscription_id), "
+        "start_date = LEFT(TRIM(start_date), 10), final_date = LEFT(TRIM(final_date), 10)"
+    ))
+    connection.execute(text(
+        "ALTER TABLE contract_owners MODIFY owner_id INT NOT NULL, MODIFY subscription_id INT NOT NULL, "
+        "MODIFY start_date DATE NOT NULL, MODIFY final_date DATE NOT NULL"
+    ))
+
+
+def _thermostat_readings_partitioned(connection):
+    """
+    Partitions thermostat_readings by day, so old readings are dropped a partition at a time and
+    time-range queries only read the days they cover.
+
+    The table starts with a single catch-all partition; the telemetry partition maintainer splits
+    it into daily partitions ahead of time.
+    """
+    partitioned = connection.execute(text(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() "
+        "AND TABLE_NAME = 'thermostat_readings' AND PARTITION_NAME IS NOT NULL"
+    )).scalar()
+    if not partitioned:
+        connection.execute(text(
+            "ALTER TABLE thermostat_readings PARTITION BY RANGE (TO_DAYS(recorded_at)) "
+            "(PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ))
+
+
+def _device_timestamps_utc(connection):
+    """
+    Device timestamps used to be written in the local time of the node that created the device,
+    while readings and the backend sync use UTC. On nodes east of UTC those values lie in the
+    future and made every newer reading look stale; they are moved back to the current UTC time.
+
+    Values written west of UTC cannot be told apart from real ones; they only look older than they
+    are and are replaced by the next reading.
+    """
+    connection.execute(text("UPDATE thermostats SET last_update = UTC_TIMESTAMP() WHERE last_update > UTC_TIMESTAMP()"))
+    connection.execute(text("UPDATE smoke_sensors SET last_alert_time = UTC_TIMESTAMP() WHERE last_alert_time > UTC_TIMESTAMP()"))
+
+
+# applied in this order, each one once; never reorder or rename an entry that was released
+MIGRATIONS = [
+    ("0001_payment_customers_final_amount_numeric", _payment_customers_final_amount_numeric),
+    ("0002_payment_owners_final_amount_numeric", _payment_owners_final_amount_numeric),
+    ("0003_payment_owners_owner_id_integer", _payment_owners_owner_id_integer),
+    ("0004_contract_owners_typed_columns", _contract_owners_typed_columns),
+    ("0005_thermostat_readings_partitioned", _thermostat_readings_partitioned),
+    ("0006_device_timestamps_utc", _device_timestamps_utc),
+]
+
+
+def run_migrations(engine) -> list[str]:
+    """
+    Applies the migrations that were not applied yet and records them in `schema_migrations`.
+
+    Must run after the tables were created. A failing migration is reported and stops the run,
+    so the ones after it are retried on the next start.
+
+    :param engine: The SQLAlchemy engine.
+    :return: The ids of the migrations applied by this call.
+    """
+    applied_now = []
+    with engine.connect() as connection:
+        locked = connection.execute(text("SELECT GET_LOCK(:name, :timeout)"),
+                                    {"name": _LOCK_NAME, "timeout": _LOCK_TIMEOUT_SECONDS}).scalar()
+        if not locked:
+            logger.error("Could not acquire the schema migration lock; skipping migrations.")
+            return applied_now
+        try:
+            _meta.create_all(connection)
+            applied = set(connection.execute(select(schema_migrations.c.id)).scalars())
+            connection.commit()
+            for migration_id, migrate in MIGRATIONS:
+                if migration_id in applied:
+                    continue
+                try:
+                    with connection.begin():
+                        migrate(connection)
+                        connection.execute(insert(schema_migrations).values(
+                            id=migration_id, applied_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+                        ))
+                except Exception as e:
+                    logger.error("Migration %s failed: %s", migration_id, e)
+                    break
+                applied_now.append(migration_id)
+                logger.info("Migration %s applied.", migration_id)
+        finally:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": _LOCK_NAME})
+    return applied_now
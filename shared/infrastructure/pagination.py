@@ -0,0 +1,190 @@
+from typing import Optional
+from sqlalchemy import select
+from dotenv import load_dotenv
+from shared.infrastructure.database import db
+import base64, json, os
+
+load_dotenv()
+
+DEFAULT_LIMIT = int(os.getenv("PAGINATION_DEFAULT_LIMIT", "100"))
+MAX_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", "1000"))
+# rows fetched from the server-side cursor at a time when streaming a whole table
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+
+class InvalidPageRequest(ValueError):
+    """
+    Raised when the limit, cursor or fields of a list request are not valid.
+    """
+
+
+class PageRequest:
+    """
+    A page of a list endpoint: at most `limit` rows after the `after` key, with only `fields` selected.
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, after=None, fields: Optional[list[str]] = None):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+
+
+class Page:
+    def __init__(self, items: list, next_after=None):
+        self.items = items
+        # key of the last row returned, or None when this is the last page
+        self.next_after = next_after
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        return encode_cursor(self.next_after) if self.next_after is not None else None
+
+
+def encode_cursor(position) -> str:
+    """
+    Turns a keyset position into an opaque, URL-safe cursor.
+
+    :param position: Any JSON-serializable value, e.g. the last id of the page.
+    :return: The cursor.
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Reads a cursor produced by `encode_cursor`.
+
+    :param cursor: The cursor sent by the client.
+    :return: The keyset position.
+    """
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidPageRequest("Invalid cursor")
+
+
+def parse_page_request(args) -> PageRequest:
+    """
+    Builds a page request from the `limit`, `cursor` and `fields` query parameters.
+
+    A limit above PAGINATION_MAX_LIMIT is capped; when it is missing PAGINATION_DEFAULT_LIMIT is used.
+
+    :param args: The query parameters, e.g. `request.args`.
+    :return: The page request.
+    """
+    limit = args.get("limit")
+    if limit is None or limit == "":
+        limit = DEFAULT_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageRequest("limit must be an integer")
+        if limit < 1:
+            raise InvalidPageRequest("limit must be greater than 0")
+    limit = min(limit, MAX_LIMIT)
+
+    cursor = args.get("cursor")
+    after = decode_cursor(cursor) if cursor else None
+
+    fields = args.get("fields")
+    fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+    return PageRequest(limit=limit, after=after, fields=fields)
+
+
+def select_fields(page: PageRequest, available) -> list[str]:
+    """
+    Resolves the projection of a page request.
+
+    :param page: The page request.
+    :param available: The fields the endpoint can return, in output order.
+    :return: The requested fields, or every available field when none were requested.
+    """
+    if not page.fields:
+        return list(available)
+    unknown = [field for field in page.fields if field not in available]
+    if unknown:
+        raise InvalidPageRequest(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(available)}")
+    return [field for field in available if field in page.fields]
+
+
+def keyset_page(table, page: PageRequest, fields, key: str = "id", converters: dict = None, where=None) -> Page:
+    """
+    Reads one page of a table ordered by its key, selecting only the requested columns.
+
+    The page is fetched with `WHERE key > :after ORDER BY key LIMIT :limit + 1`, so the cost of a
+    page does not depend on how deep into the table it is.
+
+    :param table: The SQLAlchemy table.
+    :param page: The page request; `after` must be a key value or None.
+    :param fields: The columns the endpoint can return, in output order.
+    :param key: The unique, indexed column used as the keyset.
+    :param converters: Optional functions applied to the value of some fields.
+    :param where: Optional extra filter.
+    :return: The page, with every row as a dictionary of the selected fields.
+    """
+    selected, query = _keyset_query(table, page, fields, key, where)
+    rows = db.session.execute(query.limit(page.limit + 1)).all()
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+
+    items = [_to_item(row, selected, converters) for row in rows]
+    return Page(items, rows[-1]._mapping[key] if has_more else None)
+
+
+def stream_rows(table, page: PageRequest, fields, key: str = "id", converters: dict = None, where=None):
+    """
+    Yields every row of a table after the page position, ordered by its key, without a limit.
+
+    Rows are read through a server-side cursor STREAM_BATCH_SIZE at a time, so memory stays
+    flat however large the table is. The generator must be consumed while the session is open.
+
+    :param table: The SQLAlchemy table.
+    :param page: The page request; only `after` and `fields` are used.
+    :param fields: The columns the endpoint can return, in output order.
+    :param key: The unique, indexed column the rows are ordered by.
+    :param converters: Optional functions applied to the value of some fields.
+    :param where: Optional extra filter.
+    :return: A generator of dictionaries of the selected fields.
+    """
+    # build the query before returning, so invalid cursors and fields are reported before the response starts
+    selected, query = _keyset_query(table, page, fields, key, where)
+    return _stream(query, selected, converters)
+
+
+def _stream(query, selected: list[str], converters: Optional[dict]):
+    result = db.session.execute(query.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE))
+    try:
+        for row in result:
+            yield _to_item(row, selected, converters)
+    finally:
+        result.close()
+
+
+def _keyset_query(table, page: PageRequest, fields, key: str, where):
+    if page.after is not None and (isinstance(page.after, bool) or not isinstance(page.after, (int, str))):
+        raise InvalidPageRequest("Invalid cursor")
+    selected = select_fields(page, fields)
+    key_column = table.c[key]
+    columns = [table.c[field] for field in selected]
+    if key not in selected:
+        columns.append(key_column)
+
+    query = select(*columns)
+    if where is not None:
+        query = query.where(where)
+    if page.after is not None:
+        query = query.where(key_column > page.after)
+    return selected, query.order_by(key_column)
+
+
+def _to_item(row, selected: list[str], converters: Optional[dict]) -> dict:
+    mapping = row._mapping
+    item = {}
+    for field in selected:
+        value = mapping[field]
+        convert = converters.get(field) if converters else None
+        item[field] = convert(value) if convert is not None and value is not None else value
+    return item
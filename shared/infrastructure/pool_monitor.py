@@ -0,0 +1,153 @@
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from dotenv import load_dotenv
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.workers import BackgroundWorker
+import os, threading, time, traceback
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class PoolMonitor:
+    """
+    Collects checkout, overflow and timeout statistics of the engine connection pool.
+
+    With leak detection enabled it also remembers where every connection currently checked out
+    was taken from; capturing that stack costs more than the checkout itself, so it is off by
+    default.
+    """
+
+    def __init__(self, leak_threshold: float = None, leak_detection: bool = None):
+        self.leak_threshold = leak_threshold if leak_threshold is not None else float(os.getenv("DB_LEAK_THRESHOLD_SECONDS", "30"))
+        self.leak_detection = leak_detection if leak_detection is not None else \
+            os.getenv("DB_LEAK_DETECTION", "false").lower() in ("1", "true", "yes")
+        self.engine = None
+        self._lock = threading.Lock()
+        self._checked_out = {}
+        self._connects = 0
+        self._checkouts = 0
+        self._checkins = 0
+        self._timeouts = 0
+        self._peak_checked_out = 0
+        self._peak_overflow = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._leaks_reported = 0
+        self.leak_detector = LeakDetector(self)
+
+    def attach(self, engine):
+        """
+        Starts listening to the pool events of an engine.
+
+        :param engine: The SQLAlchemy engine to monitor.
+        """
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+
+    def find_leaks(self) -> list[dict]:
+        """
+        Reports the connections held longer than the leak threshold that were not reported yet.
+
+        :return: A list with the holding time and the checkout stack of every new leak.
+        """
+        now = time.monotonic()
+        leaks = []
+        with self._lock:
+            for checkout in self._checked_out.values():
+                held = now - checkout["since"]
+                if held >= self.leak_threshold and not checkout["reported"] and checkout["stack"] is not None:
+                    checkout["reported"] = True
+                    self._leaks_reported += 1
+                    leaks.append({"held_seconds": round(held, 1), "stack": checkout["stack"]})
+        return leaks
+
+    def stats(self) -> dict:
+        """
+        Returns the pool counters.
+
+        :return: A dictionary with the current pool status and the accumulated counters.
+        """
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            oldest = min((checkout["since"] for checkout in self._checked_out.values()), default=None)
+            return {
+                "size": pool.size() if pool is not None else None,
+                "checked_out": len(self._checked_out),
+                "checked_in": pool.checkedin() if pool is not None else None,
+                "overflow": pool.overflow() if pool is not None else None,
+                "peak_checked_out": self._peak_checked_out,
+                "peak_overflow": self._peak_overflow,
+                "connects": self._connects,
+                "checkouts": self._checkouts,
+                "checkins": self._checkins,
+                "timeouts": self._timeouts,
+                "wait_seconds_avg": round(self._wait_total / self._checkouts, 6) if self._checkouts else None,
+                "wait_seconds_max": round(self._wait_max, 6),
+                "longest_held_seconds": round(time.monotonic() - oldest, 1) if oldest else None,
+                "leak_detection": self.leak_detection,
+                "leaks_reported": self._leaks_reported
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        stack = None
+        if self.leak_detection:
+            # skip this method and the SQLAlchemy frames above it; keep the application frames
+            stack = traceback.format_list(traceback.extract_stack(limit=24)[:-1])
+        overflow = self.engine.pool.overflow() if self.engine is not None else 0
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out[id(connection_record)] = {"since": time.monotonic(), "stack": stack, "reported": False}
+            self._peak_checked_out = max(self._peak_checked_out, len(self._checked_out))
+            self._peak_overflow = max(self._peak_overflow, overflow)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._checkins += 1
+            self._checked_out.pop(id(connection_record), None)
+
+
+class MonitoredQueuePool(QueuePool):
+    """
+    QueuePool that reports how long checkouts wait for a connection and how many time out.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_monitor.record_timeout()
+            raise
+        finally:
+            pool_monitor.record_wait(time.perf_counter() - start)
+
+
+class LeakDetector(BackgroundWorker):
+    def __init__(self, monitor: PoolMonitor):
+        super().__init__("db-leak-detector", float(os.getenv("DB_LEAK_CHECK_INTERVAL", "10")))
+        self.monitor = monitor
+
+    def run_once(self):
+        for leak in self.monitor.find_leaks():
+            logger.warning("Connection held for %ss, checked out at:\n%s", leak['held_seconds'], ''.join(leak['stack']))
+
+
+pool_monitor = PoolMonitor()
@@ -0,0 +1,199 @@
+from collections import deque
+from dotenv import load_dotenv
+from shared.infrastructure.http_client import backend_client
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+from shared.infrastructure.workers import BackgroundWorker
+import base64, json, os, threading, time
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class BackendTokenManager:
+    """
+    Keeps the SweetManager backend JWT in memory and shares it between every caller in the process.
+
+    The token expiry is read from the JWT `exp` claim. Only one caller signs in at a time; the
+    others wait for that refresh and reuse its token. A background worker renews the token
+    `refresh_margin` seconds before it expires, so requests normally never wait for a sign-in.
+
+    After a failed sign-in, callers get None at once for `failure_backoff` seconds instead of
+    queueing up for their own sign-in round trip while the backend is down.
+    """
+
+    def __init__(self, refresh_margin: float = None, fallback_ttl: float = None, failure_backoff: float = None):
+        self.sign_in_url = "authentication/sign-in"
+        self.credentials = {
+            "email": os.getenv("BACKEND_AUTH_EMAIL", "iot@manager.com"),
+            "password": os.getenv("BACKEND_AUTH_PASSWORD", "string"),
+            "roleId": int(os.getenv("BACKEND_AUTH_ROLE_ID", "1"))
+        }
+        self.refresh_margin = refresh_margin if refresh_margin is not None else float(os.getenv("BACKEND_TOKEN_REFRESH_MARGIN", "120"))
+        # used when the backend hands out a token without a readable `exp` claim
+        self.fallback_ttl = fallback_ttl if fallback_ttl is not None else float(os.getenv("BACKEND_TOKEN_FALLBACK_TTL", "900"))
+        self.failure_backoff = failure_backoff if failure_backoff is not None else float(os.getenv("BACKEND_TOKEN_FAILURE_BACKOFF", "5"))
+
+        self._token = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._endpoint_calls = deque()
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._failures = 0
+        self._backed_off = 0
+
+        self.refresher = TokenRefreshWorker(self)
+
+    def get_token(self) -> str:
+        """
+        Returns a valid backend token, signing in only when the cached one is missing or expired.
+
+        :return: The bearer token, or None if the backend sign-in failed, recently or now.
+        """
+        if self._is_valid():
+            self._count(hit=True)
+            return self._token
+        if self._backing_off():
+            return None
+
+        with self._refresh_lock:
+            # another caller may have refreshed the token, or failed to, while we were waiting for the lock
+            if self._is_valid():
+                self._count(hit=True)
+                return self._token
+            if self._backing_off():
+                return None
+            self._count(hit=False)
+            return self._refresh()
+
+    def refresh_if_expiring(self):
+        """
+        Renews the token when it is about to expire. Skips the refresh if another caller already holds the lock.
+        """
+        if self._token and time.time() < self._expires_at - self.refresh_margin:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self):
+        """
+        Drops the cached token, e.g. after the backend rejected it with a 401.
+        """
+        with self._refresh_lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns the token cache counters.
+
+        :return: A dictionary with the token endpoint calls in the last minute, hit/miss counts and hit rate.
+        """
+        with self._stats_lock:
+            self._prune_calls(time.time())
+            lookups = self._hits + self._misses
+            return {
+                "token_endpoint_calls_last_minute": len(self._endpoint_calls),
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "backed_off": self._backed_off,
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "expires_in": max(0, round(self._expires_at - time.time())) if self._token else None
+            }
+
+    def _is_valid(self) -> bool:
+        return self._token is not None and time.time() < self._expires_at
+
+    def _backing_off(self) -> bool:
+        if time.time() >= self._retry_at:
+            return False
+        with self._stats_lock:
+            self._backed_off += 1
+        return True
+
+    def _refresh(self):
+        """Signs in against the backend. Must be called with the refresh lock held."""
+        now = time.time()
+        with self._stats_lock:
+            self._endpoint_calls.append(now)
+            self._prune_calls(now)
+
+        try:
+            response = backend_client.post(self.sign_in_url, json=self.credentials)
+            if response.status_code != 200:
+                logger.error("Backend sign-in failed: %s", response.status_code)
+                self._count_failure()
+                return None
+
+            token = response.json().get("token")
+            if not token:
+                self._count_failure()
+                return None
+        except Exception as e:
+            logger.exception("Backend sign-in failed: %s", e)
+            self._count_failure()
+            return None
+
+        expires_at = self._decode_expiry(token)
+        self._expires_at = expires_at if expires_at else time.time() + self.fallback_ttl
+        self._token = token
+        self._retry_at = 0.0
+        with self._stats_lock:
+            self._refreshes += 1
+        return token
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _count_failure(self):
+        self._retry_at = time.time() + self.failure_backoff
+        with self._stats_lock:
+            self._failures += 1
+
+    def _prune_calls(self, now: float):
+        while self._endpoint_calls and self._endpoint_calls[0] < now - 60:
+            self._endpoint_calls.popleft()
+
+    @staticmethod
+    def _decode_expiry(token: str):
+        """
+        Reads the `exp` claim of a JWT without verifying its signature.
+
+        :param token: The encoded JWT.
+        :return: The expiry as a unix timestamp, or None if it cannot be read.
+        """
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            claims = json.loads(base64.urlsafe_b64decode(payload))
+            return float(claims["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+
+class TokenRefreshWorker(BackgroundWorker):
+    def __init__(self, manager: BackendTokenManager):
+        super().__init__("backend-token-refresher", float(os.getenv("BACKEND_TOKEN_CHECK_INTERVAL", "30")))
+        self.manager = manager
+
+    def run_once(self):
+        self.manager.refresh_if_expiring()
+
+
+token_manager = BackendTokenManager()
+register_metrics("auth_token", token_manager.stats)
@@ -0,0 +1,71 @@
+from shared.infrastructure.log import get_logger
+import threading
+
+logger = get_logger(__name__)
+
+
+class BackgroundWorker:
+    """
+    Runs `run_once` on a daemon thread every `interval` seconds, or right away when triggered.
+
+    Subclasses implement `run_once`; errors raised by a cycle are reported and the loop keeps going.
+    """
+
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the worker thread. Calling it on a running worker does nothing.
+        """
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Stops the worker thread and waits for the current cycle to finish.
+
+        :param timeout: Maximum number of seconds to wait for the thread.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def trigger(self):
+        """
+        Wakes the worker so the next cycle runs now instead of waiting for the interval.
+        """
+        self._wakeup.set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self):
+        # imported here because the database module itself uses background workers
+        from shared.infrastructure.database import db
+
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception("Error in background cycle of %s: %s", self.name, e)
+            finally:
+                # outside of a request the session is scoped to this thread; release it after every cycle
+                db.remove()
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def run_once(self):
+        raise NotImplementedError
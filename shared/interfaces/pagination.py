@@ -0,0 +1,15 @@
+from flask import jsonify
+
+
+def page_response(page, status: int = 200):
+    """
+    Returns a page as a JSON array; the cursor of the next page goes in the X-Next-Cursor header.
+
+    :param page: The Page to return.
+    :param status: The HTTP status code.
+    :return: The Flask response and status.
+    """
+    response = jsonify(page.items)
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    return response, status
@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify
+
+from shared.infrastructure.database import db
+from shared.infrastructure.metrics import collect_metrics
+from shared.infrastructure.pool_monitor import pool_monitor
+
+internal_api = Blueprint('internal', __name__)
+
+
+@internal_api.route('/internal/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Exposes the in-process counters of the fog node.
+    ---
+    tags:
+      - Internal
+    responses:
+      200:
+        description: Metrics retrieved successfully
+    """
+    return jsonify(collect_metrics()), 200
+
+
+@internal_api.route('/internal/pool', methods=['GET'])
+def get_pool():
+    """
+    Exposes the database connection pool configuration and statistics, to size the pool per node.
+    ---
+    tags:
+      - Internal
+    responses:
+      200:
+        description: Pool statistics retrieved successfully
+    """
+    return jsonify({
+        "settings": db.pool_settings,
+        "statistics": pool_monitor.stats(),
+        "status": db.engine.pool.status()
+    }), 200
@@ -0,0 +1,207 @@
+from flask import Response, current_app, jsonify, stream_with_context
+from dotenv import load_dotenv
+from shared.infrastructure.log import get_logger
+from shared.infrastructure.metrics import register_metrics
+from shared.infrastructure.pagination import InvalidPageRequest
+import os, threading, time
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json"
+}
+
+
+class StreamSlots:
+    """
+    Caps the streamed list responses in progress.
+
+    A streamed response keeps a pooled database connection checked out until the client has read
+    the last row, so a few slow clients could otherwise take the whole pool. Beyond `limit`
+    concurrent streams new ones are answered with 503, and a stream still running after `timeout`
+    seconds is cut short.
+    """
+
+    def __init__(self, limit: int = None, timeout: float = None):
+        self.limit = limit if limit is not None else int(os.getenv("STREAM_MAX_CONCURRENT", "4"))
+        self.timeout = timeout if timeout is not None else float(os.getenv("STREAM_TIMEOUT_SECONDS", "300"))
+        self._lock = threading.Lock()
+        self._active = 0
+        self._refused = 0
+        self._timed_out = 0
+
+    def acquire(self) -> bool:
+        """
+        Reserves a slot for a new stream.
+
+        :return: False if every slot is taken.
+        """
+        with self._lock:
+            if self._active >= self.limit:
+                self._refused += 1
+                return False
+            self._active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+
+    def record_timeout(self):
+        with self._lock:
+            self._timed_out += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": self._active,
+                "limit": self.limit,
+                "refused": self._refused,
+                "timed_out": self._timed_out
+            }
+
+
+stream_slots = StreamSlots()
+register_metrics("streams", stream_slots.stats)
+
+
+def parse_stream_format(args):
+    """
+    Reads the opt-in `stream` query parameter of the list endpoints.
+
+    :param args: The query parameters, e.g. `request.args`.
+    :return: 'ndjson', 'json', or None when the client did not ask for a streamed response.
+    """
+    stream = args.get("stream")
+    if not stream:
+        return None
+    if stream not in STREAM_FORMATS:
+        raise InvalidPageRequest(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    return stream
+
+
+def stream_response(items, stream_format: str):
+    """
+    Streams a collection to the client while it is being read.
+
+    `ndjson` writes one JSON object per line; `json` writes a JSON array in chunks. Only one
+    item is serialized at a time, so the response is never held in memory as a whole.
+
+    :param items: An iterable of JSON-serializable items, typically a repository generator.
+    :param stream_format: 'ndjson' or 'json'.
+    :return: The streamed Flask response, or a 503 response when STREAM_MAX_CONCURRENT streams are in progress.
+    """
+    return _response(_ndjson(items) if stream_format == "ndjson" else _json_array(items), stream_format)
+
+
+def stream_grouped_response(groups, stream_format: str):
+    """
+    Streams several named collections, e.g. the device lists of `/monitoring/devices`.
+
+    `ndjson` writes every item with a `kind` field naming its collection; `json` writes an
+    object that maps every collection name to its array.
+
+    :param groups: A list of (name, iterable) pairs.
+    :param stream_format: 'ndjson' or 'json'.
+    :return: The streamed Flask response, or a 503 response when STREAM_MAX_CONCURRENT streams are in progress.
+    """
+    if stream_format == "ndjson":
+        chunks = _ndjson({"kind": name, **item} for name, items in groups for item in items)
+    else:
+        chunks = _json_object(groups)
+    return _response(chunks, stream_format)
+
+
+def event_stream_response(chunks):
+    """
+    Sends Server-Sent Events as they are produced.
+
+    The generator runs outside the request context, so it must not use the database session;
+    proxies are asked not to buffer the response.
+
+    :param chunks: An iterable of text chunks, typically built with `sse_event`.
+    :return: The streamed Flask response.
+    """
+    return Response(_guard(chunks), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+def sse_event(data: str, event: str = None, event_id: str = None) -> str:
+    """
+    Formats one Server-Sent Event.
+
+    :param data: The payload, already serialized; it must not contain line breaks.
+    :param event: The event name; clients receive unnamed events as `message`.
+    :param event_id: The id a reconnecting client sends back in `Last-Event-ID`.
+    :return: The event, terminated by a blank line.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _response(chunks, stream_format: str):
+    if not stream_slots.acquire():
+        chunks.close()
+        response = jsonify({"error": "Too many streamed responses in progress, retry later or page through the list"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    # keeps the request (and its database session) alive until the last chunk is sent
+    response = Response(stream_with_context(_guard(_deadline(chunks, time.monotonic() + stream_slots.timeout))),
+                        mimetype=STREAM_FORMATS[stream_format])
+    # runs even when the client leaves before the first chunk
+    response.call_on_close(stream_slots.release)
+    return response
+
+
+def _deadline(chunks, deadline: float):
+    for chunk in chunks:
+        if time.monotonic() > deadline:
+            stream_slots.record_timeout()
+            logger.warning("Streamed response cut short after %ss.", stream_slots.timeout)
+            return
+        yield chunk
+
+
+def _guard(chunks):
+    try:
+        yield from chunks
+    except Exception as e:
+        # the status line is already sent; a truncated body is the only way left to signal the error
+        logger.exception("Error while streaming a response: %s", e)
+
+
+def _ndjson(items):
+    dumps = current_app.json.dumps
+    for item in items:
+        yield dumps(item) + "\n"
+
+
+def _json_array(items):
+    dumps = current_app.json.dumps
+    yield "["
+    separator = ""
+    for item in items:
+        yield separator + dumps(item)
+        separator = ","
+    yield "]"
+
+
+def _json_object(groups):
+    yield "{"
+    separator = ""
+    for name, items in groups:
+        yield f'{separator}"{name}":'
+        yield from _json_array(items)
+        separator = ","
+    yield "}"
@@ -0,0 +1,98 @@
+"""
+Compares the memory and construction time of the slotted domain entities with the plain
+`__dict__` classes they replaced, when mapping database rows to entities.
+
+The previous classes are reproduced here so the script runs without a database.
+
+    python tools/bench_entities.py [rows]
+"""
+import datetime, gc, os, sys, timeit, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations_and_monitoring.domain.entities import Booking, Thermostat
+
+
+class DictDevice:
+    def __init__(self, device_id: str, api_key: str):
+        self.device_id = device_id
+        self.api_key = api_key
+
+
+class DictThermostat(DictDevice):
+    def __init__(self, id: int, device_id: str, api_key: str, ip_address: str, mac_address: str, temperature: float, last_update: str, room_id: int, state: str = None):
+        super().__init__(device_id, api_key)
+        self.id = id
+        self.ip_address = ip_address
+        self.mac_address = mac_address
+        self.temperature = temperature
+        self.last_update = last_update
+        self.room_id = room_id
+        self.state = state if state else "active"
+
+
+class DictBooking:
+    def __init__(self, id: int, payment_customer_id: int, room_id: int, description: str, start_date: str, final_date: str, price_room: float, night_count: int, amount: float, state: str, preference_id: int = None):
+        self.id = id
+        self.payment_customer_id = payment_customer_id
+        self.room_id = room_id
+        self.description = description
+        self.start_date = start_date
+        self.final_date = final_date
+        self.price_room = price_room
+        self.night_count = night_count
+        self.amount = amount
+        self.state = state
+        self.preference_id = preference_id
+
+
+def thermostat_rows(rows: int) -> list[tuple]:
+    now = datetime.datetime(2025, 6, 1, 12, 0, 0)
+    return [(i, f"thermostat-{i}", "k" * 43, "10.0.0.1", "02:00:00:00:00:01", 21.5, now, i % 500, "active")
+            for i in range(rows)]
+
+
+def booking_rows(rows: int) -> list[tuple]:
+    return [(i, i, i % 500, "Booking", "2025-06-01", "2025-06-04", 120.0, 3, 360.0, "confirmed", None)
+            for i in range(rows)]
+
+
+def measure(cls, rows: list[tuple], repeat: int = 5):
+    """
+    Maps every row to an entity, the way the repositories do.
+
+    :param cls: The entity class.
+    :param rows: The rows to map.
+    :return: The bytes allocated per entity and the best construction time in seconds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [cls(*row) for row in rows]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del entities
+
+    # the list holding the entities is the same for both variants; leave it out of the per-object cost
+    per_object = (allocated - sys.getsizeof([None] * len(rows))) / len(rows)
+    best = min(timeit.repeat(lambda: [cls(*row) for row in rows], number=1, repeat=repeat))
+    return per_object, best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cases = [
+        ("Thermostat", thermostat_rows(rows), DictThermostat, Thermostat),
+        ("Booking", booking_rows(rows), DictBooking, Booking),
+    ]
+    for name, data, before_cls, after_cls in cases:
+        before_size, before_time = measure(before_cls, data)
+        after_size, after_time = measure(after_cls, data)
+        print(f"\n{rows} {name} entities")
+        print(f"  {'__dict__ class':<16} {before_size:7.0f} B/object  {before_size * rows / 2**20:7.1f} MiB  {before_time * 1000:8.1f} ms")
+        print(f"  {'__slots__ class':<16} {after_size:7.0f} B/object  {after_size * rows / 2**20:7.1f} MiB  {after_time * 1000:8.1f} ms")
+        print(f"  saved {1 - after_size / before_size:.0%} memory, {1 - after_time / before_time:.0%} construction time")
+
+
+if __name__ == "__main__":
+    main()
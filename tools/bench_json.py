@@ -0,0 +1,63 @@
+"""
+Compares the cost of serializing the device listings with Flask's default JSON provider and
+with the orjson provider.
+
+Flask's DefaultJSONProvider is `json.dumps(sort_keys=True, default=...)` with datetimes written
+as HTTP dates; it is reproduced here so the script runs without a Flask app or a database.
+
+    python tools/bench_json.py [rows ...]
+"""
+from email.utils import format_datetime
+import datetime, json, os, sys, timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations_and_monitoring.domain.entities import Thermostat
+
+try:
+    import orjson
+except ImportError:
+    sys.exit("orjson is not installed")
+
+
+def flask_default(obj):
+    if isinstance(obj, datetime.date):
+        return format_datetime(obj if obj.tzinfo else obj.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+    raise TypeError(type(obj).__name__)
+
+
+def entity_default(obj):
+    return obj.to_json()
+
+
+def build(rows: int):
+    now = datetime.datetime(2025, 6, 1, 12, 0, 0)
+    thermostats = [Thermostat(id=i, device_id=f"thermostat-{i}", api_key="k" * 43, ip_address="10.0.0.1",
+                              mac_address="02:00:00:00:00:01", temperature=21.5, last_update=now,
+                              room_id=i % 500, state="active") for i in range(rows)]
+    return thermostats, [t.to_json() for t in thermostats]
+
+
+def bench(rows: int, repeat: int = 5):
+    thermostats, dicts = build(rows)
+    cases = {
+        # what /monitoring/devices/thermostats did before: to_json() per entity, then Flask's provider
+        "flask provider, to_json() list": lambda: json.dumps([t.to_json() for t in thermostats], default=flask_default, sort_keys=True).encode(),
+        # rows as returned by the paginated repositories, through Flask's provider
+        "flask provider, row dicts": lambda: json.dumps(dicts, default=flask_default, sort_keys=True).encode(),
+        # entities passed straight to jsonify, serialized by orjson through the to_json() hook
+        "orjson provider, entities": lambda: orjson.dumps(thermostats, default=entity_default, option=orjson.OPT_NON_STR_KEYS),
+        # rows as returned by the paginated repositories, through orjson
+        "orjson provider, row dicts": lambda: orjson.dumps(dicts, default=entity_default, option=orjson.OPT_NON_STR_KEYS),
+    }
+    print(f"\n{rows} thermostats")
+    baseline = None
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        baseline = baseline or best
+        print(f"  {name:<34} {best * 1000:9.2f} ms  {len(case()) / 1024:8.0f} KiB  x{baseline / best:5.1f}")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]:
+        bench(rows)
@@ -0,0 +1,106 @@
+"""
+Compares the two ways of loading the thermostats of a room into domain entities, as
+`MonitoringRepository.get_thermostats_by_room_id` does for `/monitoring/rooms/<room_id>/...`:
+
+- ORM: `session.query(Model).filter_by(room_id=...).all()`, then copying every attribute into a Thermostat;
+- Core rows: `session.execute(select(*columns).where(...))`, mapping every row with `Thermostat(*row)`.
+
+Every path reads all the rooms one request at a time. The thermostats table is reproduced on an
+in-memory SQLite database so the script runs without the MySQL server; only the mapping cost
+differs between the two paths.
+
+    python tools/bench_row_mapping.py [rows ...]
+"""
+from sqlalchemy import create_engine, select, insert, Column, DateTime, Float, Integer, String
+from sqlalchemy.orm import Session, declarative_base
+import datetime, os, sys, timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations_and_monitoring.domain.entities import Thermostat
+
+Base = declarative_base()
+
+
+class ThermostatModel(Base):
+    __tablename__ = 'thermostats'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    device_id = Column(String(100), nullable=False, unique=True)
+    api_key = Column(String(100), nullable=False)
+    ip_address = Column(String(100), nullable=False)
+    mac_address = Column(String(50), nullable=False)
+    state = Column(String(50), nullable=False)
+    temperature = Column(Float, nullable=False)
+    last_update = Column(DateTime, nullable=False)
+    room_id = Column(Integer, nullable=False, index=True)
+
+
+# same order as MonitoringRepository.THERMOSTAT_COLUMNS
+COLUMNS = (ThermostatModel.id, ThermostatModel.device_id, ThermostatModel.api_key, ThermostatModel.ip_address,
+           ThermostatModel.mac_address, ThermostatModel.temperature, ThermostatModel.last_update,
+           ThermostatModel.room_id, ThermostatModel.state)
+
+
+ROOMS = 500
+
+
+def orm_path(engine) -> list[Thermostat]:
+    thermostats = []
+    for room_id in range(ROOMS):
+        # one session per room, like one request per room
+        with Session(engine) as session:
+            result = session.query(ThermostatModel).filter_by(room_id=room_id).all()
+            thermostats += [Thermostat(id=device.id, device_id=device.device_id,
+                                       api_key=device.api_key, ip_address=device.ip_address,
+                                       mac_address=device.mac_address,
+                                       state=device.state, temperature=device.temperature,
+                                       last_update=device.last_update,
+                                       room_id=device.room_id) for device in result]
+    return thermostats
+
+
+def core_path(engine) -> list[Thermostat]:
+    thermostats = []
+    for room_id in range(ROOMS):
+        with Session(engine) as session:
+            query = select(*COLUMNS).where(ThermostatModel.room_id == room_id)
+            thermostats += [Thermostat(*row) for row in session.execute(query)]
+    return thermostats
+
+
+def populate(rows: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.datetime(2025, 6, 1, 12, 0, 0)
+    with engine.begin() as connection:
+        connection.execute(insert(ThermostatModel.__table__), [
+            {"device_id": f"thermostat-{i}", "api_key": "k" * 43, "ip_address": "10.0.0.1",
+             "mac_address": "02:00:00:00:00:01", "state": "active", "temperature": 21.5,
+             "last_update": now, "room_id": i % ROOMS}
+            for i in range(rows)
+        ])
+    return engine
+
+
+def bench(rows: int, repeat: int = 5):
+    engine = populate(rows)
+    orm = [t.to_json() for t in orm_path(engine)]
+    core = [t.to_json() for t in core_path(engine)]
+    assert orm == core, "both paths must produce the same entities"
+
+    print(f"\n{rows} thermostats in {ROOMS} rooms")
+    baseline = None
+    for name, path in (("ORM query + attribute copy", orm_path), ("Core select + Entity(*row)", core_path)):
+        best = min(timeit.repeat(lambda: path(engine), number=1, repeat=repeat))
+        baseline = baseline or best
+        print(f"  {name:<28} {best * 1000:9.1f} ms  {best / rows * 1e6:6.2f} us/row  x{baseline / best:4.1f}")
+    engine.dispose()
+
+
+def main():
+    for rows in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+        bench(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares two ways of keeping smoke_sensors.last_analogic_value current under a stream of readings:
+
+- one UPDATE per reading;
+- the smoke reading buffer: the newest value of every sensor kept in memory and written with one
+  CASE-based UPDATE per chunk of sensors at every flush.
+
+The smoke_sensors table is reproduced on a SQLite database file so the script runs without the
+MySQL server; the statement and row counts are what the buffer reports as its write amplification.
+
+    python tools/bench_smoke_updates.py [sensors] [readings_per_sensor_per_flush] [flushes]
+"""
+from sqlalchemy import create_engine, insert, update, case, Column, DateTime, Float, Integer, String
+from sqlalchemy.orm import declarative_base
+import os, random, sys, tempfile, time
+
+Base = declarative_base()
+
+# same as MonitoringRepository.SYNC_CHUNK_SIZE
+CHUNK_SIZE = 500
+
+
+class SmokeSensorModel(Base):
+    __tablename__ = 'smoke_sensors'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    device_id = Column(String(100), nullable=False, unique=True)
+    api_key = Column(String(100), nullable=False)
+    ip_address = Column(String(100), nullable=False)
+    mac_address = Column(String(50), nullable=False)
+    state = Column(String(50), nullable=False)
+    last_analogic_value = Column(Float, nullable=False)
+    last_alert_time = Column(DateTime, nullable=True)
+    room_id = Column(Integer, nullable=False, index=True)
+
+
+def populate(path: str, sensors: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(SmokeSensorModel.__table__), [
+            {"device_id": f"smoke-{i}", "api_key": "k" * 43, "ip_address": "10.0.0.1", "mac_address": "02:00:00:00:00:01",
+             "state": "active", "last_analogic_value": 0.0, "room_id": i % 500}
+            for i in range(sensors)
+        ])
+    return engine
+
+
+def per_reading(engine, flushes: list[list[tuple]]) -> tuple[int, int]:
+    table = SmokeSensorModel.__table__
+    statements = rows = 0
+    with engine.begin() as connection:
+        for readings in flushes:
+            for device_id, value in readings:
+                rows += connection.execute(
+                    update(table).where(table.c.device_id == device_id).values(last_analogic_value=value, state="active")
+                ).rowcount
+                statements += 1
+    return statements, rows
+
+
+def coalesced(engine, flushes: list[list[tuple]]) -> tuple[int, int]:
+    table = SmokeSensorModel.__table__
+    statements = rows = 0
+    with engine.begin() as connection:
+        for readings in flushes:
+            latest = dict(readings)
+            devices = list(latest.items())
+            for start in range(0, len(devices), CHUNK_SIZE):
+                chunk = dict(devices[start:start + CHUNK_SIZE])
+                rows += connection.execute(
+                    update(table).where(table.c.device_id.in_(list(chunk))).values(
+                        last_analogic_value=case(chunk, value=table.c.device_id),
+                        state=case({device_id: "active" for device_id in chunk}, value=table.c.device_id)
+                    )
+                ).rowcount
+                statements += 1
+    return statements, rows
+
+
+def main():
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    per_flush = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    flush_count = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    rng = random.Random(7)
+    flushes = []
+    for _ in range(flush_count):
+        readings = [(f"smoke-{i}", rng.uniform(0, 250)) for i in range(sensors) for _ in range(per_flush)]
+        rng.shuffle(readings)
+        flushes.append(readings)
+    received = sensors * per_flush * flush_count
+
+    print(f"\n{sensors} sensors, {per_flush} readings per sensor per flush, {flush_count} flushes ({received} readings)")
+    results = {}
+    for name, path in (("UPDATE per reading", per_reading), ("coalesced CASE UPDATE", coalesced)):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = populate(os.path.join(directory, "bench.db"), sensors)
+            start = time.perf_counter()
+            statements, rows = path(engine, flushes)
+            elapsed = time.perf_counter() - start
+            with engine.connect() as connection:
+                results[name] = connection.execute(
+                    SmokeSensorModel.__table__.select().order_by(SmokeSensorModel.id)
+                ).all()
+            engine.dispose()
+        print(f"  {name:<22} {statements:8d} statements  {rows:8d} rows written  {elapsed * 1000:9.1f} ms")
+    assert len({tuple(rows) for rows in results.values()}) == 1, "both paths must leave the same values"
+    print(f"  write amplification saved: x{received / (flush_count * -(-sensors // CHUNK_SIZE)):.0f} statements, "
+          f"x{per_flush} rows")
+
+
+if __name__ == "__main__":
+    main()
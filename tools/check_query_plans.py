@@ -0,0 +1,86 @@
+"""
+Checks that the commerce lookups by foreign key keep using their indexes.
+
+Runs EXPLAIN for the query behind every lookup route against the configured database (the
+MSSQL_* variables of .env) and fails when the expected index cannot be used, or when MySQL
+chooses a full table scan on a table large enough for that to matter.
+
+    python tools/check_query_plans.py [--min-rows N]
+
+Exits with status 1 when a lookup regressed, so it can run in CI after the migrations.
+"""
+from sqlalchemy import select
+import argparse, os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.infrastructure.database import db
+from commerce.infrastructure.models import PaymentCustomer, PaymentOwner, Subscription, ContractOwner
+
+# route, query, index that must serve it
+LOOKUPS = [
+    ("payment-customer/by-customer",
+     select(PaymentCustomer.__table__).where(PaymentCustomer.__table__.c.guest_id == "guest123"),
+     "ix_payment_customers_guest_id_final_amount"),
+    ("payment-owner/by-owner",
+     select(PaymentOwner.__table__).where(PaymentOwner.__table__.c.owner_id == 1),
+     "ix_payment_owners_owner_id_final_amount"),
+    ("subscription/by-name",
+     select(Subscription.__table__).where(Subscription.__table__.c.name == "Premium"),
+     "ix_subscriptions_name"),
+    ("subscription/by-status",
+     select(Subscription.__table__).where(Subscription.__table__.c.status == "active"),
+     "ix_subscriptions_status"),
+    ("contract-owner/by-owner",
+     select(ContractOwner.__table__).where(ContractOwner.__table__.c.owner_id == 1),
+     "ix_contract_owners_owner_id"),
+    ("contract-owner/by-subscription",
+     select(ContractOwner.__table__).where(ContractOwner.__table__.c.subscription_id == 1),
+     "ix_contract_owners_subscription_id"),
+]
+
+# access types of an index lookup; `ALL` is a full table scan and `index` a full index scan
+SEEK_TYPES = {"system", "const", "eq_ref", "ref", "ref_or_null", "range"}
+
+
+def explain(connection, query) -> dict:
+    sql = query.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    return dict(connection.exec_driver_sql(f"EXPLAIN {sql}").mappings().first())
+
+
+def check(min_rows: int) -> list[str]:
+    failures = []
+    with db.engine.connect() as connection:
+        for route, query, index in LOOKUPS:
+            plan = explain(connection, query)
+            possible = (plan.get("possible_keys") or "").split(",")
+            access, rows, extra = plan.get("type"), plan.get("rows") or 0, plan.get("Extra") or ""
+
+            if index not in possible and "no matching row in const table" not in extra:
+                status = f"FAIL  {index} is not usable (possible keys: {plan.get('possible_keys')})"
+                failures.append(route)
+            elif access in SEEK_TYPES or access is None:
+                status = f"ok    {access or extra} via {plan.get('key')}, ~{rows} rows"
+            elif rows < min_rows:
+                status = f"skip  {access} scan of ~{rows} rows; too few rows for the optimizer to prefer the index"
+            else:
+                status = f"FAIL  {access} scan of ~{rows} rows instead of a seek on {index}"
+                failures.append(route)
+            print(f"{route:<32} {status}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="below this many rows a scan is reported but not treated as a regression")
+    args = parser.parse_args()
+
+    failures = check(args.min_rows)
+    if failures:
+        print(f"\n{len(failures)} lookup(s) no longer use their index: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()